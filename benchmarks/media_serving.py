@@ -0,0 +1,168 @@
+"""
+Media serving benchmark: the former plain StaticFiles mount vs MediaFiles.
+
+Starts each app under uvicorn on a local port and measures, over HTTP:
+
+- "full": first views, the whole image in one GET
+- "range": a 64 KiB Range request (video/large image seeking, resumes)
+- "repeat": a repeat page view. The plain mount revalidates every image
+  (a conditional GET answered 304); immutable content-addressed images
+  are reused from the browser cache without any request.
+- "accel": MediaFiles behind nginx (X-Accel-Redirect), the app's share of
+  the work: headers only, nginx sends the bytes
+
+Usage (from the repository root):
+
+    python benchmarks/media_serving.py [--requests 3000] [--concurrency 32]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+from starlette.staticfiles import StaticFiles
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from core.media import MediaFiles  # noqa: E402
+from core.settings import settings  # noqa: E402
+from utils.file_utils import blob_relative_path  # noqa: E402
+
+IMAGE_SIZE = 256 * 1024
+RANGE_SIZE = 64 * 1024
+
+
+def make_media_root() -> tuple[Path, str]:
+    root = Path(tempfile.mkdtemp(prefix="media-bench-"))
+    path = blob_relative_path("ab" * 32, "jpg")
+    (root / path).parent.mkdir(parents=True)
+    (root / path).write_bytes(os.urandom(IMAGE_SIZE))
+    return root, path
+
+
+def run_server(kind: str, root: str, port: int, accel_prefix: str | None) -> None:
+    settings.MEDIA_ROOT = Path(root)
+    settings.MEDIA_ACCEL_REDIRECT_PREFIX = accel_prefix
+    files = MediaFiles if kind == "MediaFiles" else StaticFiles
+    app = FastAPI()
+    app.mount("/media", files(directory=root), name="media")
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def serve(kind: str, root: Path, accel_prefix: str | None = None) -> str:
+    """Start a server process (its own GIL, like a uvicorn worker)."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    process = multiprocessing.get_context("spawn").Process(
+        target=run_server, args=(kind, str(root), port, accel_prefix), daemon=True
+    )
+    process.start()
+    for _ in range(500):
+        with socket.socket() as sock:
+            if sock.connect_ex(("127.0.0.1", port)) == 0:
+                return f"http://127.0.0.1:{port}"
+        time.sleep(0.02)
+    raise RuntimeError(f"{kind} server did not start")
+
+
+async def load(
+    url: str, headers: dict[str, str], requests: int, concurrency: int
+) -> tuple[float, int, int]:
+    """
+    (seconds, body bytes, status of the last response) for `requests` GETs
+    over `concurrency` keep-alive connections. A bare HTTP/1.1 client, so
+    the client isn't what's being measured.
+    """
+    parts = httpx.URL(url)
+    request = "".join(
+        f"{name}: {value}\r\n"
+        for name, value in {"Host": parts.netloc.decode(), **headers}.items()
+    )
+    request = f"GET {parts.raw_path.decode()} HTTP/1.1\r\n{request}\r\n".encode()
+    received = status = 0
+    remaining = requests
+
+    async def worker() -> None:
+        nonlocal received, status, remaining
+        reader, writer = await asyncio.open_connection(parts.host, parts.port)
+        while remaining > 0:
+            remaining -= 1
+            writer.write(request)
+            head = await reader.readuntil(b"\r\n\r\n")
+            status = int(head.split(b" ", 2)[1])
+            length = 0
+            for line in head.split(b"\r\n")[1:]:
+                name, _, value = line.partition(b":")
+                if name.lower() == b"content-length":
+                    length = int(value)
+            if status not in (204, 304) and length:
+                body = await reader.readexactly(length)
+                received += len(body)
+        writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - started, received, status
+
+
+async def main(requests: int, concurrency: int) -> None:
+    root, path = make_media_root()
+    plain = serve("plain", root)
+    media = serve("MediaFiles", root)
+    accel = serve("MediaFiles", root, accel_prefix="/protected-media/")
+
+    async with httpx.AsyncClient() as client:
+        for name, base in (("plain mount", plain), ("MediaFiles", media)):
+            response = await client.get(f"{base}/media/{path}")
+            cache_control = response.headers.get("cache-control", "-")
+            print(f"{name:12}: cache-control {cache_control}")
+        etag = (await client.get(f"{plain}/media/{path}")).headers["etag"]
+    print(
+        f"{requests} requests, {concurrency} concurrent, {IMAGE_SIZE // 1024} KiB image\n"
+    )
+
+    scenarios = [
+        ("full", "plain", plain, {}),
+        ("full", "MediaFiles", media, {}),
+        ("range", "plain", plain, {"Range": f"bytes=0-{RANGE_SIZE - 1}"}),
+        ("range", "MediaFiles", media, {"Range": f"bytes=0-{RANGE_SIZE - 1}"}),
+        ("repeat", "plain", plain, {"If-None-Match": etag}),
+    ]
+    print(f"{'scenario':8} {'server':12} {'req/s':>9} {'MiB/s':>9} {'status':>7}")
+    for name, server, base, headers in scenarios:
+        seconds, received, status = await load(
+            f"{base}/media/{path}", headers, requests, concurrency
+        )
+        print(
+            f"{name:8} {server:12} {requests / seconds:9.0f} "
+            f"{received / seconds / 2**20:9.1f} {status:7}"
+        )
+    print(
+        f"{'repeat':8} {'MediaFiles':12} {'no requests (immutable, served from cache)':>27}"
+    )
+
+    seconds, received, status = await load(
+        f"{accel}/media/{path}", {}, requests, concurrency
+    )
+    print(
+        f"{'accel':8} {'MediaFiles':12} {requests / seconds:9.0f} "
+        f"{received / seconds / 2**20:9.1f} {status:7}  (bytes sent by nginx)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
@@ -9,6 +9,7 @@ from api.v1 import (
     dashboard,
     deliveries,
     delivery_address,
+    exports,
     orders,
     payments,
     promo_codes,
@@ -16,7 +17,7 @@ from api.v1 import (
     users,
 )
 from api.v1.auth import authorizations, passwords, social, verifications
-from api.v1.products import images, products, variants
+from api.v1.products import images, imports, products, reviews, variants
 from core.settings import settings
 
 api_router = APIRouter(
@@ -55,6 +56,10 @@ api_router.include_router(products.router, prefix="/products", tags=["Products"]
 api_router.include_router(variants.router, prefix="/products", tags=["Variants"])
 # Product image services router
 api_router.include_router(images.router, prefix="/products", tags=["Images"])
+# Bulk product import router
+api_router.include_router(imports.router, prefix="/products", tags=["Imports"])
+# Product reviews router
+api_router.include_router(reviews.router, prefix="/products", tags=["Reviews"])
 # Orders services router
 api_router.include_router(orders.router, prefix="/orders", tags=["Orders"])
 # Payments services router by (Stripe, ....)
@@ -71,5 +76,7 @@ api_router.include_router(
 )
 # Delivery services router
 api_router.include_router(deliveries.router, prefix="/deliveries", tags=["Deliveries"])
+# Streaming data exports (products, variants, orders)
+api_router.include_router(exports.router, prefix="/exports", tags=["Exports"])
 
 __all__ = ("api_router",)
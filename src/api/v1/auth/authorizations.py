@@ -1,5 +1,6 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 
+from core.guest_carts import delete_guest_cart_cookie, read_guest_cart_cookie
 from schemas.auth import (
     LoginOutScheme,
     LoginScheme,
@@ -8,6 +9,7 @@ from schemas.auth import (
     RegistrationScheme,
 )
 from services.auth_service import AuthService, get_auth_service
+from services.cart_service import CartService, get_cart_service
 
 router = APIRouter()
 
@@ -26,12 +28,21 @@ async def register_user(
 @router.post("/login", response_model=LoginOutScheme)
 async def login_user(
     data: LoginScheme,
+    request: Request,
+    response: Response,
     auth_service: AuthService = Depends(get_auth_service),
+    cart_service: CartService = Depends(get_cart_service),
 ):
     """
-    User login endpoint
+    User login endpoint; the visitor's guest cart, if any, moves into the
+    user's cart
     """
-    return await auth_service.login(data)
+    login = await auth_service.login(data)
+    guest_cart_id = read_guest_cart_cookie(request)
+    if guest_cart_id:
+        await cart_service.merge_guest_cart(login.user.id, guest_cart_id)
+        delete_guest_cart_cookie(response)
+    return login
 
 
 @router.post("/logout")
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, status
 
 from db.crud.brand import BrandCRUD
 from db.dependencies.auth import ADMIN_ROLE, SELLER_ROLE, require_roles
@@ -7,20 +7,24 @@ from schemas.brand import (
     BrandOutScheme,
     BrandUpdateScheme,
 )
+from utils.conditional import conditional_response
 from utils.shortcuts import get_or_404
 
 router = APIRouter(prefix="/brands", tags=["Brands"])
 
 
 @router.get("/", response_model=list[BrandOutScheme])
-async def get_brands(brands_crud: BrandCRUD = Depends(BrandCRUD)):
-    return await brands_crud.get_all()
+async def get_brands(request: Request, brands_crud: BrandCRUD = Depends(BrandCRUD)):
+    payload = await brands_crud.get_all_payload()
+    return conditional_response(request, payload)
 
 
 @router.get("/{slug}", response_model=BrandOutScheme)
-async def get_brand(slug: str, brands_crud: BrandCRUD = Depends(BrandCRUD)):
-    brand = await get_or_404(brands_crud.get_by_slug(slug), "Brand not found")
-    return brand
+async def get_brand(
+    slug: str, request: Request, brands_crud: BrandCRUD = Depends(BrandCRUD)
+):
+    payload = await get_or_404(brands_crud.get_by_slug_payload(slug), "Brand not found")
+    return conditional_response(request, payload)
 
 
 @router.post(
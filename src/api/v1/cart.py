@@ -1,25 +1,48 @@
 # src/api/endpoints/cart.py
-from fastapi import APIRouter, Depends
+from typing import Optional
 
+from fastapi import APIRouter, Depends, Request, Response
+
+from core.guest_carts import (
+    new_guest_cart_id,
+    read_guest_cart_cookie,
+    set_guest_cart_cookie,
+)
 from db.dependencies.auth import get_current_user  # твоя функция
 from db.models.users import User
 from schemas.cart import (
     AddToCartScheme,
+    CartBatchScheme,
     CartResponse,
+    GuestCartResponse,
+    PricedCartResponse,
     UpdateQuantityScheme,
 )
-from services.cart_service import CartService, get_cart_service
+from services.cart_service import (
+    CartService,
+    GuestCartService,
+    get_cart_service,
+    get_guest_cart_service,
+)
+from services.pricing_service import CartPricingService, get_cart_pricing_service
+from utils.conditional import conditional_response
 
 router = APIRouter(prefix="/carts", tags=["Carts"])
 
 
-@router.get("/", response_model=CartResponse)
+@router.get("/", response_model=PricedCartResponse)
 async def get_cart(
+    request: Request,
+    promo_code: Optional[str] = None,
     current_user: User = Depends(get_current_user),
-    cart_service: CartService = Depends(get_cart_service),
+    pricing_service: CartPricingService = Depends(get_cart_pricing_service),
 ):
-    cart = await cart_service.get_user_cart(current_user.id)
-    return cart
+    """
+    The cart at current prices with stock warnings and totals; `promo_code`
+    previews the discount checkout would give.
+    """
+    payload = await pricing_service.get_priced_cart(current_user.id, promo_code)
+    return conditional_response(request, payload)
 
 
 @router.post("/add", response_model=CartResponse)
@@ -28,8 +51,9 @@ async def add_to_cart(
     current_user: User = Depends(get_current_user),
     cart_service: CartService = Depends(get_cart_service),
 ):
-    await cart_service.add_to_cart(current_user.id, data.variant_id, data.quantity)
-    return await cart_service.get_user_cart(current_user.id)
+    return await cart_service.add_to_cart(
+        current_user.id, data.variant_id, data.quantity
+    )
 
 
 @router.post("/update", response_model=CartResponse)
@@ -38,8 +62,73 @@ async def update_quantity(
     current_user: User = Depends(get_current_user),
     cart_service: CartService = Depends(get_cart_service),
 ):
-    await cart_service.update_quantity(current_user.id, data.variant_id, data.quantity)
-    return await cart_service.get_user_cart(current_user.id)
+    return await cart_service.update_quantity(
+        current_user.id, data.variant_id, data.quantity
+    )
+
+
+@router.post("/batch", response_model=CartResponse)
+async def apply_batch(
+    data: CartBatchScheme,
+    current_user: User = Depends(get_current_user),
+    cart_service: CartService = Depends(get_cart_service),
+):
+    """Apply several add/set/remove operations at once (offline sync, merges)."""
+    return await cart_service.apply_batch(current_user.id, data.operations)
+
+
+def guest_cart_id(request: Request, response: Response) -> str:
+    """The visitor's guest cart id; a new cookie is issued if there's none."""
+    cart_id = read_guest_cart_cookie(request) or new_guest_cart_id()
+    # (re)set on every write: the cookie lives as long as the cart
+    set_guest_cart_cookie(response, cart_id)
+    return cart_id
+
+
+# Guest carts: no login, merged into the user's cart at /auth/login
+@router.get("/guest", response_model=GuestCartResponse)
+async def get_guest_cart(
+    request: Request,
+    cart_service: GuestCartService = Depends(get_guest_cart_service),
+):
+    return await cart_service.get_cart(read_guest_cart_cookie(request))
+
+
+@router.post("/guest/add", response_model=GuestCartResponse)
+async def add_to_guest_cart(
+    data: AddToCartScheme,
+    cart_id: str = Depends(guest_cart_id),
+    cart_service: GuestCartService = Depends(get_guest_cart_service),
+):
+    return await cart_service.add_to_cart(cart_id, data.variant_id, data.quantity)
+
+
+@router.post("/guest/update", response_model=GuestCartResponse)
+async def update_guest_cart_quantity(
+    data: UpdateQuantityScheme,
+    cart_id: str = Depends(guest_cart_id),
+    cart_service: GuestCartService = Depends(get_guest_cart_service),
+):
+    return await cart_service.update_quantity(cart_id, data.variant_id, data.quantity)
+
+
+@router.delete("/guest/{variant_id}")
+async def remove_guest_cart_item(
+    variant_id: int,
+    cart_id: str = Depends(guest_cart_id),
+    cart_service: GuestCartService = Depends(get_guest_cart_service),
+):
+    await cart_service.remove_from_cart(cart_id, variant_id)
+    return {"detail": "Item removed"}
+
+
+@router.delete("/guest", status_code=200)
+async def clear_guest_cart(
+    cart_id: str = Depends(guest_cart_id),
+    cart_service: GuestCartService = Depends(get_guest_cart_service),
+):
+    await cart_service.clear_cart(cart_id)
+    return {"detail": "Cart cleared"}
 
 
 @router.delete("/{variant_id}")
@@ -1,30 +1,44 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, status
 
 from db.crud.category import CategoryCRUD
 from db.dependencies.auth import ADMIN_ROLE, SELLER_ROLE, require_roles
 from schemas.category import (
     CategoryCreateScheme,
     CategoryOutScheme,
+    CategoryTreeScheme,
     CategoryUpdateScheme,
 )
+from utils.conditional import conditional_response
 from utils.shortcuts import get_or_404
 
 router = APIRouter(prefix="/categories", tags=["Categories"])
 
 
 @router.get("/", response_model=list[CategoryOutScheme])
-async def get_categories(categoryies_crud: CategoryCRUD = Depends(CategoryCRUD)):
-    return await categoryies_crud.get_all()
+async def get_categories(
+    request: Request, categoryies_crud: CategoryCRUD = Depends(CategoryCRUD)
+):
+    payload = await categoryies_crud.get_all_payload()
+    return conditional_response(request, payload)
+
+
+@router.get("/tree", response_model=list[CategoryTreeScheme])
+async def get_category_tree(
+    request: Request, categoryies_crud: CategoryCRUD = Depends(CategoryCRUD)
+):
+    """All categories nested under their parents (roots at the top level)."""
+    payload = await categoryies_crud.get_tree_payload()
+    return conditional_response(request, payload)
 
 
 @router.get("/{slug}", response_model=CategoryOutScheme)
 async def get_category(
-    slug: str, categoryies_crud: CategoryCRUD = Depends(CategoryCRUD)
+    slug: str, request: Request, categoryies_crud: CategoryCRUD = Depends(CategoryCRUD)
 ):
-    category = await get_or_404(
-        categoryies_crud.get_by_slug(slug), "Category not found"
+    payload = await get_or_404(
+        categoryies_crud.get_by_slug_payload(slug), "Category not found"
     )
-    return category
+    return conditional_response(request, payload)
 
 
 @router.post(
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+
+from db.dependencies.auth import ADMIN_ROLE, SELLER_ROLE, require_admin, require_roles
+from db.models.users import User
+from schemas.export import ExportFormat
+from services.export_service import ExportService, get_export_service
+
+router = APIRouter()
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _export_response(
+    name: str, chunks: AsyncIterator[bytes], format: str, gzip: bool
+) -> StreamingResponse:
+    filename = f"{name}.{format}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        chunks,
+        media_type="application/gzip" if gzip else MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/products")
+async def export_products(
+    format: ExportFormat = "ndjson",
+    gzip: bool = Query(False, description="Send the file gzip-compressed"),
+    user: User = Depends(require_roles(ADMIN_ROLE, SELLER_ROLE)),
+    service: ExportService = Depends(get_export_service),
+):
+    """
+    Every product as NDJSON or CSV, streamed straight from a database cursor.
+    Sellers get their own products only.
+    """
+    stmt = service.products(await service.seller_scope(user))
+    return _export_response(
+        "products", service.export(stmt, format, gzip), format, gzip
+    )
+
+
+@router.get("/variants")
+async def export_variants(
+    format: ExportFormat = "ndjson",
+    gzip: bool = Query(False, description="Send the file gzip-compressed"),
+    user: User = Depends(require_roles(ADMIN_ROLE, SELLER_ROLE)),
+    service: ExportService = Depends(get_export_service),
+):
+    """Every product variant; sellers get the variants of their own products."""
+    stmt = service.variants(await service.seller_scope(user))
+    return _export_response(
+        "variants", service.export(stmt, format, gzip), format, gzip
+    )
+
+
+@router.get("/orders")
+async def export_orders(
+    format: ExportFormat = "ndjson",
+    gzip: bool = Query(False, description="Send the file gzip-compressed"),
+    admin_user: User = Depends(require_admin),
+    service: ExportService = Depends(get_export_service),
+):
+    """Every order, one row per order item."""
+    stmt = service.orders()
+    return _export_response("orders", service.export(stmt, format, gzip), format, gzip)
+
+
+__all__ = ("router",)
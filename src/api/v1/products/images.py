@@ -2,13 +2,17 @@ from __future__ import annotations
 
 from typing import List
 
-from fastapi import APIRouter, Depends, UploadFile, status
+from fastapi import APIRouter, BackgroundTasks, Depends, Request, UploadFile, status
 
+from core.settings import settings
 from db.dependencies.auth import ADMIN_ROLE, SELLER_ROLE, require_roles
 from schemas.product import (
     ProductImageOutScheme,
 )
+from services.image_service import run_image_processing
 from services.product_service import ProductImageService, get_product_images_service
+from tasks.product_tasks import process_product_image_task
+from utils.conditional import conditional_response
 
 router = APIRouter(prefix="/products", tags=["Product Images"])
 
@@ -17,9 +21,11 @@ router = APIRouter(prefix="/products", tags=["Product Images"])
 @router.get("/{product_id}/images", response_model=List[ProductImageOutScheme])
 async def list_images(
     product_id: int,
+    request: Request,
     product_service: ProductImageService = Depends(get_product_images_service),
 ):
-    return await product_service.list_images(product_id)
+    payload = await product_service.list_images_payload(product_id)
+    return conditional_response(request, payload)
 
 
 @router.post(
@@ -30,9 +36,19 @@ async def list_images(
 async def upload_image(
     product_id: int,
     file: UploadFile,
+    background_tasks: BackgroundTasks,
     product_service: ProductImageService = Depends(get_product_images_service),
 ):
-    return await product_service.add_image(product_id, file)
+    """
+    Store the original; the thumbnail/medium/large renditions are made in
+    the background (`renditions_status` turns from pending to ready).
+    """
+    image = await product_service.add_image(product_id, file)
+    if settings.ENV == "prod":
+        process_product_image_task.delay(image.id)
+    else:
+        background_tasks.add_task(run_image_processing, image.id)
+    return image
 
 
 @router.delete(
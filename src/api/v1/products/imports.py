@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+
+from core.settings import settings
+from db.dependencies.auth import ADMIN_ROLE, SELLER_ROLE, require_roles
+from db.models.users import User
+from schemas.product_import import ProductImportFormat, ProductImportOutScheme
+from services.product_import_service import (
+    ProductImportService,
+    get_product_import_service,
+    run_product_import,
+)
+from tasks.product_tasks import import_products_task
+
+router = APIRouter(prefix="/products", tags=["Product Imports"])
+
+CONTENT_TYPE_FORMATS = {
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "text/csv": "csv",
+}
+
+
+@router.post(
+    "/imports",
+    response_model=ProductImportOutScheme,
+    status_code=status.HTTP_201_CREATED,
+)
+async def import_products(
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    format: Optional[ProductImportFormat] = None,
+    background: bool = Query(
+        False, description="Queue the file for a worker instead of importing inline"
+    ),
+    user: User = Depends(require_roles(ADMIN_ROLE, SELLER_ROLE)),
+    service: ProductImportService = Depends(get_product_import_service),
+):
+    """
+    Bulk import products from the raw request body: NDJSON (one
+    `ProductCreateScheme` object per line) or CSV (same columns; `images` as
+    `url|url`, `variants` as a JSON array). The body is parsed as it streams
+    in and inserted in batches; rows that fail are listed in `errors`.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    format = format or CONTENT_TYPE_FORMATS.get(content_type)
+    if format is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send text/csv or application/x-ndjson, or pass ?format=",
+        )
+
+    if not background:
+        return await service.import_stream(request.stream(), format, user.id)
+
+    job = await service.enqueue_stream(request.stream(), format, user.id)
+    if settings.ENV == "prod":
+        import_products_task.delay(job.id)
+    else:
+        background_tasks.add_task(run_product_import, job.id)
+    response.status_code = status.HTTP_202_ACCEPTED
+    return job
+
+
+@router.get("/imports/{import_id}", response_model=ProductImportOutScheme)
+async def get_import(
+    import_id: int,
+    user: User = Depends(require_roles(ADMIN_ROLE, SELLER_ROLE)),
+    service: ProductImportService = Depends(get_product_import_service),
+):
+    """Progress of an import: row counters, errors and rows per second."""
+    job = await service.get_import(import_id)
+    if user.role != ADMIN_ROLE and job.user_id != user.id:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return job
@@ -1,27 +1,170 @@
 from __future__ import annotations
 
-from typing import List
-
-from fastapi import APIRouter, Depends, status
+from decimal import Decimal
+from typing import List, Optional
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
 
+from core.suggest import MAX_SUGGESTIONS
 from db.dependencies.auth import ADMIN_ROLE, SELLER_ROLE, require_roles
 from schemas.product import (
+    ProductCardScheme,
     ProductCreateScheme,
+    ProductFacetPageScheme,
+    ProductOrdering,
     ProductOutScheme,
     ProductUpdateScheme,
+    SuggestionScheme,
 )
+from services.facet_service import ATTR_PREFIX, FacetService, get_facet_service
 from services.product_service import ProductService, get_product_service
+from services.related_service import (
+    RelatedProductsService,
+    get_related_products_service,
+)
+from services.suggest_service import SuggestService, get_suggest_service
+from utils.conditional import conditional_response
 
 router = APIRouter(prefix="/products", tags=['Products'])
 
 
-@router.get("/", response_model=List[ProductOutScheme])
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def parse_attribute_filters(attr: List[str]) -> dict[str, list[str]]:
+    """`["color:red", "color:blue", "size:M"]` -> {name: [values]}"""
+    filters: dict[str, list[str]] = {}
+    for item in attr:
+        name, sep, value = item.partition(":")
+        if not sep or not name or not value:
+            raise HTTPException(status_code=400, detail=f"Invalid attribute: {item}")
+        filters.setdefault(name, []).append(value)
+    return filters
+
+
+@router.get("/", response_model=List[ProductCardScheme])
 async def list_products(
-    limit: int = 50,
-    offset: int = 0,
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    cursor: str | None = None,
+    order_by: ProductOrdering = "-id",
+    category_id: Optional[int] = Query(
+        None, description="Only products of this category and its subcategories"
+    ),
+    attr: List[str] = Query([], description="Variant attribute as name:value"),
     product_service: ProductService = Depends(get_product_service),
 ):
-    return await product_service.list_products(limit=limit, offset=offset)
+    """
+    Cursor pagination: pass the `X-Next-Cursor` header of the previous page
+    as `cursor`. `offset` is kept for old clients and disables cursors; its
+    pages follow `order_by` too. `limit` is capped at 200 (larger values are
+    rejected with 422). Repeated `attr` values of one name are OR-ed,
+    different names AND-ed.
+    """
+    attributes = parse_attribute_filters(attr)
+    if offset and not cursor:
+        return await product_service.list_products(
+            limit=limit,
+            offset=offset,
+            order_by=order_by,
+            category_id=category_id,
+            attributes=attributes,
+        )
+
+    products, next_cursor = await product_service.list_products_page(
+        limit=limit,
+        cursor=cursor,
+        order_by=order_by,
+        category_id=category_id,
+        attributes=attributes,
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return products
+
+
+@router.get("/search", response_model=List[ProductCardScheme])
+async def search_products(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = None,
+    product_service: ProductService = Depends(get_product_service),
+):
+    """
+    Full-text search over title, description, brand and category names,
+    best matches first. Paginated like the listing, via `X-Next-Cursor`.
+    """
+    products, next_cursor = await product_service.search_products(
+        q, limit=limit, cursor=cursor
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return products
+
+
+@router.get("/suggest", response_model=List[SuggestionScheme])
+async def suggest(
+    prefix: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=MAX_SUGGESTIONS),
+    suggest_service: SuggestService = Depends(get_suggest_service),
+):
+    """
+    Search-box suggestions: products, brands and categories with a word
+    starting with each word of `prefix`, most popular first. Served from an
+    in-memory index, no SQL.
+    """
+    return await suggest_service.suggest(prefix, limit=limit)
+
+
+@router.get("/facets", response_model=ProductFacetPageScheme)
+async def filter_products(
+    category_id: List[int] = Query([]),
+    brand_id: List[int] = Query([]),
+    seller_id: List[int] = Query([]),
+    in_stock: Optional[bool] = None,
+    price_min: Optional[Decimal] = Query(None, ge=0),
+    price_max: Optional[Decimal] = Query(None, ge=0),
+    attr: List[str] = Query([], description="Variant attribute as name:value"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = None,
+    facet_service: FacetService = Depends(get_facet_service),
+):
+    """
+    Filtered listing (newest first) with facet counts. Values of the same
+    facet are OR-ed, different facets are AND-ed.
+    """
+    filters: dict[str, list] = {
+        "category_id": category_id,
+        "brand_id": brand_id,
+        "seller_id": seller_id,
+        "in_stock": [] if in_stock is None else [in_stock],
+    }
+    for name, values in parse_attribute_filters(attr).items():
+        filters[ATTR_PREFIX + name] = values
+
+    products, result, next_cursor = await facet_service.filter_products(
+        filters,
+        price_min=price_min,
+        price_max=price_max,
+        limit=limit,
+        cursor=cursor,
+    )
+    return ProductFacetPageScheme(
+        total=result.total,
+        items=products,
+        facets=result.counts,
+        next_cursor=next_cursor,
+    )
 
 
 @router.post(
@@ -39,16 +182,36 @@ async def create_product(
 
 @router.get("/{product_id}", response_model=ProductOutScheme)
 async def retrieve_product(
-    product_id: int, service: ProductService = Depends(get_product_service)
+    product_id: int,
+    request: Request,
+    service: ProductService = Depends(get_product_service),
 ):
-    return await service.get_product(product_id)
+    payload = await service.get_product_payload(product_id)
+    return conditional_response(request, payload)
 
 
 @router.get("/slug/{slug}", response_model=ProductOutScheme)
 async def retrieve_product_by_slug(
-    slug: str, service: ProductService = Depends(get_product_service)
+    slug: str,
+    request: Request,
+    service: ProductService = Depends(get_product_service),
+):
+    payload = await service.get_product_payload_by_slug(slug)
+    return conditional_response(request, payload)
+
+
+@router.get("/{product_id}/related", response_model=List[ProductCardScheme])
+async def related_products(
+    product_id: int,
+    request: Request,
+    service: RelatedProductsService = Depends(get_related_products_service),
 ):
-    return await service.get_product_by_slug(slug)
+    """
+    Products frequently bought together with this one, strongest first.
+    Recomputed daily from order history.
+    """
+    payload = await service.get_related_payload(product_id)
+    return conditional_response(request, payload)
 
 
 @router.put(
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from typing import List
+
+from fastapi import APIRouter, Depends, Query, Response, status
+
+from api.v1.products.products import NEXT_CURSOR_HEADER
+from db.dependencies.auth import get_current_user
+from db.models.users import User
+from schemas.review import ReviewCreateScheme, ReviewOutScheme, ReviewUpdateScheme
+from services.review_service import ReviewService, get_review_service
+
+router = APIRouter(prefix="/products", tags=["Product Reviews"])
+
+
+@router.get("/{product_id}/reviews", response_model=List[ReviewOutScheme])
+async def list_reviews(
+    product_id: int,
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = None,
+    service: ReviewService = Depends(get_review_service),
+):
+    """Newest first; the next page's cursor is in the `X-Next-Cursor` header."""
+    reviews, next_cursor = await service.list_reviews(
+        product_id, limit=limit, cursor=cursor
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return reviews
+
+
+@router.post(
+    "/{product_id}/reviews",
+    response_model=ReviewOutScheme,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_review(
+    product_id: int,
+    data: ReviewCreateScheme,
+    current_user: User = Depends(get_current_user),
+    service: ReviewService = Depends(get_review_service),
+):
+    return await service.create_review(product_id, current_user, data)
+
+
+@router.put("/reviews/{review_id}", response_model=ReviewOutScheme)
+async def update_review(
+    review_id: int,
+    data: ReviewUpdateScheme,
+    current_user: User = Depends(get_current_user),
+    service: ReviewService = Depends(get_review_service),
+):
+    return await service.update_review(review_id, current_user, data)
+
+
+@router.delete("/reviews/{review_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_review(
+    review_id: int,
+    current_user: User = Depends(get_current_user),
+    service: ReviewService = Depends(get_review_service),
+):
+    await service.delete_review(review_id, current_user)
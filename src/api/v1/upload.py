@@ -1,11 +1,13 @@
-from fastapi import APIRouter, UploadFile
+from fastapi import APIRouter, Depends, UploadFile
 
-from services.file_service import FileService
+from services.media_service import MediaService, get_media_service
 
 router = APIRouter(prefix="/upload", tags=["Upload"])
 
 
 @router.post("/image")
-async def upload_image(file: UploadFile):
-    url = await FileService.save_image(file, "uploads")
-    return {"url": url}
+async def upload_image(
+    file: UploadFile, media_service: MediaService = Depends(get_media_service)
+):
+    blob = await media_service.upload_image(file)
+    return {"url": blob.url}
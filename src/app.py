@@ -3,12 +3,12 @@ import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import ORJSONResponse
-from fastapi.staticfiles import StaticFiles
 
 from api.routers import api_router
 from core.exceptions import register_error_handler
 from core.lifespan import lifespan
 from core.logger import configure_logger
+from core.media import MediaFiles
 from core.monitoring import router as monitoring_router
 from core.prometheus import MetricsMiddleware
 from core.sentry import init_sentry
@@ -53,6 +53,7 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor"],
     )
 
     # Include routers
@@ -65,7 +66,7 @@ def create_app() -> FastAPI:
     # Static files (media)
     try:
         app.mount(
-            settings.MEDIA_URL, StaticFiles(directory=settings.MEDIA_ROOT), name="media"
+            settings.MEDIA_URL, MediaFiles(directory=settings.MEDIA_ROOT), name="media"
         )
     except Exception:
         # don't crash if media doesn't exists at startup
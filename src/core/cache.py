@@ -0,0 +1,185 @@
+# src/core/cache.py
+"""
+In-process read cache for catalog data.
+
+Entries are serialized JSON response bodies together with their validators
+(ETag, Last-Modified), so a hit, or a 304 for a conditional GET, is served
+without touching the database or re-validating ORM objects. Writes that can
+change a cached body invalidate it explicitly (see the `invalidate_*`
+helpers, called from the CRUD layer); the TTL only bounds how long other
+workers keep serving a body after a write they didn't see.
+
+Priced carts have a cache of their own, keyed by the cart version, so a
+write to the cart never needs an invalidation.
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from functools import cache
+from typing import Any, Awaitable, Callable, Optional
+
+from pydantic import TypeAdapter
+
+from core.prometheus import get_cache_metrics
+from core.settings import settings
+
+
+@dataclass(frozen=True)
+class CachedPayload:
+    body: bytes
+    etag: str
+    last_modified: Optional[datetime] = None
+
+
+class TTLCache:
+    """Bounded LRU mapping whose entries expire after `ttl` seconds."""
+
+    def __init__(self, name: str, maxsize: int, ttl: float) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Any:
+        metrics = get_cache_metrics()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self._entries[key]
+            metrics.evictions.labels(cache=self.name, reason="expired").inc()
+            entry = None
+        if entry is None:
+            metrics.misses.labels(cache=self.name).inc()
+            return None
+        self._entries.move_to_end(key)
+        metrics.hits.labels(cache=self.name).inc()
+        return entry[1]
+
+    def set(self, key: str, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            get_cache_metrics().evictions.labels(cache=self.name, reason="size").inc()
+
+    def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def get_or_load(
+        self,
+        key: str,
+        load: Callable[[], Awaitable[Any]],
+        scheme: Any,
+        last_modified: Optional[Callable[[Any], Optional[datetime]]] = None,
+    ) -> Optional[CachedPayload]:
+        """
+        Cached payload for `key`; on a miss, serialize `await load()` as
+        `scheme`. A `None` result (not found) is returned as-is, not cached.
+        """
+        payload = self.get(key)
+        if payload is not None:
+            return payload
+        obj = await load()
+        if obj is None:
+            return None
+        payload = make_payload(
+            scheme, obj, last_modified(obj) if last_modified else None
+        )
+        self.set(key, payload)
+        return payload
+
+
+@cache
+def _adapter(scheme: Any) -> TypeAdapter:
+    return TypeAdapter(scheme)
+
+
+def dump_json(scheme: Any, obj: Any) -> bytes:
+    """Serialize ORM objects the way a `response_model=scheme` route would."""
+    adapter = _adapter(scheme)
+    return adapter.dump_json(adapter.validate_python(obj, from_attributes=True))
+
+
+def make_payload(
+    scheme: Any, obj: Any, last_modified: Optional[datetime] = None
+) -> CachedPayload:
+    body = dump_json(scheme, obj)
+    # strong validator: the same bytes always get the same tag
+    etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+    return CachedPayload(body=body, etag=etag, last_modified=last_modified)
+
+
+catalog_cache = TTLCache(
+    "catalog",
+    maxsize=settings.CATALOG_CACHE_MAXSIZE,
+    ttl=settings.CATALOG_CACHE_TTL_SECONDS,
+)
+
+cart_pricing_cache = TTLCache(
+    "cart_pricing",
+    maxsize=settings.CART_PRICING_CACHE_MAXSIZE,
+    ttl=settings.CART_PRICING_CACHE_TTL_SECONDS,
+)
+
+CATEGORIES_KEY = "categories"
+CATEGORY_TREE_KEY = "category-tree"
+BRANDS_KEY = "brands"
+
+
+def product_key(product_id: int) -> str:
+    return f"product:{product_id}"
+
+
+def product_images_key(product_id: int) -> str:
+    return f"product:{product_id}:images"
+
+
+def product_related_key(product_id: int) -> str:
+    return f"product:{product_id}:related"
+
+
+def product_slug_key(slug: str) -> str:
+    # maps a slug to the product id, so a product body is cached only once
+    return f"product-slug:{slug}"
+
+
+def category_key(slug: str) -> str:
+    return f"category:{slug}"
+
+
+def brand_key(slug: str) -> str:
+    return f"brand:{slug}"
+
+
+def priced_cart_key(cart_id: int, version: int, promo_code: Optional[str]) -> str:
+    return f"cart:{cart_id}:{version}:{promo_code or ''}"
+
+
+def invalidate_product(product_id: int, *slugs: Optional[str]) -> None:
+    catalog_cache.delete(
+        product_key(product_id),
+        product_images_key(product_id),
+        product_related_key(product_id),
+        *(product_slug_key(s) for s in slugs if s),
+    )
+
+
+def invalidate_categories(*slugs: Optional[str]) -> None:
+    catalog_cache.delete(
+        CATEGORIES_KEY, CATEGORY_TREE_KEY, *(category_key(s) for s in slugs if s)
+    )
+
+
+def invalidate_brands(*slugs: Optional[str]) -> None:
+    catalog_cache.delete(BRANDS_KEY, *(brand_key(s) for s in slugs if s))
@@ -1,5 +1,10 @@
+import os
+
 from celery import Celery
+from celery.signals import worker_process_shutdown, worker_ready
+from prometheus_client import multiprocess
 
+from core.prometheus import start_worker_exporter
 from core.settings import settings
 
 celery_app = Celery(
@@ -9,3 +14,38 @@ celery_app = Celery(
 )
 
 celery_app.autodiscover_tasks(['tasks'])
+
+celery_app.conf.beat_schedule = {
+    "repair-product-summaries": {
+        "task": "tasks.product_tasks.repair_product_summaries_task",
+        "schedule": settings.PRODUCT_SUMMARY_REPAIR_INTERVAL_SECONDS,
+    },
+    "rebuild-related-products": {
+        "task": "tasks.product_tasks.rebuild_related_products_task",
+        "schedule": settings.RELATED_PRODUCTS_INTERVAL_SECONDS,
+    },
+    "collect-media-garbage": {
+        "task": "tasks.product_tasks.collect_media_garbage_task",
+        "schedule": settings.MEDIA_GC_INTERVAL_SECONDS,
+    },
+    "sweep-abandoned-carts": {
+        "task": "tasks.cart_tasks.sweep_abandoned_carts_task",
+        "schedule": settings.CART_SWEEP_INTERVAL_SECONDS,
+    },
+    "release-expired-reservations": {
+        "task": "tasks.order_tasks.release_expired_reservations_task",
+        "schedule": settings.RESERVATION_SWEEP_INTERVAL_SECONDS,
+    },
+}
+
+
+@worker_ready.connect
+def start_metrics_exporter(**kwargs) -> None:
+    if settings.PROMETHEUS_ENABLED and settings.PROMETHEUS_WORKER_PORT:
+        start_worker_exporter(settings.PROMETHEUS_WORKER_PORT)
+
+
+@worker_process_shutdown.connect
+def drop_process_metrics(pid: int | None = None, **kwargs) -> None:
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid or os.getpid())
@@ -30,6 +30,9 @@ class BaseAppConfig(BaseSettings):
     PROMETHEUS_ENABLED: bool = True
     PROMETHEUS_PATH: str = "/metrics"
     PROMETHEUS_METRICS_KEY: str = "secret"
+    # the Celery worker serves its own metrics (maintenance jobs) on this
+    # port; 0 turns the exporter off
+    PROMETHEUS_WORKER_PORT: int = 9808
 
     model_config = SettingsConfigDict(
         validate_assignment=True,
@@ -14,10 +14,14 @@ class BrokerConfig(BaseSettings):
     RABBITMQ_PORT: int | None = None
     RABBITMQ_VHOST: str = "/"
 
+    @property
+    def REDIS_URL(self):
+        return f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}/{self.REDIS_DB}"
+
     @property
     def CELERY_BROKER_URL(self):
         if self.BROKER == "redis":
-            return f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}/{self.REDIS_DB}"
+            return self.REDIS_URL
 
         return (
             f"amqp://{self.RABBITMQ_USER}:{self.RABBITMQ_PASSWORD}"
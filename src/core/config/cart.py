@@ -0,0 +1,28 @@
+from pydantic_settings import BaseSettings
+
+
+class CartConfig(BaseSettings):
+    # Carts of anonymous visitors, keyed by a signed cookie: "redis" (shared
+    # by all workers, REDIS_* settings) or "memory" (one process; dev, tests)
+    GUEST_CART_STORE: str = "memory"
+    GUEST_CART_COOKIE: str = "guest_cart"
+    # a guest cart (and its cookie) expires this long after its last change
+    GUEST_CART_TTL_SECONDS: int = 30 * 24 * 60 * 60
+    # distinct variants one guest cart may hold
+    GUEST_CART_MAX_ITEMS: int = 100
+
+    # Priced carts (GET /carts/) cached per cart version and promo code; the
+    # TTL bounds how long a price or stock change of a variant goes unseen
+    CART_PRICING_CACHE_MAXSIZE: int = 10_000
+    CART_PRICING_CACHE_TTL_SECONDS: int = 30
+
+    # Abandoned carts: a periodic job deletes cart lines untouched for
+    # CART_ITEM_EXPIRE_DAYS, then carts empty for as long. BATCH_SIZE rows
+    # per transaction; after each batch it sleeps as long as the batch took
+    # (at least PAUSE), so it backs off when the database is busy, and it
+    # stops after MAX_SECONDS (the next run carries on)
+    CART_ITEM_EXPIRE_DAYS: int = 60
+    CART_SWEEP_INTERVAL_SECONDS: int = 60 * 60
+    CART_SWEEP_BATCH_SIZE: int = 1000
+    CART_SWEEP_PAUSE_SECONDS: float = 0.2
+    CART_SWEEP_MAX_SECONDS: int = 10 * 60
@@ -0,0 +1,40 @@
+from pathlib import Path
+
+from pydantic_settings import BaseSettings
+
+from core.config.base import BASE_DIR
+
+
+class CatalogConfig(BaseSettings):
+    # Upper bounds of the price facet buckets; the last bucket is open-ended
+    FACET_PRICE_BUCKETS: list[int] = [10, 25, 50, 100, 250, 500, 1000]
+    # Rebuild the in-memory facet index from the database after this many
+    # seconds, to pick up writes made by other workers
+    FACET_INDEX_TTL_SECONDS: int = 300
+    # Same for the in-memory prefix index behind /products/suggest
+    SUGGEST_INDEX_TTL_SECONDS: int = 300
+
+    # In-process cache of catalog response bodies (products, categories, brands)
+    CATALOG_CACHE_MAXSIZE: int = 10_000
+    CATALOG_CACHE_TTL_SECONDS: int = 60
+
+    # Bulk product import: rows per multi-row INSERT / transaction, how many
+    # row errors a job keeps, and where uploads wait for a background worker
+    PRODUCT_IMPORT_BATCH_SIZE: int = 500
+    PRODUCT_IMPORT_MAX_ERRORS: int = 1000
+    PRODUCT_IMPORT_DIR: Path = BASE_DIR / "var" / "imports"
+
+    # Periodic job recomputing the product summary columns (price range,
+    # stock, main image) from variants and images, in batches of product ids
+    PRODUCT_SUMMARY_REPAIR_INTERVAL_SECONDS: int = 6 * 60 * 60
+    PRODUCT_SUMMARY_REPAIR_BATCH_SIZE: int = 5000
+
+    # "Frequently bought together": a daily job keeps the TOP_K products most
+    # often ordered with each product (in at least MIN_SCORE orders), reading
+    # the lines of BATCH_SIZE orders at a time; orders with more than
+    # MAX_BASKET distinct products are ignored
+    RELATED_PRODUCTS_INTERVAL_SECONDS: int = 24 * 60 * 60
+    RELATED_PRODUCTS_TOP_K: int = 20
+    RELATED_PRODUCTS_MIN_SCORE: int = 2
+    RELATED_PRODUCTS_MAX_BASKET: int = 50
+    RELATED_PRODUCTS_BATCH_SIZE: int = 50_000
@@ -15,6 +15,9 @@ class DatabaseConfig(BaseSettings):
 
     ENV: str = "dev"
 
+    # Rows fetched per round trip by the server-side cursors of streaming exports
+    EXPORT_BATCH_SIZE: int = 1000
+
     @property
     def DATABASE_URL(self):
         if self.ENV == "dev" or self.DB_ENGINE == "sqlite":
@@ -0,0 +1,36 @@
+from typing import Optional
+
+from pydantic_settings import BaseSettings
+
+
+class MediaConfig(BaseSettings):
+    # Renditions generated for every uploaded product image: name -> longest
+    # side in pixels (never upscaled), each saved in every format listed
+    IMAGE_RENDITION_SIZES: dict[str, int] = {
+        "thumbnail": 160,
+        "medium": 640,
+        "large": 1280,
+    }
+    IMAGE_RENDITION_FORMATS: list[str] = ["webp", "jpeg"]
+    IMAGE_RENDITION_QUALITY: int = 82
+    # Process pool resizing images for the API process when there is no
+    # Celery worker (ENV != "prod")
+    IMAGE_PROCESS_WORKERS: int = 2
+    # Uploaded images are streamed to disk in chunks of UPLOAD_CHUNK_SIZE
+    # bytes and rejected (413) as soon as they exceed UPLOAD_MAX_IMAGE_BYTES
+    UPLOAD_CHUNK_SIZE: int = 64 * 1024
+    UPLOAD_MAX_IMAGE_BYTES: int = 10 * 1024 * 1024
+    # Uploads are stored once per content under MEDIA_ROOT/MEDIA_BLOB_DIR,
+    # by SHA-256 (images/ab/cd/abcd….jpg). Blobs no product image refers to
+    # are removed by the GC job once unreferenced for MEDIA_GC_GRACE_SECONDS
+    # (an upload is attached to a product some time after it's stored).
+    MEDIA_BLOB_DIR: str = "images"
+    MEDIA_GC_GRACE_SECONDS: int = 24 * 60 * 60
+    MEDIA_GC_INTERVAL_SECONDS: int = 6 * 60 * 60
+    # Browser/CDN cache lifetime of media whose names aren't content hashes
+    # (content-addressed files are cached for a year as immutable)
+    MEDIA_CACHE_MAX_AGE: int = 60 * 60
+    # Set behind nginx (e.g. "/protected-media/", an `internal` location
+    # aliased to MEDIA_ROOT): media responses then carry X-Accel-Redirect
+    # and nginx sends the file instead of the app
+    MEDIA_ACCEL_REDIRECT_PREFIX: Optional[str] = None
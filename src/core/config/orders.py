@@ -0,0 +1,11 @@
+from pydantic_settings import BaseSettings
+
+
+class OrderConfig(BaseSettings):
+    # Checkout holds the stock of an order for this long; unpaid by then,
+    # the order is cancelled and the units go back on sale
+    STOCK_RESERVATION_TTL_SECONDS: int = 30 * 60
+    # Periodic release of expired holds, the holds of BATCH_SIZE orders per
+    # transaction
+    RESERVATION_SWEEP_INTERVAL_SECONDS: int = 60
+    RESERVATION_SWEEP_BATCH_SIZE: int = 500
@@ -1,3 +1,5 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from functools import cache
 
 from sqlalchemy.ext.asyncio import (
@@ -6,6 +8,7 @@ from sqlalchemy.ext.asyncio import (
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.pool import NullPool
 
 from core.settings import settings
 
@@ -29,3 +32,18 @@ def get_async_session_maker() -> async_sessionmaker[AsyncSession]:
         engine,
         expire_on_commit=False,
     )
+
+
+@asynccontextmanager
+async def task_session() -> AsyncIterator[AsyncSession]:
+    """
+    Session for code run under `asyncio.run()` (Celery tasks): every call gets
+    its own event loop, which pooled connections of the cached engine would
+    outlive, so this uses a throwaway engine without a pool.
+    """
+    engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+    try:
+        async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+            yield session
+    finally:
+        await engine.dispose()
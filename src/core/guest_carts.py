@@ -0,0 +1,172 @@
+# src/core/guest_carts.py
+"""
+Carts of anonymous visitors.
+
+A guest cart is a small mapping variant id -> quantity kept out of the
+database, under a random id sent to the browser in a signed cookie: in
+Redis (one hash per cart, shared by all workers) or, for dev and tests, in
+process memory. Every write pushes its expiry back by GUEST_CART_TTL_SECONDS,
+so abandoned carts disappear by themselves. On login the cart is merged into
+the user's database cart (`CartService.merge_guest_cart`).
+"""
+
+import secrets
+import time
+from functools import cache
+from typing import Optional
+
+from fastapi import Request, Response
+from redis.asyncio import Redis
+
+from core.security import sign_value, unsign_value
+from core.settings import settings
+
+_COOKIE_SALT = "guest-cart"
+
+
+def new_guest_cart_id() -> str:
+    return secrets.token_urlsafe(16)
+
+
+def read_guest_cart_cookie(request: Request) -> Optional[str]:
+    """The guest cart id of the request; None without a (valid) cookie."""
+    signed = request.cookies.get(settings.GUEST_CART_COOKIE)
+    return unsign_value(signed, _COOKIE_SALT) if signed else None
+
+
+def set_guest_cart_cookie(response: Response, cart_id: str) -> None:
+    response.set_cookie(
+        settings.GUEST_CART_COOKIE,
+        sign_value(cart_id, _COOKIE_SALT),
+        max_age=settings.GUEST_CART_TTL_SECONDS,
+        httponly=True,
+        secure=settings.ENV == "prod",
+        samesite="lax",
+    )
+
+
+def delete_guest_cart_cookie(response: Response) -> None:
+    response.delete_cookie(settings.GUEST_CART_COOKIE)
+
+
+class MemoryGuestCartStore:
+    """Guest carts in this process only; expired carts are purged lazily."""
+
+    # writes between two scans for expired carts nobody came back to
+    PURGE_EVERY = 1000
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self._carts: dict[str, tuple[float, dict[int, int]]] = {}
+        self._writes = 0
+
+    def __len__(self) -> int:
+        return len(self._carts)
+
+    def _items(self, cart_id: str) -> Optional[dict[int, int]]:
+        entry = self._carts.get(cart_id)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self._carts[cart_id]
+            entry = None
+        return entry[1] if entry is not None else None
+
+    def _touch(self, cart_id: str) -> dict[int, int]:
+        """The items of a cart (created if needed), its expiry pushed back."""
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            self.purge_expired()
+        items = self._items(cart_id)
+        if items is None:
+            items = {}
+        self._carts[cart_id] = (time.monotonic() + self.ttl, items)
+        return items
+
+    def purge_expired(self) -> None:
+        now = time.monotonic()
+        for cart_id in [key for key, (exp, _) in self._carts.items() if exp <= now]:
+            del self._carts[cart_id]
+
+    async def get(self, cart_id: str) -> dict[int, int]:
+        return dict(self._items(cart_id) or {})
+
+    async def add(self, cart_id: str, variant_id: int, quantity: int) -> int:
+        items = self._touch(cart_id)
+        items[variant_id] = items.get(variant_id, 0) + quantity
+        return items[variant_id]
+
+    async def set(self, cart_id: str, variant_id: int, quantity: int) -> None:
+        self._touch(cart_id)[variant_id] = quantity
+
+    async def remove(self, cart_id: str, variant_id: int) -> bool:
+        if variant_id not in (self._items(cart_id) or {}):
+            return False
+        del self._touch(cart_id)[variant_id]
+        return True
+
+    async def clear(self, cart_id: str) -> None:
+        self._carts.pop(cart_id, None)
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisGuestCartStore:
+    """
+    Guest carts as Redis hashes (variant id -> quantity). Each write and the
+    expiry refresh go in one MULTI/EXEC round trip.
+    """
+
+    def __init__(self, client: Redis, ttl: int) -> None:
+        self.client = client
+        self.ttl = ttl
+
+    @staticmethod
+    def _key(cart_id: str) -> str:
+        return f"guest_cart:{cart_id}"
+
+    async def get(self, cart_id: str) -> dict[int, int]:
+        items = await self.client.hgetall(self._key(cart_id))
+        return {
+            int(variant_id): int(quantity) for variant_id, quantity in items.items()
+        }
+
+    async def add(self, cart_id: str, variant_id: int, quantity: int) -> int:
+        key = self._key(cart_id)
+        async with self.client.pipeline() as pipe:
+            pipe.hincrby(key, str(variant_id), quantity)
+            pipe.expire(key, self.ttl)
+            quantity, _ = await pipe.execute()
+        return quantity
+
+    async def set(self, cart_id: str, variant_id: int, quantity: int) -> None:
+        key = self._key(cart_id)
+        async with self.client.pipeline() as pipe:
+            pipe.hset(key, str(variant_id), quantity)
+            pipe.expire(key, self.ttl)
+            await pipe.execute()
+
+    async def remove(self, cart_id: str, variant_id: int) -> bool:
+        key = self._key(cart_id)
+        async with self.client.pipeline() as pipe:
+            pipe.hdel(key, str(variant_id))
+            pipe.expire(key, self.ttl)
+            removed, _ = await pipe.execute()
+        return removed > 0
+
+    async def clear(self, cart_id: str) -> None:
+        await self.client.delete(self._key(cart_id))
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+GuestCartStore = MemoryGuestCartStore | RedisGuestCartStore
+
+
+@cache
+def get_guest_cart_store() -> GuestCartStore:
+    if settings.GUEST_CART_STORE == "redis":
+        return RedisGuestCartStore(
+            Redis.from_url(settings.REDIS_URL), settings.GUEST_CART_TTL_SECONDS
+        )
+    return MemoryGuestCartStore(settings.GUEST_CART_TTL_SECONDS)
@@ -0,0 +1,48 @@
+# src/core/indexes.py
+"""
+Loading of the in-memory indexes each worker process keeps (facets,
+typeahead suggestions).
+
+An index is built by the first request that needs it. Once it is older
+than its TTL it keeps serving while one rebuild at a time runs in the
+background, with a session of its own.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Coroutine, Optional, Protocol
+
+
+class LoadedIndex(Protocol):
+    # monotonic time of the last build, None until the first one
+    loaded_at: Optional[float]
+
+
+class IndexLoader:
+    def __init__(
+        self,
+        rebuild: Callable[[], Coroutine[Any, Any, None]],
+        ttl: Callable[[], float],
+    ) -> None:
+        """`rebuild` opens its own session; `ttl` reads the setting."""
+        self.rebuild = rebuild
+        self.ttl = ttl
+        self._lock = asyncio.Lock()
+        self._background: Optional[asyncio.Task] = None
+
+    async def ensure_loaded(
+        self, index: LoadedIndex, build: Callable[[], Awaitable[None]]
+    ) -> None:
+        """
+        Build `index` with `build` (the caller's session) on first use, else
+        start a background rebuild if it is stale and none is running.
+        """
+        if index.loaded_at is None:
+            async with self._lock:
+                if index.loaded_at is None:
+                    await build()
+            return
+
+        age = time.monotonic() - index.loaded_at
+        if age >= self.ttl() and (self._background is None or self._background.done()):
+            self._background = asyncio.create_task(self.rebuild())
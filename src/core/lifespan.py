@@ -1,15 +1,35 @@
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
+from loguru import logger
 
 from core.database import get_async_db_engine
+from core.guest_carts import get_guest_cart_store
 from core.requests import get_http_transport
+from services.facet_service import rebuild_facet_index
+from services.image_service import shutdown_image_pool
+from services.suggest_service import rebuild_suggest_index
+
+
+async def warm_up() -> None:
+    """Build in-memory catalog indexes before the first request needs them."""
+    for name, rebuild in (
+        ("Facet", rebuild_facet_index),
+        ("Suggest", rebuild_suggest_index),
+    ):
+        try:
+            await rebuild()
+        except Exception as exc:  # the app must still start, e.g. before migrations
+            logger.warning("{} index warm-up failed: {}", name, exc)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     app.state.db_engine = get_async_db_engine()
     app.state.http_transport = get_http_transport()
+    await warm_up()
     yield
     await app.state.db_engine.dispose()
     await app.state.http_transport.aclose()
+    await get_guest_cart_store().close()
+    shutdown_image_pool()
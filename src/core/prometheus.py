@@ -1,10 +1,19 @@
+import os
 import time
 from collections.abc import Awaitable, Callable
 from dataclasses import dataclass
 from functools import cache
 
 from fastapi import Request, Response
-from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    multiprocess,
+    start_http_server,
+)
 from starlette.middleware.base import BaseHTTPMiddleware
 
 from core.settings import settings
@@ -41,6 +50,65 @@ def get_metrics() -> Metrics:
     )
 
 
+@dataclass
+class CacheMetrics:
+    hits: Counter
+    misses: Counter
+    evictions: Counter
+
+
+@cache
+def get_cache_metrics() -> CacheMetrics:
+    prefix = settings.APP_NAME.replace("-", "_")
+    return CacheMetrics(
+        hits=Counter(f"{prefix}_cache_hits_total", "Cache hits", ["cache"]),
+        misses=Counter(f"{prefix}_cache_misses_total", "Cache misses", ["cache"]),
+        evictions=Counter(
+            f"{prefix}_cache_evictions_total",
+            "Cache entries dropped for size or expiry",
+            ["cache", "reason"],
+        ),
+    )
+
+
+@dataclass
+class MaintenanceMetrics:
+    rows_removed: Counter
+    batch_latency: Histogram
+
+
+@cache
+def get_maintenance_metrics() -> MaintenanceMetrics:
+    prefix = settings.APP_NAME.replace("-", "_")
+    return MaintenanceMetrics(
+        rows_removed=Counter(
+            f"{prefix}_maintenance_rows_removed_total",
+            "Rows deleted by periodic maintenance jobs",
+            ["job", "table"],
+        ),
+        batch_latency=Histogram(
+            f"{prefix}_maintenance_batch_duration_seconds",
+            "Duration of one maintenance batch transaction (seconds)",
+            ["job", "table"],
+            buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+        ),
+    )
+
+
+def start_worker_exporter(port: int) -> None:
+    """
+    Serve the metrics of a Celery worker over HTTP. Only the API's /metrics
+    is scraped otherwise, and the maintenance jobs run in the worker. With a
+    prefork pool each process counts on its own, so PROMETHEUS_MULTIPROC_DIR
+    must be set for the exporter to serve their sum.
+    """
+    registry = REGISTRY
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    start_http_server(port, registry=registry)
+
+
 def _get_route_path(request: Request) -> str:
     """
     Return the route template path if available (e.g. "/api/users/{user_id}"),
@@ -1,3 +1,5 @@
+import hashlib
+import hmac
 import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Optional, Union
@@ -105,3 +107,21 @@ def decode_token(token: str) -> Dict[str, Any]:
         raise ExpiredSignatureError("token_expired") from e
     except JWTError as e:
         raise JWTError("invalid_token") from e
+
+
+# Signed values (e.g. cookies): "<value>.<HMAC-SHA256 of value>"
+def _signature(value: str, salt: str) -> str:
+    key = f"{salt}:{settings.SECRET_KEY}".encode()
+    return hmac.new(key, value.encode(), hashlib.sha256).hexdigest()
+
+
+def sign_value(value: str, salt: str) -> str:
+    return f"{value}.{_signature(value, salt)}"
+
+
+def unsign_value(signed: str, salt: str) -> Optional[str]:
+    """The value of `sign_value(value, salt)`; None if tampered with."""
+    value, _, signature = signed.rpartition(".")
+    if not value or not hmac.compare_digest(signature, _signature(value, salt)):
+        return None
+    return value
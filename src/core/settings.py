@@ -3,8 +3,12 @@ from functools import lru_cache
 from core.config.auth import AuthConfig
 from core.config.base import BaseAppConfig
 from core.config.broker import BrokerConfig
+from core.config.cart import CartConfig
+from core.config.catalog import CatalogConfig
 from core.config.database import DatabaseConfig
 from core.config.email import EmailConfig
+from core.config.media import MediaConfig
+from core.config.orders import OrderConfig
 from core.config.social import SocialAuthConfig
 from core.config.stripe import StripeConfig
 
@@ -17,6 +21,10 @@ class Settings(
     BrokerConfig,
     EmailConfig,
     SocialAuthConfig,
+    CatalogConfig,
+    MediaConfig,
+    CartConfig,
+    OrderConfig,
 ):
     pass
 
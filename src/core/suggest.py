@@ -0,0 +1,202 @@
+# src/core/suggest.py
+"""
+In-memory prefix index for search-box suggestions.
+
+Product titles, brand names and category names are split into normalized
+words; the distinct words are kept in one sorted list, so the words starting
+with a typed prefix are a contiguous slice found by binary search, and each
+word maps to the entries containing it. Matches are ranked by popularity
+(units sold of the product, or of all products of the brand / category).
+
+The index is built once per worker (see `services.suggest_service`) and then
+updated in place by catalog writes, like the `invalidate_*` helpers of
+`core.cache`; a periodic rebuild picks up writes made by other workers.
+"""
+
+import heapq
+import re
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from dataclasses import dataclass, field
+from typing import Iterable, Literal, Optional
+
+SuggestionKind = Literal["product", "brand", "category"]
+
+_WORD = re.compile(r"\w+")
+
+# Most suggestions one query returns
+MAX_SUGGESTIONS = 50
+# One- and two-letter prefixes match a large part of the catalog; their
+# rankings are cached until the next write
+CACHED_PREFIX_LENGTH = 2
+
+
+def normalize_words(text: str) -> list[str]:
+    """Case-folded words of `text` with accents stripped: "Café Noir" -> cafe, noir."""
+    text = text.casefold()
+    if not text.isascii():
+        decomposed = unicodedata.normalize("NFKD", text)
+        text = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _WORD.findall(text)
+
+
+@dataclass(eq=False)
+class Suggestion:
+    kind: SuggestionKind
+    id: int
+    text: str
+    slug: Optional[str] = None
+    popularity: int = 0
+    # products only: whose popularity a sale also adds to
+    brand_id: Optional[int] = None
+    category_id: Optional[int] = None
+    words: frozenset[str] = field(default_factory=frozenset)
+
+    @property
+    def key(self) -> tuple[str, int]:
+        return self.kind, self.id
+
+    def rank(self) -> tuple[int, int, int]:
+        # most popular first, then the shortest (closest) text, then oldest
+        return self.popularity, -len(self.text), -self.id
+
+
+class SuggestIndex:
+    def __init__(self) -> None:
+        self._reset()
+
+    def _reset(self) -> None:
+        self.words: list[str] = []
+        self.postings: dict[str, set[Suggestion]] = {}
+        self.entries: dict[tuple[str, int], Suggestion] = {}
+        self.ranked: dict[str, list[Suggestion]] = {}
+        self.loaded_at: float | None = None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    # Building
+
+    def build(self, entries: Iterable[Suggestion]) -> None:
+        """Replace the whole index, sorting the vocabulary once."""
+        self._reset()
+        for entry in entries:
+            self._add(entry, sort=False)
+        self.words = sorted(self.postings)
+        self.loaded_at = time.monotonic()
+
+    def _add(self, entry: Suggestion, sort: bool = True) -> None:
+        self.ranked.clear()
+        entry.words = frozenset(normalize_words(entry.text))
+        self.entries[entry.key] = entry
+        for word in entry.words:
+            posting = self.postings.get(word)
+            if posting is None:
+                posting = self.postings[word] = set()
+                if sort:
+                    insort(self.words, word)
+            posting.add(entry)
+
+    def remove(self, kind: SuggestionKind, id: int) -> None:
+        entry = self.entries.pop((kind, id), None)
+        if entry is None:
+            return
+        self.ranked.clear()
+        for word in entry.words:
+            posting = self.postings[word]
+            posting.discard(entry)
+            if not posting:
+                del self.postings[word]
+                del self.words[bisect_left(self.words, word)]
+
+    def put(self, entry: Suggestion) -> None:
+        """Add or replace an entry, keeping its popularity (no-op until built)."""
+        if self.loaded_at is None:
+            return
+        old = self.entries.get(entry.key)
+        if old is not None:
+            entry.popularity = old.popularity
+            self.remove(entry.kind, entry.id)
+        self._add(entry)
+
+    def put_product(
+        self,
+        id: int,
+        title: str,
+        slug: str,
+        brand_id: Optional[int],
+        category_id: Optional[int],
+        is_active: bool = True,
+    ) -> None:
+        if not is_active:
+            self.remove("product", id)
+            return
+        self.put(
+            Suggestion(
+                "product",
+                id,
+                title,
+                slug,
+                brand_id=brand_id,
+                category_id=category_id,
+            )
+        )
+
+    def record_sales(self, units: dict[int, int]) -> None:
+        """Add sold units (by product id) to products, their brands and categories."""
+        self.ranked.clear()
+        for product_id, quantity in units.items():
+            product = self.entries.get(("product", product_id))
+            if product is None:
+                continue
+            product.popularity += quantity
+            for kind, owner_id in (
+                ("brand", product.brand_id),
+                ("category", product.category_id),
+            ):
+                if owner_id is None:
+                    continue
+                if (owner := self.entries.get((kind, owner_id))) is not None:
+                    owner.popularity += quantity
+
+    # Querying
+
+    def _matching(self, prefix: str) -> set[Suggestion]:
+        start = bisect_left(self.words, prefix)
+        end = bisect_left(self.words, prefix + "\U0010ffff", lo=start)
+        if end - start == 1:
+            return self.postings[self.words[start]]
+        matched: set[Suggestion] = set()
+        for word in self.words[start:end]:
+            matched.update(self.postings[word])
+        return matched
+
+    def search(self, query: str, limit: int = 10) -> list[Suggestion]:
+        """
+        Entries with a word starting with each word of `query` ("app iph"
+        finds "Apple iPhone 15"), most popular first.
+        """
+        prefixes = sorted(set(normalize_words(query)), key=len, reverse=True)
+        if not prefixes:
+            return []
+        limit = min(limit, MAX_SUGGESTIONS)
+        if len(prefixes) == 1 and len(prefixes[0]) <= CACHED_PREFIX_LENGTH:
+            ranked = self.ranked.get(prefixes[0])
+            if ranked is None:
+                ranked = self.ranked[prefixes[0]] = heapq.nlargest(
+                    MAX_SUGGESTIONS, self._matching(prefixes[0]), key=Suggestion.rank
+                )
+            return ranked[:limit]
+        # the longest prefix usually matches the fewest entries
+        candidates: Iterable[Suggestion] = self._matching(prefixes[0])
+        for prefix in prefixes[1:]:
+            candidates = [
+                entry
+                for entry in candidates
+                if any(word.startswith(prefix) for word in entry.words)
+            ]
+        return heapq.nlargest(limit, candidates, key=Suggestion.rank)
+
+
+suggest_index = SuggestIndex()
@@ -5,9 +5,22 @@ from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.cache import (
+    BRANDS_KEY,
+    CachedPayload,
+    brand_key,
+    catalog_cache,
+    invalidate_brands,
+)
+from core.suggest import Suggestion, suggest_index
+from db.crud.search import ProductSearchCRUD
 from db.dependencies.sessions import get_db_session
 from db.models.brands import Brand
-from schemas.brand import BrandCreateScheme, BrandUpdateScheme
+from schemas.brand import (
+    BrandCreateScheme,
+    BrandOutScheme,
+    BrandUpdateScheme,
+)
 
 
 class BrandCRUD:
@@ -15,38 +28,65 @@ class BrandCRUD:
         self.session = session
 
     async def get_all(self) -> Sequence[Brand]:
-        result = await self.session.execute(select(Brand))
+        result = await self.session.execute(select(Brand).order_by(Brand.id))
         return result.scalars().all()
 
+    async def get_all_payload(self) -> CachedPayload:
+        """`get_all()` serialized, served from the catalog cache."""
+        return await catalog_cache.get_or_load(
+            BRANDS_KEY, self.get_all, list[BrandOutScheme]
+        )
+
     async def get_by_id(self, brand_id: int) -> Optional[Brand]:
         result = await self.session.execute(select(Brand).where(Brand.id == brand_id))
         return result.scalars().first()
 
-    async def get_by_slug(self, brand_slug: int) -> Optional[Brand]:
+    async def get_by_slug(self, brand_slug: str) -> Optional[Brand]:
         result = await self.session.execute(
             select(Brand).where(Brand.slug == brand_slug)
         )
         return result.scalars().first()
 
+    async def get_by_slug_payload(self, slug: str) -> Optional[CachedPayload]:
+        return await catalog_cache.get_or_load(
+            brand_key(slug),
+            lambda: self.get_by_slug(slug),
+            BrandOutScheme,
+            last_modified=lambda brand: brand.updated_at,
+        )
+
     async def create(self, data: BrandCreateScheme) -> Brand:
         new_brand = Brand(**data.dict())
         self.session.add(new_brand)
         try:
             await self.session.commit()
+            invalidate_brands()
             await self.session.refresh(new_brand)
+            suggest_index.put(
+                Suggestion("brand", new_brand.id, new_brand.name, new_brand.slug)
+            )
             return new_brand
         except IntegrityError:
             await self.session.rollback()
             raise HTTPException(status_code=400, detail="Brand already exists")
 
     async def update(self, brand: Brand, data: BrandUpdateScheme) -> Brand:
-        for field, value in data.dict(exclude_unset=True).items():
+        payload = data.dict(exclude_unset=True)
+        old_slug = brand.slug
+        for field, value in payload.items():
             setattr(brand, field, value)
 
         try:
             self.session.add(brand)
+            if "name" in payload:
+                # product search documents embed the brand name
+                await self.session.flush()
+                await ProductSearchCRUD(self.session).reindex_related(brand_id=brand.id)
             await self.session.commit()
+            invalidate_brands(old_slug, brand.slug)
             await self.session.refresh(brand)
+            suggest_index.put(Suggestion("brand", brand.id, brand.name, brand.slug))
+            return brand
         except IntegrityError:
             await self.session.rollback()
             raise HTTPException(
@@ -54,5 +94,8 @@ class BrandCRUD:
             )
 
     async def delete(self, brand: Brand) -> None:
+        brand_id, slug = brand.id, brand.slug
         await self.session.delete(brand)
         await self.session.commit()
+        invalidate_brands(slug)
+        suggest_index.remove("brand", brand_id)
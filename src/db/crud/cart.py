@@ -1,9 +1,16 @@
 # src/crud/cart_crud.py
 from __future__ import annotations
 
+from datetime import datetime
+from decimal import Decimal
+from typing import cast
+
 from fastapi import Depends
-from sqlalchemy import delete, select
+from sqlalchemy import and_, delete, exists, func, literal, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import CursorResult
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from db.dependencies.sessions import get_db_session
 from db.models.carts import Cart, CartItem
@@ -14,49 +21,287 @@ class CartCRUD:
     def __init__(self, session: AsyncSession = Depends(get_db_session)):
         self.session = session
 
+    @property
+    def dialect(self) -> str:
+        return self.session.get_bind().dialect.name
+
+    def _insert(self, model):
+        """INSERT supporting ON CONFLICT, for the database in use."""
+        dialect = postgresql if self.dialect == "postgresql" else sqlite
+        return dialect.insert(model)
+
+    def _cart_id(self, user_id: int):
+        return select(Cart.id).where(Cart.user_id == user_id).scalar_subquery()
+
+    @staticmethod
+    def _variant_column(variant_id: int, name: str):
+        column = getattr(ProductVariant, name)
+        return select(column).where(ProductVariant.id == variant_id).scalar_subquery()
+
+    async def _changed(self, user_id: int) -> None:
+        """Bump the version of the user's cart after a write to its items."""
+        await self.session.execute(
+            update(Cart).where(Cart.user_id == user_id).values(version=Cart.version + 1)
+        )
+
+    async def get_version(self, user_id: int):
+        """(cart id, version) of the user's cart, None without a cart."""
+        result = await self.session.execute(
+            select(Cart.id, Cart.version).where(Cart.user_id == user_id)
+        )
+        return result.first()
+
+    async def get_priced_lines(self, cart_id: int):
+        """
+        Lines of a cart with their variant's current sku, price, stock and
+        state, in one query: (id, variant_id, quantity, added_price, sku,
+        price, stock, is_active).
+        """
+        result = await self.session.execute(
+            select(
+                CartItem.id,
+                CartItem.variant_id,
+                CartItem.quantity,
+                CartItem.price.label("added_price"),
+                ProductVariant.sku,
+                ProductVariant.price,
+                ProductVariant.stock,
+                ProductVariant.is_active,
+            )
+            .join(ProductVariant, ProductVariant.id == CartItem.variant_id)
+            .where(CartItem.cart_id == cart_id)
+            .order_by(CartItem.id)
+        )
+        return result.all()
+
     async def get_cart_by_user(self, user_id: int) -> Cart | None:
-        result = await self.session.execute(select(Cart).where(Cart.user_id == user_id))
+        """The cart with its items as this transaction sees them."""
+        result = await self.session.execute(
+            select(Cart)
+            .where(Cart.user_id == user_id)
+            .options(selectinload(Cart.items))
+            .execution_options(populate_existing=True)
+        )
         return result.scalars().first()
 
-    async def create_cart_for_user(self, user_id: int) -> Cart:
-        cart = Cart(user_id=user_id)
-        self.session.add(cart)
-        await self.session.commit()
-        await self.session.refresh(cart)
-        return cart
+    async def ensure_cart(self, user_id: int) -> bool:
+        """Create the user's cart unless it exists (not committed)."""
+        result = cast(
+            CursorResult,
+            await self.session.execute(
+                self._insert(Cart)
+                .values(user_id=user_id)
+                .on_conflict_do_nothing(index_elements=[Cart.user_id])
+            ),
+        )
+        return result.rowcount > 0
+
+    async def upsert_item(
+        self, user_id: int, variant_id: int, quantity: int
+    ) -> int | None:
+        """
+        Add `quantity` of a variant to the user's cart with one INSERT ... ON
+        CONFLICT DO UPDATE. The line takes the variant's current price.
+        Nothing is written when the variant doesn't exist or hasn't the stock
+        for the new quantity, or the user has no cart yet.
+        Returns the line's quantity, None if nothing was written.
+        """
+        cart_id = self._cart_id(user_id)
+        stmt = self._insert(CartItem).from_select(
+            ["cart_id", "variant_id", "quantity", "price"],
+            select(
+                cart_id, ProductVariant.id, literal(quantity), ProductVariant.price
+            ).where(
+                cart_id.is_not(None),
+                ProductVariant.id == variant_id,
+                ProductVariant.stock >= quantity,
+            ),
+        )
+        new_quantity = CartItem.quantity + stmt.excluded.quantity
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CartItem.cart_id, CartItem.variant_id],
+            set_={
+                "quantity": new_quantity,
+                "price": stmt.excluded.price,
+                "updated_at": func.now(),
+            },
+            where=new_quantity <= self._variant_column(variant_id, "stock"),
+        ).returning(CartItem.quantity)
+        written = await self.session.scalar(stmt)
+        if written is not None:
+            await self._changed(user_id)
+        return written
+
+    async def set_item_quantity(
+        self, user_id: int, variant_id: int, quantity: int
+    ) -> int | None:
+        """
+        Set the quantity of a line already in the user's cart with one
+        UPDATE, at the variant's current price, if the variant has the
+        stock. Returns the quantity, None if nothing was written.
+        """
+        written = await self.session.scalar(
+            update(CartItem)
+            .where(
+                CartItem.cart_id == self._cart_id(user_id),
+                CartItem.variant_id == variant_id,
+                literal(quantity) <= self._variant_column(variant_id, "stock"),
+            )
+            .values(
+                quantity=quantity,
+                price=self._variant_column(variant_id, "price"),
+                updated_at=func.now(),
+            )
+            .returning(CartItem.quantity)
+            .execution_options(synchronize_session=False)
+        )
+        if written is not None:
+            await self._changed(user_id)
+        return written
 
-    async def get_item(self, cart_id: int, variant_id: int) -> CartItem | None:
+    async def get_lines(self, user_id: int, variant_ids: list[int]):
+        """
+        (variant id, sku, stock, price, quantity in the user's cart or None)
+        of each existing variant, in one query.
+        """
         result = await self.session.execute(
-            select(CartItem).where(
-                CartItem.cart_id == cart_id, CartItem.variant_id == variant_id
+            select(
+                ProductVariant.id,
+                ProductVariant.sku,
+                ProductVariant.stock,
+                ProductVariant.price,
+                CartItem.quantity,
             )
+            .outerjoin(
+                CartItem,
+                and_(
+                    CartItem.variant_id == ProductVariant.id,
+                    CartItem.cart_id == self._cart_id(user_id),
+                ),
+            )
+            .where(ProductVariant.id.in_(variant_ids))
         )
-        return result.scalars().first()
+        return result.all()
 
-    async def add_item(
-        self, cart: Cart, variant: ProductVariant, quantity: int
-    ) -> CartItem:
-        item = CartItem(
-            cart_id=cart.id,
-            variant_id=variant.id,
-            quantity=quantity,
-            price=variant.price,
+    async def get_variants(self, variant_ids: list[int]):
+        """(variant id, sku, stock, price) of each existing variant, in one query."""
+        result = await self.session.execute(
+            select(
+                ProductVariant.id,
+                ProductVariant.sku,
+                ProductVariant.stock,
+                ProductVariant.price,
+            ).where(ProductVariant.id.in_(variant_ids))
         )
-        self.session.add(item)
-        await self.session.commit()
-        await self.session.refresh(item)
-        return item
+        return result.all()
 
-    async def update_item_quantity(self, item: CartItem, quantity: int) -> CartItem:
-        item.quantity = quantity
-        await self.session.commit()
-        await self.session.refresh(item)
-        return item
+    async def set_items(
+        self, user_id: int, lines: dict[int, tuple[int, Decimal]]
+    ) -> None:
+        """
+        Set the quantity and price of several lines of the user's cart
+        (variant id -> (quantity, price)) with one multi-row upsert.
+        """
+        stmt = self._insert(CartItem).values(
+            [
+                {
+                    "cart_id": self._cart_id(user_id),
+                    "variant_id": variant_id,
+                    "quantity": quantity,
+                    "price": price,
+                }
+                for variant_id, (quantity, price) in lines.items()
+            ]
+        )
+        await self.session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[CartItem.cart_id, CartItem.variant_id],
+                set_={
+                    "quantity": stmt.excluded.quantity,
+                    "price": stmt.excluded.price,
+                    "updated_at": func.now(),
+                },
+            )
+        )
+        await self._changed(user_id)
 
-    async def remove_item(self, item: CartItem) -> None:
-        await self.session.delete(item)
-        await self.session.commit()
+    async def remove_items(self, user_id: int, variant_ids: list[int]) -> None:
+        await self.session.execute(
+            delete(CartItem).where(
+                CartItem.cart_id == self._cart_id(user_id),
+                CartItem.variant_id.in_(variant_ids),
+            )
+        )
+        await self._changed(user_id)
 
-    async def clear_cart(self, cart_id: int) -> None:
-        await self.session.execute(delete(CartItem).where(CartItem.cart_id == cart_id))
+    async def remove_item(self, user_id: int, variant_id: int) -> bool:
+        """Delete a variant's line from the user's cart; False if absent."""
+        result = cast(
+            CursorResult,
+            await self.session.execute(
+                delete(CartItem).where(
+                    CartItem.cart_id == self._cart_id(user_id),
+                    CartItem.variant_id == variant_id,
+                )
+            ),
+        )
+        if not result.rowcount:
+            return False
+        await self._changed(user_id)
+        return True
+
+    async def clear_cart(self, user_id: int) -> None:
+        await self.session.execute(
+            delete(CartItem).where(CartItem.cart_id == self._cart_id(user_id))
+        )
+        await self._changed(user_id)
         await self.session.commit()
+
+    async def delete_stale_items(self, before: datetime, limit: int) -> int:
+        """
+        Delete up to `limit` lines unchanged since `before`, oldest first, and
+        bump the versions of their carts (not committed). Returns the number
+        deleted.
+        """
+        stale = (
+            select(CartItem.id)
+            .where(CartItem.updated_at < before)
+            .order_by(CartItem.updated_at)
+            .limit(limit)
+        )
+        result = await self.session.execute(
+            delete(CartItem)
+            .where(CartItem.id.in_(stale))
+            .returning(CartItem.cart_id)
+            .execution_options(synchronize_session=False)
+        )
+        cart_ids = result.scalars().all()
+        if cart_ids:
+            # keep updated_at: a cart emptied here goes in the same sweep
+            await self.session.execute(
+                update(Cart)
+                .where(Cart.id.in_(set(cart_ids)))
+                .values(version=Cart.version + 1, updated_at=Cart.updated_at)
+            )
+        return len(cart_ids)
+
+    async def delete_empty_carts(self, before: datetime, limit: int) -> int:
+        """Delete up to `limit` carts without items unchanged since `before`."""
+        stale = (
+            select(Cart.id)
+            .where(
+                Cart.updated_at < before,
+                ~exists().where(CartItem.cart_id == Cart.id),
+            )
+            .order_by(Cart.updated_at)
+            .limit(limit)
+        )
+        result = cast(
+            CursorResult,
+            await self.session.execute(
+                delete(Cart)
+                .where(Cart.id.in_(stale))
+                .execution_options(synchronize_session=False)
+            ),
+        )
+        return result.rowcount
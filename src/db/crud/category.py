@@ -1,13 +1,37 @@
 from typing import Optional, Sequence
 
 from fastapi import Depends, HTTPException
-from sqlalchemy import select
+from sqlalchemy import delete, insert, literal, select, true
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.cache import (
+    CATEGORIES_KEY,
+    CATEGORY_TREE_KEY,
+    CachedPayload,
+    catalog_cache,
+    category_key,
+    invalidate_categories,
+)
+from core.suggest import Suggestion, suggest_index
+from db.crud.search import ProductSearchCRUD
 from db.dependencies.sessions import get_db_session
-from db.models.categories import Category
-from schemas.category import CategoryCreateScheme, CategoryUpdateScheme
+from db.models.categories import Category, CategoryClosure
+from schemas.category import (
+    CategoryCreateScheme,
+    CategoryOutScheme,
+    CategoryTreeScheme,
+    CategoryUpdateScheme,
+)
+
+CLOSURE_COLUMNS = ("ancestor_id", "descendant_id", "depth")
+
+
+def subtree_ids(category_id: int):
+    """Ids of a category and all its descendants, as a subquery."""
+    return select(CategoryClosure.descendant_id).where(
+        CategoryClosure.ancestor_id == category_id
+    )
 
 
 class CategoryCRUD:
@@ -15,9 +39,39 @@ class CategoryCRUD:
         self.session = session
 
     async def get_all(self) -> Sequence[Category]:
-        result = await self.session.execute(select(Category))
+        result = await self.session.execute(select(Category).order_by(Category.id))
         return result.scalars().all()
 
+    async def get_all_payload(self) -> CachedPayload:
+        """`get_all()` serialized, served from the catalog cache."""
+        return await catalog_cache.get_or_load(
+            CATEGORIES_KEY, self.get_all, list[CategoryOutScheme]
+        )
+
+    async def get_tree_payload(self) -> CachedPayload:
+        """All categories nested under their parents, from the catalog cache."""
+
+        async def load_tree() -> list[dict]:
+            nodes = {
+                category.id: {
+                    "id": category.id,
+                    "name": category.name,
+                    "slug": category.slug,
+                    "parent_id": category.parent_id,
+                    "children": [],
+                }
+                for category in await self.get_all()
+            }
+            roots: list[dict] = []
+            for node in nodes.values():
+                parent = nodes.get(node["parent_id"])
+                (parent["children"] if parent else roots).append(node)
+            return roots
+
+        return await catalog_cache.get_or_load(
+            CATEGORY_TREE_KEY, load_tree, list[CategoryTreeScheme]
+        )
+
     async def get_by_id(self, category_id: int) -> Optional[Category]:
         result = await self.session.execute(
             select(Category).where(Category.id == category_id)
@@ -30,24 +84,60 @@ class CategoryCRUD:
         )
         return result.scalars().first()
 
+    async def get_by_slug_payload(self, slug: str) -> Optional[CachedPayload]:
+        return await catalog_cache.get_or_load(
+            category_key(slug),
+            lambda: self.get_by_slug(slug),
+            CategoryOutScheme,
+            last_modified=lambda category: category.updated_at,
+        )
+
     async def create(self, data: CategoryCreateScheme) -> Category:
+        if data.parent_id is not None:
+            await self._get_parent(data.parent_id)
         new_category = Category(**data.dict())
         self.session.add(new_category)
         try:
+            await self.session.flush()
+            await self._link(new_category)
             await self.session.commit()
+            invalidate_categories()
             await self.session.refresh(new_category)
+            suggest_index.put(
+                Suggestion(
+                    "category", new_category.id, new_category.name, new_category.slug
+                )
+            )
             return new_category
         except IntegrityError:
             await self.session.rollback()
             raise HTTPException(status_code=400, detail="Category already exists")
 
     async def update(self, category: Category, data: CategoryUpdateScheme) -> Category:
-        for field, value in data.dict(exclude_unset=True).items():
+        payload = data.dict(exclude_unset=True)
+        old_slug = category.slug
+        moved = "parent_id" in payload and payload["parent_id"] != category.parent_id
+        if moved and payload["parent_id"] is not None:
+            await self._check_move(category, payload["parent_id"])
+        for field, value in payload.items():
             setattr(category, field, value)
         try:
             self.session.add(category)
+            if moved:
+                await self.session.flush()
+                await self._move(category)
+            if "name" in payload:
+                # product search documents embed the category name
+                await self.session.flush()
+                await ProductSearchCRUD(self.session).reindex_related(
+                    category_id=category.id
+                )
             await self.session.commit()
+            invalidate_categories(old_slug, category.slug)
             await self.session.refresh(category)
+            suggest_index.put(
+                Suggestion("category", category.id, category.name, category.slug)
+            )
             return category
         except IntegrityError:
             await self.session.rollback()
@@ -56,5 +146,88 @@ class CategoryCRUD:
             )
 
     async def delete(self, category: Category) -> None:
+        has_children = await self.session.scalar(
+            select(Category.id).where(Category.parent_id == category.id).limit(1)
+        )
+        if has_children:
+            raise HTTPException(status_code=400, detail="Category has subcategories")
+        category_id, slug = category.id, category.slug
+        await self.session.execute(
+            delete(CategoryClosure).where(CategoryClosure.descendant_id == category.id)
+        )
         await self.session.delete(category)
         await self.session.commit()
+        invalidate_categories(slug)
+        suggest_index.remove("category", category_id)
+
+    # Closure table upkeep. `_link` adds a new leaf, `_move` re-hangs a whole
+    # subtree; both run in the caller's transaction.
+
+    async def _get_parent(self, parent_id: int) -> Category:
+        parent = await self.session.get(Category, parent_id)
+        if parent is None:
+            raise HTTPException(status_code=400, detail="Parent category not found")
+        return parent
+
+    async def _check_move(self, category: Category, parent_id: int) -> None:
+        await self._get_parent(parent_id)
+        inside = await self.session.scalar(
+            select(CategoryClosure.id).where(
+                CategoryClosure.ancestor_id == category.id,
+                CategoryClosure.descendant_id == parent_id,
+            )
+        )
+        if inside:
+            raise HTTPException(
+                status_code=400,
+                detail="Category cannot be moved under itself or its subcategory",
+            )
+
+    async def _link(self, category: Category) -> None:
+        self.session.add(
+            CategoryClosure(ancestor_id=category.id, descendant_id=category.id, depth=0)
+        )
+        if category.parent_id is not None:
+            await self.session.execute(
+                insert(CategoryClosure).from_select(
+                    CLOSURE_COLUMNS,
+                    select(
+                        CategoryClosure.ancestor_id,
+                        literal(category.id),
+                        CategoryClosure.depth + 1,
+                    ).where(CategoryClosure.descendant_id == category.parent_id),
+                )
+            )
+
+    async def _move(self, category: Category) -> None:
+        subtree = subtree_ids(category.id)
+        # detach: drop the paths from the old ancestors into the subtree
+        await self.session.execute(
+            delete(CategoryClosure).where(
+                CategoryClosure.descendant_id.in_(subtree),
+                CategoryClosure.ancestor_id.not_in(subtree),
+            )
+        )
+        if category.parent_id is None:
+            return
+        # attach: every new ancestor to every node of the subtree
+        above = (
+            select(CategoryClosure)
+            .where(CategoryClosure.descendant_id == category.parent_id)
+            .subquery()
+        )
+        below = (
+            select(CategoryClosure)
+            .where(CategoryClosure.ancestor_id == category.id)
+            .subquery()
+        )
+        await self.session.execute(
+            insert(CategoryClosure).from_select(
+                CLOSURE_COLUMNS,
+                select(
+                    above.c.ancestor_id,
+                    below.c.descendant_id,
+                    above.c.depth + below.c.depth + 1,
+                ).select_from(above.join(below, true())),
+            )
+        )
@@ -0,0 +1,114 @@
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Iterable, Optional, Sequence, cast
+
+from fastapi import Depends
+from sqlalchemy import delete, exists, func, select, update
+from sqlalchemy.engine import CursorResult
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.dependencies.sessions import get_db_session
+from db.models.media import MediaBlob
+from db.models.products import ProductImage
+from utils.file_utils import blob_digest
+
+
+def blob_ref_changes(blob_ids: Iterable[Optional[int]], step: int = 1) -> list:
+    """
+    UPDATEs adding `step` to a blob's reference count once per occurrence
+    in `blob_ids` (None, an external image, is skipped). Relative, so
+    concurrent writers don't overwrite each other's counts.
+    """
+    by_count: defaultdict[int, list[int]] = defaultdict(list)
+    for blob_id, count in Counter(i for i in blob_ids if i is not None).items():
+        by_count[count].append(blob_id)
+    return [
+        update(MediaBlob)
+        .where(MediaBlob.id.in_(ids))
+        .values(ref_count=MediaBlob.ref_count + step * count)
+        for count, ids in by_count.items()
+    ]
+
+
+class MediaBlobCRUD:
+    def __init__(self, session: AsyncSession = Depends(get_db_session)):
+        self.session = session
+
+    async def get_by_digest(self, digest: str) -> Optional[MediaBlob]:
+        return await self.session.scalar(
+            select(MediaBlob).where(MediaBlob.digest == digest)
+        )
+
+    async def register(self, digest: str, ext: str, size: int) -> MediaBlob:
+        """
+        The blob of a stored upload, created on first upload. Uploading it
+        again restarts its GC grace period.
+        """
+        blob = await self.get_by_digest(digest)
+        if blob is None:
+            blob = MediaBlob(digest=digest, ext=ext, size=size)
+            self.session.add(blob)
+            try:
+                await self.session.commit()
+                return blob
+            except IntegrityError:
+                # the same content uploaded concurrently
+                await self.session.rollback()
+                blob = await self.get_by_digest(digest)
+                if blob is None:  # some other constraint failed
+                    raise
+        blob.updated_at = func.now()
+        await self.session.commit()
+        await self.session.refresh(blob)
+        return blob
+
+    async def ids_for_urls(self, urls: Iterable[str]) -> dict[str, int]:
+        """url -> blob id for the URLs that are blobs of ours."""
+        digests = {url: digest for url in urls if (digest := blob_digest(url))}
+        if not digests:
+            return {}
+        result = await self.session.execute(
+            select(MediaBlob.digest, MediaBlob.id).where(
+                MediaBlob.digest.in_(set(digests.values()))
+            )
+        )
+        ids: dict[str, int] = dict(result.tuples().all())
+        return {url: ids[d] for url, d in digests.items() if d in ids}
+
+    async def repair_ref_counts(self) -> int:
+        """
+        Recount references where the stored count drifted (e.g. images
+        removed outside the CRUD). Keeps `updated_at`, the GC clock.
+        """
+        actual = (
+            select(func.count())
+            .where(ProductImage.blob_id == MediaBlob.id)
+            .scalar_subquery()
+        )
+        result = cast(
+            CursorResult,
+            await self.session.execute(
+                update(MediaBlob)
+                .where(MediaBlob.ref_count != actual)
+                .values(ref_count=actual, updated_at=MediaBlob.updated_at)
+                .execution_options(synchronize_session=False)
+            ),
+        )
+        return result.rowcount
+
+    async def delete_unreferenced(
+        self, released_before: datetime
+    ) -> Sequence[tuple[str, str]]:
+        """Delete blobs unused since `released_before`; (digest, ext) of each."""
+        result = await self.session.execute(
+            delete(MediaBlob)
+            .where(
+                MediaBlob.ref_count == 0,
+                MediaBlob.updated_at < released_before,
+                ~exists().where(ProductImage.blob_id == MediaBlob.id),
+            )
+            .returning(MediaBlob.digest, MediaBlob.ext)
+            .execution_options(synchronize_session=False)
+        )
+        return result.tuples().all()
@@ -1,11 +1,13 @@
 # src/db/crud/order.py
-from typing import Optional
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional, Sequence
 
-from sqlalchemy import select
+from sqlalchemy import case, delete, func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.models.delivery import Delivery
-from db.models.orders import Order, OrderItem, OrderStatus
+from db.models.orders import Order, OrderItem, OrderStatus, StockReservation
 from db.models.products import ProductVariant
 from db.models.promo_codes import PromoCode
 
@@ -16,7 +18,7 @@ class OrderCRUD:
 
     # Create order
     async def create_order(
-        self, user_id: int, total_amount: float, currency: str = "USD"
+        self, user_id: int, total_amount: Decimal, currency: str = "USD"
     ) -> Order:
         order = Order(
             user_id=user_id,
@@ -30,7 +32,7 @@ class OrderCRUD:
 
     # Create order items
     async def create_order_item(
-        self, order_id: int, variant_id: int, quantity: int, price: float
+        self, order_id: int, variant_id: int, quantity: int, price: Decimal
     ) -> OrderItem:
         item = OrderItem(
             order_id=order_id, variant_id=variant_id, quantity=quantity, price=price
@@ -53,6 +55,150 @@ class OrderCRUD:
     async def get_variant(self, variant_id: int) -> Optional[ProductVariant]:
         return await self.session.get(ProductVariant, variant_id)
 
+    async def lock_variants(self, variant_ids: Sequence[int]):
+        """
+        (id, sku, price, stock, product_id) of the variants, in one query.
+        On PostgreSQL the rows stay locked until commit, taken in id order
+        so concurrent checkouts can't deadlock.
+        """
+        stmt = (
+            select(
+                ProductVariant.id,
+                ProductVariant.sku,
+                ProductVariant.price,
+                ProductVariant.stock,
+                ProductVariant.product_id,
+            )
+            .where(ProductVariant.id.in_(variant_ids))
+            .order_by(ProductVariant.id)
+        )
+        if self.session.get_bind().dialect.name == "postgresql":
+            stmt = stmt.with_for_update()
+        result = await self.session.execute(stmt)
+        return result.all()
+
+    async def reserve_stock(self, quantities: dict[int, int]) -> set[int]:
+        """
+        Move `quantities` (variant id -> units) from the stock to the
+        reserved units with one conditional UPDATE: a variant is only
+        changed if it still has the units. Returns the ids of the variants
+        changed.
+        """
+        quantity = case(quantities, value=ProductVariant.id)
+        result = await self.session.execute(
+            update(ProductVariant)
+            .where(
+                ProductVariant.id.in_(quantities),
+                ProductVariant.stock >= quantity,
+            )
+            .values(
+                stock=ProductVariant.stock - quantity,
+                reserved=ProductVariant.reserved + quantity,
+            )
+            .returning(ProductVariant.id)
+            .execution_options(synchronize_session=False)
+        )
+        return set(result.scalars().all())
+
+    async def release_stock(self, quantities: dict[int, int], held: bool):
+        """
+        Give `quantities` back to the stock with one UPDATE, out of the
+        reserved units if they were `held`. (id, product_id) of the variants.
+        """
+        quantity = case(quantities, value=ProductVariant.id)
+        values = {"stock": ProductVariant.stock + quantity}
+        if held:
+            values["reserved"] = ProductVariant.reserved - quantity
+        result = await self.session.execute(
+            update(ProductVariant)
+            .where(ProductVariant.id.in_(quantities))
+            .values(**values)
+            .returning(ProductVariant.id, ProductVariant.product_id)
+            .execution_options(synchronize_session=False)
+        )
+        return result.all()
+
+    async def commit_reserved(self, quantities: dict[int, int]) -> None:
+        """The held `quantities` are sold: drop them from the reserved units."""
+        quantity = case(quantities, value=ProductVariant.id)
+        await self.session.execute(
+            update(ProductVariant)
+            .where(ProductVariant.id.in_(quantities))
+            .values(reserved=ProductVariant.reserved - quantity)
+            .execution_options(synchronize_session=False)
+        )
+
+    # Stock reservations (holds of unpaid orders)
+    async def create_reservations(
+        self, order_id: int, quantities: dict[int, int], expires_at: datetime
+    ) -> None:
+        await self.session.execute(
+            insert(StockReservation).values(
+                [
+                    {
+                        "order_id": order_id,
+                        "variant_id": variant_id,
+                        "quantity": quantity,
+                        "expires_at": expires_at,
+                    }
+                    for variant_id, quantity in quantities.items()
+                ]
+            )
+        )
+
+    async def take_reservations(self, order_id: int):
+        """
+        Delete the holds of an order; (order_id, variant_id, quantity) of
+        each. Of concurrent callers (payment, cancel, the expiry sweep)
+        only one gets the rows.
+        """
+        result = await self.session.execute(
+            delete(StockReservation)
+            .where(StockReservation.order_id == order_id)
+            .returning(
+                StockReservation.order_id,
+                StockReservation.variant_id,
+                StockReservation.quantity,
+            )
+        )
+        return result.all()
+
+    async def take_expired_reservations(self, now: datetime, limit: int):
+        """
+        Delete the holds of up to `limit` orders whose hold expired by `now`,
+        oldest first; see above. An order's holds are all taken at once, so
+        a payment never finds some of them gone.
+        """
+        expired = (
+            select(StockReservation.order_id)
+            .where(StockReservation.expires_at < now)
+            .group_by(StockReservation.order_id)
+            .order_by(func.min(StockReservation.expires_at))
+            .limit(limit)
+        )
+        result = await self.session.execute(
+            delete(StockReservation)
+            .where(StockReservation.order_id.in_(expired))
+            .returning(
+                StockReservation.order_id,
+                StockReservation.variant_id,
+                StockReservation.quantity,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return result.all()
+
+    async def cancel_unpaid(self, order_ids: Sequence[int]) -> None:
+        await self.session.execute(
+            update(Order)
+            .where(
+                Order.id.in_(order_ids),
+                Order.status == OrderStatus.PENDING_PAYMENT.value,
+            )
+            .values(status=OrderStatus.CANCELLED.value)
+            .execution_options(synchronize_session=False)
+        )
+
     # promo helper
     async def get_promo_by_code(self, code: str) -> Optional[PromoCode]:
         res = await self.session.execute(
@@ -1,35 +1,317 @@
 # src/db/crud/product.py
-from typing import Optional, Sequence
+from decimal import Decimal
+from typing import Any, Callable, Iterable, Optional, Sequence, cast
 
 from fastapi import Depends, HTTPException
-from sqlalchemy import select
+from sqlalchemy import (
+    case,
+    exists,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.engine import CursorResult
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
+from core.cache import invalidate_product
+from core.suggest import suggest_index
+from db.crud.category import subtree_ids
+from db.crud.media import MediaBlobCRUD, blob_ref_changes
+from db.crud.search import ProductSearchCRUD
 from db.dependencies.sessions import get_db_session
-from db.models.products import Product, ProductImage, ProductVariant
+from db.models.brands import Brand
+from db.models.categories import Category
+from db.models.products import (
+    Product,
+    ProductImage,
+    ProductVariant,
+    VariantAttribute,
+)
+from db.models.sellers import Seller
 from schemas.product import (
     ProductCreateScheme,
     ProductUpdateScheme,
     ProductVariantCreateScheme,
 )
+from utils.pagination import decode_cursor, encode_cursor
+
+# Keyset orderings: name -> (sort column, descending, cursor value parser).
+# Ties are always broken by id, so each one is backed by a (column, id) index.
+PRODUCT_ORDERINGS: dict[str, tuple[Any, bool, Callable[[Any], Any]]] = {
+    "id": (Product.id, False, int),
+    "-id": (Product.id, True, int),
+    "price": (Product.price, False, Decimal),
+    "-price": (Product.price, True, Decimal),
+    "title": (Product.title, False, str),
+    "-title": (Product.title, True, str),
+}
+
+# Relations that can be loaded together with products. Each one costs a single
+# `WHERE product_id IN (...)` query for the whole page, never one per product.
+PRODUCT_RELATIONS = {
+    "images": Product.images,
+    "variants": Product.variants,
+}
+PRODUCT_FULL = ("images", "variants")
+
+
+def product_ordering(order_by: str) -> list:
+    """ORDER BY of a PRODUCT_ORDERINGS name, ties broken by id."""
+    column, descending, _ = PRODUCT_ORDERINGS[order_by]
+    if column is Product.id:
+        return [column.desc() if descending else column.asc()]
+    if descending:
+        return [column.desc(), Product.id.desc()]
+    return [column.asc(), Product.id.asc()]
+
+
+def product_load_options(load: Iterable[str]) -> list:
+    return [selectinload(PRODUCT_RELATIONS[name]) for name in load]
+
+
+def with_attributes(name: str, values: Sequence[str]):
+    """
+    Products with an active variant whose attribute `name` is one of `values`,
+    as a subquery served by the (name, value) index.
+    """
+    return (
+        select(ProductVariant.product_id)
+        .join(VariantAttribute, VariantAttribute.variant_id == ProductVariant.id)
+        .where(
+            VariantAttribute.name == name,
+            VariantAttribute.value.in_(values),
+            ProductVariant.is_active,
+        )
+    )
+
+
+def product_filters(
+    category_id: Optional[int] = None,
+    attributes: Optional[dict[str, Sequence[str]]] = None,
+) -> list:
+    """
+    WHERE clauses of the product listing. Values of one attribute are OR-ed,
+    different attributes AND-ed.
+    """
+    clauses = []
+    if category_id is not None:
+        clauses.append(Product.category_id.in_(subtree_ids(category_id)))
+    for name, values in (attributes or {}).items():
+        clauses.append(Product.id.in_(with_attributes(name, values)))
+    return clauses
+
+
+# Numbered rows of a bulk import: (line number in the source, parsed row)
+ImportRow = tuple[int, ProductCreateScheme]
+
+
+def _index_suggestion(product_id: int, product: Product | ProductCreateScheme) -> None:
+    """Add a committed product to the typeahead index."""
+    suggest_index.put_product(
+        product_id,
+        product.title,
+        product.slug,
+        product.brand_id,
+        product.category_id,
+        # None means the column default
+        is_active=product.is_active is not False,
+    )
+
+
+def _summary_values() -> dict[str, Any]:
+    """Product summary columns as correlated subqueries over its rows."""
+    active = (ProductVariant.product_id == Product.id) & ProductVariant.is_active
+    total_stock = (
+        select(func.coalesce(func.sum(ProductVariant.stock), 0))
+        .where(active)
+        .scalar_subquery()
+    )
+    return {
+        "min_price": select(func.min(ProductVariant.price))
+        .where(active)
+        .scalar_subquery(),
+        "max_price": select(func.max(ProductVariant.price))
+        .where(active)
+        .scalar_subquery(),
+        "total_stock": total_stock,
+        "main_image_url": select(ProductImage.url)
+        .where(ProductImage.product_id == Product.id)
+        .order_by(ProductImage.is_main.desc(), ProductImage.id)
+        .limit(1)
+        .scalar_subquery(),
+        # products without variants keep their manual in_stock flag
+        "in_stock": case(
+            (exists().where(active), total_stock > 0), else_=Product.in_stock
+        ),
+    }
+
+
+def sync_product_summary(product_ids: Iterable[int]):
+    """
+    Recompute the summary columns of products whose variants or images
+    changed, and bump their `updated_at`, the Last-Modified of the product
+    body that embeds them. Runs in the caller's transaction, after a flush.
+    """
+    return (
+        update(Product)
+        .where(Product.id.in_(list(product_ids)))
+        .values(**_summary_values(), updated_at=func.now())
+    )
+
+
+def repair_product_summaries(first_id: int, last_id: int):
+    """
+    Recompute the summaries of products `first_id..last_id`, only writing
+    (and bumping `updated_at` of) the rows that drifted.
+    """
+    values = _summary_values()
+    drifted = or_(
+        *(
+            getattr(Product, name).is_distinct_from(expr)
+            for name, expr in values.items()
+        )
+    )
+    return (
+        update(Product)
+        .where(Product.id.between(first_id, last_id), drifted)
+        .values(**values, updated_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
 
 
 class ProductCRUD:
     def __init__(self, session: AsyncSession = Depends(get_db_session)):
         self.session = session
+        self.search_index = ProductSearchCRUD(session)
 
-    async def get_all(self, limit: int = 100, offset: int = 0) -> Sequence[Product]:
-        result = await self.session.execute(select(Product).limit(limit).offset(offset))
+    async def get_all(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        order_by: str = "-id",
+        load: Sequence[str] = PRODUCT_FULL,
+        category_id: Optional[int] = None,
+        attributes: Optional[dict[str, Sequence[str]]] = None,
+    ) -> Sequence[Product]:
+        """LIMIT/OFFSET page, in the same order as `get_page`."""
+        stmt = (
+            select(Product)
+            .options(*product_load_options(load))
+            .where(*product_filters(category_id, attributes))
+        )
+        result = await self.session.execute(
+            stmt.order_by(*product_ordering(order_by)).limit(limit).offset(offset)
+        )
         return result.scalars().all()
 
-    async def get_by_id(self, product_id: int) -> Product:
-        return await self.session.get(Product, product_id)
+    async def get_page(
+        self,
+        limit: int = 50,
+        cursor: str | None = None,
+        order_by: str = "-id",
+        load: Sequence[str] = PRODUCT_FULL,
+        category_id: Optional[int] = None,
+        attributes: Optional[dict[str, Sequence[str]]] = None,
+    ) -> tuple[Sequence[Product], str | None]:
+        """
+        Keyset pagination: seek past the last row of the previous page instead
+        of counting OFFSET rows. Returns the page and the cursor of the next one.
+        `category_id` keeps products of that category and its subcategories,
+        `attributes` products with a variant matching each {name: values}.
+        """
+        column, descending, parse = PRODUCT_ORDERINGS[order_by]
+        is_id = column is Product.id
+
+        stmt = (
+            select(Product)
+            .options(*product_load_options(load))
+            .where(*product_filters(category_id, attributes))
+        )
+        if cursor:
+            raw = decode_cursor(cursor, order_by)
+            parsers: list[Callable[[Any], Any]] = [int] if is_id else [parse, int]
+            if len(raw) != len(parsers):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            try:
+                values = [fn(v) for fn, v in zip(parsers, raw)]
+            except (TypeError, ArithmeticError, ValueError):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+
+            seek_key: Any
+            last_key: Any
+            if is_id:
+                seek_key, last_key = Product.id, values[0]
+            else:
+                seek_key = tuple_(column, Product.id)
+                last_key = tuple_(*(literal(value) for value in values))
+            stmt = stmt.where(
+                seek_key < last_key if descending else seek_key > last_key
+            )
 
-    async def get_by_slug(self, slug: str) -> Product:
-        res = await self.session.execute(select(Product).where(Product.slug == slug))
+        result = await self.session.execute(
+            stmt.order_by(*product_ordering(order_by)).limit(limit + 1)
+        )
+        rows = result.scalars().all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last_row = rows[-1]
+            values = (
+                [last_row.id] if is_id else [getattr(last_row, column.key), last_row.id]
+            )
+            next_cursor = encode_cursor(order_by, values)
+        return rows, next_cursor
+
+    async def get_by_id(
+        self, product_id: int, load: Sequence[str] = PRODUCT_FULL
+    ) -> Product | None:
+        return await self.session.get(
+            Product, product_id, options=product_load_options(load)
+        )
+
+    async def get_by_slug(
+        self, slug: str, load: Sequence[str] = PRODUCT_FULL
+    ) -> Product | None:
+        res = await self.session.execute(
+            select(Product)
+            .where(Product.slug == slug)
+            .options(*product_load_options(load))
+        )
         return res.scalars().first()
 
+    async def get_many(
+        self, product_ids: Sequence[int], load: Sequence[str] = PRODUCT_FULL
+    ) -> list[Product]:
+        """Fetch products by id, keeping the order of `product_ids`."""
+        if not product_ids:
+            return []
+        res = await self.session.execute(
+            select(Product)
+            .where(Product.id.in_(product_ids))
+            .options(*product_load_options(load))
+        )
+        by_id = {product.id: product for product in res.scalars()}
+        return [by_id[pk] for pk in product_ids if pk in by_id]
+
+    async def reload(
+        self, product: Product, load: Sequence[str] = PRODUCT_FULL
+    ) -> Product:
+        """Re-read a product after a commit, including server-side defaults."""
+        res = await self.session.execute(
+            select(Product)
+            .where(Product.id == product.id)
+            .options(*product_load_options(load))
+            .execution_options(populate_existing=True)
+        )
+        return res.scalars().one()
+
     async def create(self, data: ProductCreateScheme) -> Product:
         new_product = Product(**data.dict(exclude={"images", "variants"}))
         self.session.add(new_product)
@@ -44,8 +326,20 @@ class ProductCRUD:
 
         # images
         if data.images:
-            for url in data.images:
-                self.session.add(ProductImage(url=url, product_id=new_product.id))
+            blob_ids = await MediaBlobCRUD(self.session).ids_for_urls(
+                image.url for image in data.images
+            )
+            for image in data.images:
+                self.session.add(
+                    ProductImage(
+                        url=image.url,
+                        is_main=image.is_main,
+                        product_id=new_product.id,
+                        blob_id=blob_ids.get(image.url),
+                    )
+                )
+            for stmt in blob_ref_changes(blob_ids.get(i.url) for i in data.images):
+                await self.session.execute(stmt)
 
         # variants
         if data.variants:
@@ -61,22 +355,199 @@ class ProductCRUD:
                     )
                 )
 
+        await self.session.flush()
+        await self.session.execute(sync_product_summary([new_product.id]))
+        await self.search_index.reindex([new_product.id])
         await self.session.commit()
-        await self.session.refresh(new_product)
-        return new_product
+        _index_suggestion(new_product.id, data)
+        return await self.reload(new_product)
 
     async def update(self, product: Product, data: ProductUpdateScheme) -> Product:
+        old_slug = product.slug
         for field, value in data.dict(exclude_unset=True).items():
             setattr(product, field, value)
 
         self.session.add(product)
+        await self.session.flush()
+        await self.search_index.reindex([product.id])
         await self.session.commit()
-        await self.session.refresh(product)
-        return product
+        invalidate_product(product.id, old_slug, product.slug)
+        _index_suggestion(product.id, product)
+        return await self.reload(product)
 
     async def delete(self, product: Product) -> None:
+        product_id, slug = product.id, product.slug
+        await self.search_index.remove([product_id])
+        # the images go with the product (ORM cascade): release their blobs
+        blob_ids = await self.session.scalars(
+            select(ProductImage.blob_id).where(ProductImage.product_id == product_id)
+        )
+        for stmt in blob_ref_changes(blob_ids.all(), -1):
+            await self.session.execute(stmt)
         await self.session.delete(product)
         await self.session.commit()
+        invalidate_product(product_id, slug)
+        suggest_index.remove("product", product_id)
+
+    async def repair_summaries(self, batch_size: int) -> int:
+        """
+        Recompute every product's summary columns, `batch_size` ids per
+        transaction. Returns how many products had drifted.
+        """
+        last_id = await self.session.scalar(select(func.max(Product.id))) or 0
+        repaired = 0
+        for first_id in range(1, last_id + 1, batch_size):
+            result = cast(
+                CursorResult,
+                await self.session.execute(
+                    repair_product_summaries(first_id, first_id + batch_size - 1)
+                ),
+            )
+            await self.session.commit()
+            repaired += result.rowcount
+        return repaired
+
+    async def bulk_create(
+        self, rows: Sequence[ImportRow]
+    ) -> tuple[list[int], list[tuple[int, str]]]:
+        """
+        Insert a batch of products with their variants and images using one
+        multi-row INSERT per table, in one transaction. Rows that would break
+        a constraint are reported as (line, error) instead of failing the
+        batch. Returns the new product ids and the row errors.
+        """
+        errors: list[tuple[int, str]] = []
+        rows = await self._check_import_rows(rows, errors)
+        if not rows:
+            return [], errors
+
+        try:
+            product_ids = await self._insert_rows(rows)
+            await self.session.commit()
+            for product_id, (_, row) in zip(product_ids, rows):
+                _index_suggestion(product_id, row)
+        except IntegrityError:
+            # something slipped past the checks (e.g. a concurrent insert):
+            # retry row by row so only the offending rows are rejected
+            await self.session.rollback()
+            product_ids = []
+            for line, row in rows:
+                try:
+                    product_ids += await self._insert_rows([(line, row)])
+                    await self.session.commit()
+                    _index_suggestion(product_ids[-1], row)
+                except IntegrityError as exc:
+                    await self.session.rollback()
+                    errors.append((line, f"integrity error: {exc.orig}"))
+        return product_ids, errors
+
+    async def _check_import_rows(
+        self, rows: Sequence[ImportRow], errors: list[tuple[int, str]]
+    ) -> list[ImportRow]:
+        """Drop rows with taken slugs/SKUs or unknown references, one query each."""
+
+        async def existing(column, values) -> set:
+            values = {v for v in values if v is not None}
+            if not values:
+                return set()
+            result = await self.session.execute(
+                select(column).where(column.in_(values))
+            )
+            return set(result.scalars())
+
+        slugs = await existing(Product.slug, (row.slug for _, row in rows))
+        skus = await existing(
+            ProductVariant.sku, (v.sku for _, row in rows for v in row.variants or ())
+        )
+        references = {
+            "category_id": await existing(
+                Category.id, (row.category_id for _, row in rows)
+            ),
+            "brand_id": await existing(Brand.id, (row.brand_id for _, row in rows)),
+            "seller_id": await existing(Seller.id, (row.seller_id for _, row in rows)),
+        }
+
+        accepted = []
+        for line, row in rows:
+            row_skus = [v.sku for v in row.variants or ()]
+            error = None
+            if row.slug in slugs:
+                error = f"slug already exists: {row.slug}"
+            elif taken := [sku for sku in row_skus if sku in skus]:
+                error = f"sku already exists: {taken[0]}"
+            elif len(set(row_skus)) != len(row_skus):
+                error = "duplicate sku in variants"
+            else:
+                for field, known in references.items():
+                    value = getattr(row, field)
+                    if value is not None and value not in known:
+                        error = f"{field} does not exist: {value}"
+                        break
+            if error:
+                errors.append((line, error))
+                continue
+            # later rows of the same batch can't reuse them either
+            slugs.add(row.slug)
+            skus.update(row_skus)
+            accepted.append((line, row))
+        return accepted
+
+    async def _insert_rows(self, rows: Sequence[ImportRow]) -> list[int]:
+        # RETURNING the unique slug/sku to pair new ids with their rows:
+        # asking for rows in parameter order instead makes SQLite fall back
+        # to one INSERT per row
+        result = await self.session.execute(
+            insert(Product).returning(Product.id, Product.slug),
+            [
+                row.model_dump(exclude={"images", "variants"}, exclude_none=True)
+                for _, row in rows
+            ],
+        )
+        ids_by_slug = {slug: pk for pk, slug in result.all()}
+        product_ids = [ids_by_slug[row.slug] for _, row in rows]
+
+        variants, attributes, images = [], {}, []
+        for product_id, (_, row) in zip(product_ids, rows):
+            for variant in row.variants or ():
+                variants.append(
+                    {
+                        **variant.model_dump(exclude={"attributes"}, exclude_none=True),
+                        "product_id": product_id,
+                    }
+                )
+                if variant.attributes:
+                    attributes[variant.sku] = variant.attributes
+            for image in row.images or ():
+                images.append({**image.model_dump(), "product_id": product_id})
+        if variants:
+            result = await self.session.execute(
+                insert(ProductVariant).returning(ProductVariant.id, ProductVariant.sku),
+                variants,
+            )
+            attribute_rows = [
+                {"variant_id": variant_id, "name": name, "value": value}
+                for variant_id, sku in result.all()
+                for name, value in attributes.get(sku, {}).items()
+            ]
+            if attribute_rows:
+                await self.session.execute(insert(VariantAttribute), attribute_rows)
+        if images:
+            blob_ids = await MediaBlobCRUD(self.session).ids_for_urls(
+                image["url"] for image in images
+            )
+            for image in images:
+                image["blob_id"] = blob_ids.get(image["url"])
+            await self.session.execute(insert(ProductImage), images)
+            for stmt in blob_ref_changes(image["blob_id"] for image in images):
+                await self.session.execute(stmt)
+        if variants or images:
+            await self.session.execute(
+                sync_product_summary(product_ids).execution_options(
+                    synchronize_session=False
+                )
+            )
+        await self.search_index.reindex(product_ids)
+        return product_ids
 
 
 class ProductVariantCRUD:
@@ -99,12 +570,14 @@ class ProductVariantCRUD:
         )
         self.session.add(variant)
         try:
+            await self.session.execute(sync_product_summary([product_id]))
             await self.session.commit()
         except IntegrityError:
             await self.session.rollback()
             raise HTTPException(
                 status_code=400, detail="Variant already exists or integrity error"
             )
+        invalidate_product(product_id)
         await self.session.refresh(variant)
         return variant
 
@@ -112,13 +585,18 @@ class ProductVariantCRUD:
         for field, value in data.items():
             setattr(variant, field, value)
         self.session.add(variant)
+        await self.session.execute(sync_product_summary([variant.product_id]))
         await self.session.commit()
+        invalidate_product(variant.product_id)
         await self.session.refresh(variant)
         return variant
 
     async def delete(self, variant: ProductVariant) -> None:
+        product_id = variant.product_id
         await self.session.delete(variant)
+        await self.session.execute(sync_product_summary([product_id]))
         await self.session.commit()
+        invalidate_product(product_id)
 
 
 class ProductImageCRUD:
@@ -128,13 +606,46 @@ class ProductImageCRUD:
     async def get_image(self, image_id: int) -> ProductImage | None:
         return await self.session.get(ProductImage, image_id)
 
-    async def create(self, product_id: int, url: str, is_main: bool) -> ProductImage:
-        obj = ProductImage(product_id=product_id, url=url, is_main=is_main)
+    async def create(
+        self,
+        product_id: int,
+        url: str,
+        is_main: bool = False,
+        renditions_status: Optional[str] = None,
+    ) -> ProductImage:
+        blob_ids = await MediaBlobCRUD(self.session).ids_for_urls([url])
+        obj = ProductImage(
+            product_id=product_id,
+            url=url,
+            is_main=is_main,
+            renditions_status=renditions_status,
+            blob_id=blob_ids.get(url),
+        )
         self.session.add(obj)
+        for stmt in blob_ref_changes([obj.blob_id]):
+            await self.session.execute(stmt)
+        await self.session.execute(sync_product_summary([product_id]))
         await self.session.commit()
+        invalidate_product(product_id)
         await self.session.refresh(obj)
         return obj
 
+    async def set_renditions_status(
+        self, image: ProductImage, status: str
+    ) -> ProductImage:
+        image.renditions_status = status
+        # the status and rendition URLs are in the product body: move its
+        # Last-Modified along with dropping the cached copy
+        await self.session.execute(
+            update(Product)
+            .where(Product.id == image.product_id)
+            .values(updated_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+        invalidate_product(image.product_id)
+        return image
+
     async def get_images(self, product_id: int) -> Sequence[ProductImage]:
         q = select(ProductImage).where(ProductImage.product_id == product_id)
         result = await self.session.execute(q)
@@ -146,6 +657,11 @@ class ProductImageCRUD:
         image = result.scalar_one_or_none()
         if not image:
             return False
+        product_id = image.product_id
         await self.session.delete(image)
+        for stmt in blob_ref_changes([image.blob_id], -1):
+            await self.session.execute(stmt)
+        await self.session.execute(sync_product_summary([product_id]))
         await self.session.commit()
+        invalidate_product(product_id)
         return True
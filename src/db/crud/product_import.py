@@ -0,0 +1,38 @@
+from typing import Optional
+
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.dependencies.sessions import get_db_session
+from db.models.imports import ProductImport, ProductImportStatus
+
+
+class ProductImportCRUD:
+    def __init__(self, session: AsyncSession = Depends(get_db_session)):
+        self.session = session
+
+    async def get_by_id(self, import_id: int) -> Optional[ProductImport]:
+        return await self.session.get(ProductImport, import_id)
+
+    async def create(
+        self,
+        format: str,
+        user_id: Optional[int] = None,
+        source_path: Optional[str] = None,
+    ) -> ProductImport:
+        job = ProductImport(
+            format=format,
+            user_id=user_id,
+            source_path=source_path,
+            status=ProductImportStatus.QUEUED.value,
+        )
+        self.session.add(job)
+        await self.session.commit()
+        await self.session.refresh(job)
+        return job
+
+    async def save(self, job: ProductImport) -> ProductImport:
+        self.session.add(job)
+        await self.session.commit()
+        await self.session.refresh(job)
+        return job
@@ -0,0 +1,113 @@
+from collections import Counter
+from typing import Optional, Sequence
+
+from fastapi import Depends, HTTPException
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.cache import invalidate_product
+from db.dependencies.sessions import get_db_session
+from db.models.products import Product
+from db.models.reviews import Review
+from schemas.review import ReviewCreateScheme, ReviewUpdateScheme
+from utils.pagination import decode_cursor, encode_cursor
+
+
+def rating_change(
+    product_id: int, added: Optional[int] = None, removed: Optional[int] = None
+):
+    """
+    UPDATE adjusting a product's rating aggregates for one review rating
+    `added` and/or `removed` (an edit is both). Relative, so concurrent
+    reviews of the same product don't overwrite each other's counts.
+    """
+    deltas: Counter[str] = Counter()
+    for stars, step in ((added, 1), (removed, -1)):
+        if stars is not None:
+            deltas["rating_count"] += step
+            deltas["rating_sum"] += step * stars
+            deltas[f"rating_{stars}"] += step
+    return (
+        update(Product)
+        .where(Product.id == product_id)
+        .values(
+            **{
+                name: getattr(Product, name) + delta
+                for name, delta in deltas.items()
+                if delta
+            },
+            updated_at=func.now(),
+        )
+    )
+
+
+class ReviewCRUD:
+    def __init__(self, session: AsyncSession = Depends(get_db_session)):
+        self.session = session
+
+    async def get_by_id(self, review_id: int) -> Optional[Review]:
+        return await self.session.get(Review, review_id)
+
+    async def get_page(
+        self, product_id: int, limit: int = 20, cursor: str | None = None
+    ) -> tuple[Sequence[Review], str | None]:
+        """A product's reviews newest first, keyset-paginated on id."""
+        stmt = select(Review).where(Review.product_id == product_id)
+        if cursor:
+            try:
+                (last_id,) = decode_cursor(cursor, "reviews")
+                stmt = stmt.where(Review.id < int(last_id))
+            except (TypeError, ValueError):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+        result = await self.session.execute(
+            stmt.order_by(Review.id.desc()).limit(limit + 1)
+        )
+        rows = result.scalars().all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor("reviews", [rows[-1].id])
+        return rows, next_cursor
+
+    async def create(
+        self, product_id: int, user_id: int, data: ReviewCreateScheme
+    ) -> Review:
+        review = Review(product_id=product_id, user_id=user_id, **data.model_dump())
+        self.session.add(review)
+        await self.session.flush()
+        await self.session.execute(rating_change(product_id, added=review.rating))
+        await self.session.commit()
+        invalidate_product(product_id)
+        await self.session.refresh(review)
+        return review
+
+    async def update(self, review: Review, data: ReviewUpdateScheme) -> Review:
+        old_rating = review.rating
+        payload = data.model_dump(exclude_unset=True)
+        if payload.get("rating") is None:
+            # a rating can be changed, not removed
+            payload.pop("rating", None)
+        for field, value in payload.items():
+            setattr(review, field, value)
+        self.session.add(review)
+        await self.session.flush()
+        rated = review.rating != old_rating
+        if rated:
+            await self.session.execute(
+                rating_change(
+                    review.product_id, added=review.rating, removed=old_rating
+                )
+            )
+        await self.session.commit()
+        if rated:
+            invalidate_product(review.product_id)
+        await self.session.refresh(review)
+        return review
+
+    async def delete(self, review: Review) -> None:
+        product_id, rating = review.product_id, review.rating
+        await self.session.delete(review)
+        await self.session.execute(rating_change(product_id, removed=rating))
+        await self.session.commit()
+        invalidate_product(product_id)
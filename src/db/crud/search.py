@@ -0,0 +1,151 @@
+# src/db/crud/search.py
+import re
+from typing import Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import bindparam, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.models.products import Product
+from db.models.search import SEARCH_TABLE
+from utils.pagination import decode_cursor, encode_cursor
+
+# Column weights for bm25(): title, description, brand, category
+SQLITE_WEIGHTS = (10.0, 1.0, 4.0, 2.0)
+
+_SQLITE_REINDEX = text(
+    f"INSERT INTO {SEARCH_TABLE} (rowid, title, description, brand, category) "
+    "SELECT p.id, p.title, coalesce(p.description, ''), "
+    "coalesce(b.name, ''), coalesce(c.name, '') "
+    "FROM products p "
+    "LEFT JOIN brands b ON b.id = p.brand_id "
+    "LEFT JOIN categories c ON c.id = p.category_id "
+    "WHERE p.id IN :ids"
+).bindparams(bindparam("ids", expanding=True))
+
+_POSTGRES_REINDEX = text(
+    f"INSERT INTO {SEARCH_TABLE} (product_id, document) "
+    "SELECT p.id, "
+    "setweight(to_tsvector('simple', p.title), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(b.name, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(c.name, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(p.description, '')), 'C') "
+    "FROM products p "
+    "LEFT JOIN brands b ON b.id = p.brand_id "
+    "LEFT JOIN categories c ON c.id = p.category_id "
+    "WHERE p.id IN :ids "
+    "ON CONFLICT (product_id) DO UPDATE SET document = excluded.document"
+).bindparams(bindparam("ids", expanding=True))
+
+# Hits are ranked ascending ("lower is better") on both engines so one keyset
+# predicate works for both: bm25() is already negative, ts_rank_cd() is negated.
+_SQLITE_SEARCH = (
+    "SELECT id, rank FROM ("
+    f"SELECT p.id AS id, bm25({SEARCH_TABLE}, {', '.join(map(str, SQLITE_WEIGHTS))}) "
+    "AS rank "
+    f"FROM {SEARCH_TABLE} JOIN products p ON p.id = {SEARCH_TABLE}.rowid "
+    f"WHERE {SEARCH_TABLE} MATCH :query AND p.is_active"
+    ") AS hits {seek} ORDER BY rank, id LIMIT :limit"
+)
+
+_POSTGRES_SEARCH = (
+    "SELECT id, rank FROM ("
+    "SELECT p.id AS id, -ts_rank_cd(s.document, q.query, 32) AS rank "
+    f"FROM {SEARCH_TABLE} s JOIN products p ON p.id = s.product_id, "
+    "websearch_to_tsquery('simple', :query) AS q (query) "
+    "WHERE s.document @@ q.query AND p.is_active"
+    ") AS hits {seek} ORDER BY rank, id LIMIT :limit"
+)
+
+_SEEK = "WHERE rank > :rank OR (rank = :rank AND id > :last_id)"
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def fts5_query(query: str) -> str:
+    """
+    Turn free text into an FTS5 expression: every word must match, the last one
+    as a prefix. Words are quoted so user input can't inject FTS5 syntax.
+    """
+    tokens = _TOKEN_RE.findall(query.lower())
+    if not tokens:
+        return ""
+    *head, last = tokens
+    return " ".join([*(f'"{t}"' for t in head), f'"{last}"*'])
+
+
+class ProductSearchCRUD:
+    """Maintains and queries the `product_search` inverted index."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @property
+    def dialect(self) -> str:
+        return self.session.get_bind().dialect.name
+
+    async def reindex(self, product_ids: Sequence[int]) -> None:
+        """(Re)build index entries for the given products in one statement."""
+        if not product_ids:
+            return
+        ids = list(product_ids)
+        if self.dialect == "postgresql":
+            await self.session.execute(_POSTGRES_REINDEX, {"ids": ids})
+            return
+
+        await self.remove(ids)
+        await self.session.execute(_SQLITE_REINDEX, {"ids": ids})
+
+    async def reindex_related(
+        self, brand_id: int | None = None, category_id: int | None = None
+    ) -> None:
+        """Refresh products whose brand or category name changed."""
+        stmt = select(Product.id)
+        if brand_id is not None:
+            stmt = stmt.where(Product.brand_id == brand_id)
+        if category_id is not None:
+            stmt = stmt.where(Product.category_id == category_id)
+        result = await self.session.execute(stmt)
+        await self.reindex(result.scalars().all())
+
+    async def remove(self, product_ids: Sequence[int]) -> None:
+        if not product_ids:
+            return
+        key = "product_id" if self.dialect == "postgresql" else "rowid"
+        stmt = text(f"DELETE FROM {SEARCH_TABLE} WHERE {key} IN :ids").bindparams(
+            bindparam("ids", expanding=True)
+        )
+        await self.session.execute(stmt, {"ids": list(product_ids)})
+
+    async def search(
+        self, query: str, limit: int = 20, cursor: str | None = None
+    ) -> tuple[list[int], str | None]:
+        """
+        Ranked product ids for `query`, best first, keyset paginated on
+        (rank, id). Returns the ids of the page and the next cursor.
+        """
+        if self.dialect == "postgresql":
+            sql, match = _POSTGRES_SEARCH, query
+        else:
+            sql, match = _SQLITE_SEARCH, fts5_query(query)
+        if not match:
+            return [], None
+
+        params: dict = {"query": match, "limit": limit + 1}
+        seek = ""
+        if cursor:
+            raw = decode_cursor(cursor, "search")
+            try:
+                params["rank"], params["last_id"] = float(raw[0]), int(raw[1])
+            except (IndexError, TypeError, ValueError):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            seek = _SEEK
+
+        result = await self.session.execute(text(sql.format(seek=seek)), params)
+        hits = result.all()
+
+        next_cursor = None
+        if len(hits) > limit:
+            hits = hits[:limit]
+            next_cursor = encode_cursor("search", [hits[-1].rank, hits[-1].id])
+        return [hit.id for hit in hits], next_cursor
@@ -8,6 +8,7 @@ from sqlalchemy.future import Connection
 from core.settings import settings
 from db.meta import meta
 from db.models import load_all_models
+from db.models.search import SEARCH_TABLE
 
 config = context.config
 
@@ -22,10 +23,18 @@ if config.config_file_name is not None:
 target_metadata = meta
 
 
+def include_name(name, type_, parent_names) -> bool:
+    """Skip the full-text index (and FTS5 shadow tables), it's managed by DDL."""
+    if type_ == "table" and name and name.startswith(SEARCH_TABLE):
+        return False
+    return True
+
+
 def run_migrations_offline() -> None:
     context.configure(
         url=settings.DATABASE_URL,
         target_metadata=target_metadata,
+        include_name=include_name,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -36,7 +45,11 @@ def run_migrations_offline() -> None:
 
 def do_run_migrations(connection: Connection) -> None:
     """Run sync migrations in the async context."""
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_name=include_name,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
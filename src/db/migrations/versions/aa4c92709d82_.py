@@ -0,0 +1,53 @@
+"""product full-text search index
+
+Revision ID: aa4c92709d82
+Revises: 899009f692dd
+Create Date: 2026-10-18 10:03:17.558120
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+from db.models.search import DROP, POSTGRES_CREATE, SEARCH_TABLE, SQLITE_CREATE
+
+# revision identifiers, used by Alembic.
+revision: str = 'aa4c92709d82'
+down_revision: Union[str, Sequence[str], None] = '899009f692dd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        for ddl in POSTGRES_CREATE:
+            op.execute(ddl)
+        op.execute(
+            f"INSERT INTO {SEARCH_TABLE} (product_id, document) "
+            "SELECT p.id, "
+            "setweight(to_tsvector('simple', p.title), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(b.name, '')), 'B') || "
+            "setweight(to_tsvector('simple', coalesce(c.name, '')), 'B') || "
+            "setweight(to_tsvector('simple', coalesce(p.description, '')), 'C') "
+            "FROM products p "
+            "LEFT JOIN brands b ON b.id = p.brand_id "
+            "LEFT JOIN categories c ON c.id = p.category_id"
+        )
+        return
+
+    op.execute(SQLITE_CREATE)
+    op.execute(
+        f"INSERT INTO {SEARCH_TABLE} (rowid, title, description, brand, category) "
+        "SELECT p.id, p.title, coalesce(p.description, ''), "
+        "coalesce(b.name, ''), coalesce(c.name, '') "
+        "FROM products p "
+        "LEFT JOIN brands b ON b.id = p.brand_id "
+        "LEFT JOIN categories c ON c.id = p.category_id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(DROP)
@@ -1,7 +1,7 @@
 # src/db/models/cart.py
 from __future__ import annotations
 
-from sqlalchemy import ForeignKey, Integer, Numeric
+from sqlalchemy import ForeignKey, Index, Integer, Numeric
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from db.base import BaseModel
@@ -9,10 +9,19 @@ from db.base import BaseModel
 
 class Cart(BaseModel):
     __tablename__ = "carts"
+    __table_args__ = (
+        # the abandoned cart sweep, oldest first
+        Index("ix_carts_updated_at", "updated_at"),
+    )
 
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.id"), unique=True, index=True
     )
+    # bumped by every write to the items (see `CartCRUD`); keys the cache of
+    # priced carts
+    version: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
     items: Mapped[list["CartItem"]] = relationship(
         "CartItem", back_populates="cart", cascade="all, delete-orphan"
     )
@@ -21,10 +30,15 @@ class Cart(BaseModel):
 
 class CartItem(BaseModel):
     __tablename__ = "cart_items"
-
-    cart_id: Mapped[int] = mapped_column(
-        ForeignKey("carts.id", ondelete="CASCADE"), index=True
+    __table_args__ = (
+        # one line per variant: the target of the cart upserts, and the
+        # lookup of a cart's items
+        Index("ix_cart_items_cart_id_variant_id", "cart_id", "variant_id", unique=True),
+        # the abandoned cart sweep, oldest first
+        Index("ix_cart_items_updated_at", "updated_at"),
     )
+
+    cart_id: Mapped[int] = mapped_column(ForeignKey("carts.id", ondelete="CASCADE"))
     variant_id: Mapped[int] = mapped_column(
         ForeignKey("product_variants.id"), index=True
     )
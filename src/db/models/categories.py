@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from sqlalchemy import String, Text
+from sqlalchemy import ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from db.base import BaseModel
@@ -16,6 +16,9 @@ class Category(BaseModel):
         String(200), unique=True, nullable=False, index=True
     )
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
+    parent_id: Mapped[int | None] = mapped_column(
+        ForeignKey("categories.id"), nullable=True, index=True
+    )
 
     products: Mapped[list["Product"]] = relationship("Product", back_populates="category", cascade="all, delete-orphan")  # type: ignore # noqa: F821
 
@@ -23,4 +26,30 @@ class Category(BaseModel):
         return f"<Category id={self.id} name={self.name}>"
 
 
-__all__ = ("Category",)
+class CategoryClosure(BaseModel):
+    """
+    Every (ancestor, descendant) pair of the category tree, including each
+    category paired with itself at depth 0, so a whole subtree is one indexed
+    lookup by `ancestor_id`. Maintained by `CategoryCRUD`.
+    """
+
+    __tablename__ = "category_closure"
+    __table_args__ = (
+        Index(
+            "ix_category_closure_ancestor_descendant",
+            "ancestor_id",
+            "descendant_id",
+            unique=True,
+        ),
+    )
+
+    ancestor_id: Mapped[int] = mapped_column(
+        ForeignKey("categories.id", ondelete="CASCADE"), nullable=False
+    )
+    descendant_id: Mapped[int] = mapped_column(
+        ForeignKey("categories.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    depth: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+__all__ = ("Category", "CategoryClosure")
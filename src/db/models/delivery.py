@@ -22,7 +22,10 @@ class Delivery(BaseModel):
     __tablename__ = "deliveries"
 
     order_id: Mapped[int] = mapped_column(ForeignKey("orders.id"), unique=True)
-    courier_id: Mapped[int] = mapped_column(ForeignKey("couriers.id"))
+    # assigned after payment (see `OrderService.assign_courier`)
+    courier_id: Mapped[int | None] = mapped_column(
+        ForeignKey("couriers.id"), nullable=True
+    )
     address_id: Mapped[int] = mapped_column(
         ForeignKey("delivery_addresses.id"), nullable=False
     )
@@ -0,0 +1,42 @@
+# src/db/models/imports.py
+from __future__ import annotations
+
+import enum
+
+from sqlalchemy import Float, ForeignKey, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from db.base import BaseModel
+
+
+class ProductImportStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class ProductImport(BaseModel):
+    """A bulk product import job; its counters double as the progress report."""
+
+    __tablename__ = "product_imports"
+
+    format: Mapped[str] = mapped_column(String(10), nullable=False)  # ndjson, csv
+    status: Mapped[ProductImportStatus] = mapped_column(
+        String(20), nullable=False, default=ProductImportStatus.QUEUED.value
+    )
+    # uploaded file waiting for a background worker, removed once imported
+    source_path: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    user_id: Mapped[int | None] = mapped_column(
+        ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True
+    )
+
+    processed_rows: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    imported_rows: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    failed_rows: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # JSON list of {"row": <line number>, "error": <message>}, capped
+    errors: Mapped[str | None] = mapped_column(Text, nullable=True)
+    duration_seconds: Mapped[float] = mapped_column(Float, nullable=False, default=0)
+
+
+__all__ = ("ProductImport", "ProductImportStatus")
@@ -0,0 +1,36 @@
+# src/db/models/media.py
+from __future__ import annotations
+
+from sqlalchemy import Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from db.base import BaseModel
+from utils.file_utils import blob_url
+
+
+class MediaBlob(BaseModel):
+    """
+    A stored file, content-addressed: identical uploads share one blob.
+    `ref_count` is the number of product images using it.
+    """
+
+    __tablename__ = "media_blobs"
+    __table_args__ = (
+        # garbage collection: unreferenced blobs by age
+        Index("ix_media_blobs_ref_count_updated_at", "ref_count", "updated_at"),
+    )
+
+    # SHA-256 of the content, hex
+    digest: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+    ext: Mapped[str] = mapped_column(String(10), nullable=False)
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+    ref_count: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+
+    @property
+    def url(self) -> str:
+        return blob_url(self.digest, self.ext)
+
+    def __repr__(self):
+        return f"<MediaBlob(id={self.id}, digest={self.digest[:12]}, ref_count={self.ref_count})>"
@@ -2,8 +2,9 @@
 from __future__ import annotations
 
 import enum
+from datetime import datetime
 
-from sqlalchemy import ForeignKey, Integer, Numeric, String
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, Numeric, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from db.base import BaseModel
@@ -20,6 +21,10 @@ class OrderStatus(str, enum.Enum):
     REFUNDED = "refunded"
 
 
+# Orders whose items don't count as sold (popularity, recommendations)
+UNSOLD_STATUSES = (OrderStatus.CANCELLED.value, OrderStatus.REFUNDED.value)
+
+
 class Order(BaseModel):
     __tablename__ = "orders"
 
@@ -51,3 +56,32 @@ class OrderItem(BaseModel):
 
     order: Mapped["Order"] = relationship("Order", back_populates="items")
     variant: Mapped["ProductVariant"] = relationship("ProductVariant")  # type: ignore # noqa: F821
+
+
+class StockReservation(BaseModel):
+    """
+    Units of a variant held for an unpaid order until `expires_at`, counted
+    in `ProductVariant.reserved` meanwhile. Payment turns the hold into a
+    sale; cancellation or expiry gives the units back to the stock. The row
+    is deleted either way (see `services.order_service`).
+    """
+
+    __tablename__ = "stock_reservations"
+    __table_args__ = (
+        Index(
+            "ix_stock_reservations_order_id_variant_id",
+            "order_id",
+            "variant_id",
+            unique=True,
+        ),
+    )
+
+    order_id: Mapped[int] = mapped_column(
+        ForeignKey("orders.id", ondelete="CASCADE"), nullable=False
+    )
+    variant_id: Mapped[int] = mapped_column(
+        ForeignKey("product_variants.id"), nullable=False
+    )
+    quantity: Mapped[int] = mapped_column(Integer, nullable=False)
+    # the release sweep, oldest first
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
@@ -1,14 +1,28 @@
 # src/db/models/products.py
 from __future__ import annotations
 
-from sqlalchemy import Boolean, ForeignKey, Integer, Numeric, String, Text
+import enum
+
+from sqlalchemy import Boolean, ForeignKey, Index, Integer, Numeric, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from db.base import BaseModel
+from utils.file_utils import rendition_urls
+
+
+class ImageRenditionStatus(str, enum.Enum):
+    PENDING = "pending"
+    READY = "ready"
+    FAILED = "failed"
 
 
 class Product(BaseModel):
     __tablename__ = "products"
+    __table_args__ = (
+        # keyset pagination: every ordering is (sort column, id)
+        Index("ix_products_price_id", "price", "id"),
+        Index("ix_products_title_id", "title", "id"),
+    )
 
     title: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
     slug: Mapped[str] = mapped_column(
@@ -32,6 +46,23 @@ class Product(BaseModel):
         ForeignKey("sellers.id"), nullable=True, index=True
     )
 
+    # Listing card summary of the variants and images, so lists don't load
+    # them; kept in sync by `db.crud.product.sync_product_summary`
+    min_price: Mapped[float | None] = mapped_column(Numeric(12, 2), nullable=True)
+    max_price: Mapped[float | None] = mapped_column(Numeric(12, 2), nullable=True)
+    total_stock: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    main_image_url: Mapped[str | None] = mapped_column(String(500), nullable=True)
+
+    # Review aggregates: count, sum and a 1-5 star histogram, adjusted in the
+    # transaction of every review write by `db.crud.review.rating_change`
+    rating_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_sum: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_1: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_2: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_3: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_4: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_5: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
     # relations
     images: Mapped[list["ProductImage"]] = relationship(
         "ProductImage", back_populates="product", cascade="all, delete-orphan"
@@ -44,6 +75,16 @@ class Product(BaseModel):
     brand: Mapped["Brand"] = relationship("Brand", back_populates="products")  # type: ignore # noqa: F821
     seller: Mapped["Seller"] = relationship("Seller", back_populates="products")  # type: ignore # noqa: F821
 
+    @property
+    def rating_average(self) -> float | None:
+        if not self.rating_count:
+            return None
+        return round(self.rating_sum / self.rating_count, 2)
+
+    @property
+    def rating_histogram(self) -> dict[int, int]:
+        return {stars: getattr(self, f"rating_{stars}") for stars in range(1, 6)}
+
 
 class ProductImage(BaseModel):
     __tablename__ = "product_images"
@@ -52,6 +93,20 @@ class ProductImage(BaseModel):
     product_id: Mapped[int] = mapped_column(ForeignKey("products.id"), index=True)
     product: Mapped["Product"] = relationship("Product", back_populates="images")
     is_main: Mapped[bool] = mapped_column(Boolean, default=False)
+    # the stored file when the URL is one of our uploads (counted in its
+    # `ref_count`), None for external URLs
+    blob_id: Mapped[int | None] = mapped_column(
+        ForeignKey("media_blobs.id"), nullable=True, index=True
+    )
+    # resized copies made by `services.image_service`; None for images that
+    # aren't files of ours (e.g. imported URLs)
+    renditions_status: Mapped[str | None] = mapped_column(String(20), nullable=True)
+
+    @property
+    def renditions(self) -> dict[str, dict[str, str]] | None:
+        if self.renditions_status != ImageRenditionStatus.READY.value:
+            return None
+        return rendition_urls(self.url)
 
 
 class ProductVariant(BaseModel):
@@ -61,11 +116,87 @@ class ProductVariant(BaseModel):
         String(100), unique=True, nullable=False, index=True
     )
     product_id: Mapped[int] = mapped_column(ForeignKey("products.id"), index=True)
-    attributes: Mapped[str | None] = mapped_column(
-        String(500), nullable=True  # could be JSON string
-    )  # e.g. JSON string: {"color":"red","size":"M"}
     price: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False)
+    # units that can still be bought; units held for unpaid orders are in
+    # `reserved` until paid or released (on hand = stock + reserved)
     stock: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    reserved: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
 
     product: Mapped["Product"] = relationship("Product", back_populates="variants")
+    # always loaded with the variant (one IN query per batch of variants)
+    attribute_values: Mapped[list["VariantAttribute"]] = relationship(
+        "VariantAttribute",
+        back_populates="variant",
+        cascade="all, delete-orphan",
+        lazy="selectin",
+        order_by="VariantAttribute.name",
+    )
+
+    @property
+    def attributes(self) -> dict[str, str]:
+        return {item.name: item.value for item in self.attribute_values}
+
+    @attributes.setter
+    def attributes(self, values: dict[str, str] | None) -> None:
+        # update rows in place: re-adding a name before the old row is
+        # deleted would trip the (variant_id, name) unique index
+        values = values or {}
+        current = {item.name: item for item in self.attribute_values}
+        for name, item in current.items():
+            if name not in values:
+                self.attribute_values.remove(item)
+            else:
+                item.value = values[name]
+        for name, value in values.items():
+            if name not in current:
+                self.attribute_values.append(VariantAttribute(name=name, value=value))
+
+
+class VariantAttribute(BaseModel):
+    """One attribute of a variant, e.g. ("color", "red")."""
+
+    __tablename__ = "variant_attributes"
+    __table_args__ = (
+        Index(
+            "ix_variant_attributes_variant_id_name", "variant_id", "name", unique=True
+        ),
+        # attribute filters: name/value lookup straight to the variant ids
+        Index("ix_variant_attributes_name_value", "name", "value", "variant_id"),
+    )
+
+    variant_id: Mapped[int] = mapped_column(
+        ForeignKey("product_variants.id", ondelete="CASCADE"), nullable=False
+    )
+    name: Mapped[str] = mapped_column(String(100), nullable=False)
+    value: Mapped[str] = mapped_column(String(255), nullable=False)
+
+    variant: Mapped["ProductVariant"] = relationship(
+        "ProductVariant", back_populates="attribute_values"
+    )
+
+
+class RelatedProduct(BaseModel):
+    """
+    A product frequently bought together with another one: the top
+    neighbours of each product by the number of orders containing both.
+    Rebuilt as a whole by `services.related_service`.
+    """
+
+    __tablename__ = "related_products"
+    __table_args__ = (
+        Index("ix_related_products_product_id_rank", "product_id", "rank", unique=True),
+    )
+
+    product_id: Mapped[int] = mapped_column(
+        ForeignKey("products.id", ondelete="CASCADE"), nullable=False
+    )
+    related_product_id: Mapped[int] = mapped_column(
+        ForeignKey("products.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    # 1 for the strongest neighbour
+    rank: Mapped[int] = mapped_column(Integer, nullable=False)
+    # orders containing both products
+    score: Mapped[int] = mapped_column(Integer, nullable=False)
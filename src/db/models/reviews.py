@@ -1,7 +1,7 @@
 # src/db/models/review.py
 from __future__ import annotations
 
-from sqlalchemy import ForeignKey, Integer, Text
+from sqlalchemy import ForeignKey, Index, Integer, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from db.base import BaseModel
@@ -9,12 +9,16 @@ from db.base import BaseModel
 
 class Review(BaseModel):
     __tablename__ = "reviews"
+    __table_args__ = (
+        # a product's reviews, newest first (keyset pagination on id)
+        Index("ix_reviews_product_id_id", "product_id", "id"),
+    )
 
     rating: Mapped[int] = mapped_column(Integer, nullable=False)
     comment: Mapped[str | None] = mapped_column(Text, nullable=True)
 
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
-    product_id: Mapped[int] = mapped_column(ForeignKey("products.id"), index=True)
+    product_id: Mapped[int] = mapped_column(ForeignKey("products.id"))
 
     user: Mapped["User"] = relationship("User")  # type: ignore # noqa: F821
     product: Mapped["Product"] = relationship("Product")  # type: ignore # noqa: F821
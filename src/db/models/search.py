@@ -0,0 +1,41 @@
+# src/db/models/search.py
+"""
+Full-text index over products (title, description, brand and category names).
+
+The index is not an ORM model: SQLite keeps it in an FTS5 virtual table whose
+rowid is the product id, Postgres in a tsvector column with a GIN index. Both
+are named `product_search` and are maintained by `db.crud.search`.
+"""
+
+from sqlalchemy import DDL, event
+
+from db.meta import meta
+
+SEARCH_TABLE = "product_search"
+
+SQLITE_CREATE = DDL(
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+    "title, description, brand, category, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+
+POSTGRES_CREATE = [
+    DDL(
+        f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+        "product_id INTEGER PRIMARY KEY REFERENCES products (id) ON DELETE CASCADE, "
+        "document TSVECTOR NOT NULL)"
+    ),
+    DDL(
+        f"CREATE INDEX IF NOT EXISTS ix_{SEARCH_TABLE}_document "
+        f"ON {SEARCH_TABLE} USING GIN (document)"
+    ),
+]
+
+DROP = DDL(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+event.listen(meta, "after_create", SQLITE_CREATE.execute_if(dialect="sqlite"))
+for ddl in POSTGRES_CREATE:
+    event.listen(meta, "after_create", ddl.execute_if(dialect="postgresql"))
+event.listen(meta, "before_drop", DROP)
+
+__all__ = ()
@@ -1,17 +1,37 @@
 # src/schemas/cart.py
-from pydantic import BaseModel, ConfigDict
+from typing import Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+# operations accepted by one POST /carts/batch
+MAX_BATCH_OPERATIONS = 200
 
 
 class AddToCartScheme(BaseModel):
     variant_id: int
-    quantity: int = 1
+    quantity: int = Field(1, ge=1)
 
 
 class UpdateQuantityScheme(BaseModel):
     variant_id: int
+    # 0 removes the item
     quantity: int
 
 
+class CartOperationScheme(BaseModel):
+    # add: `quantity` more; set: exactly `quantity` (0 removes); remove: all
+    op: Literal["add", "set", "remove"]
+    variant_id: int
+    quantity: int = Field(1, ge=0)
+
+
+class CartBatchScheme(BaseModel):
+    # applied in order, all or none
+    operations: list[CartOperationScheme] = Field(
+        ..., min_length=1, max_length=MAX_BATCH_OPERATIONS
+    )
+
+
 class CartItemScheme(BaseModel):
     id: int
     variant_id: int
@@ -27,3 +47,47 @@ class CartResponse(BaseModel):
     items: list[CartItemScheme]
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class CartLineScheme(BaseModel):
+    id: int
+    variant_id: int
+    sku: str
+    quantity: int
+    # current price of the variant, and the price when it was put in the cart
+    price: float
+    added_price: float
+    line_total: float
+    stock: int
+    # "unavailable" (variant inactive or sold out), "insufficient_stock",
+    # "price_changed"
+    warnings: list[str]
+
+
+class PromoPreviewScheme(BaseModel):
+    code: str
+    applied: bool
+    # why the code doesn't apply
+    detail: Optional[str] = None
+
+
+class PricedCartResponse(BaseModel):
+    id: int
+    user_id: int
+    version: int
+    items: list[CartLineScheme]
+    subtotal: float
+    discount: float
+    total: float
+    promo: Optional[PromoPreviewScheme] = None
+
+
+class GuestCartItemScheme(BaseModel):
+    variant_id: int
+    quantity: int
+    # the variant's current price
+    price: float
+
+
+class GuestCartResponse(BaseModel):
+    items: list[GuestCartItemScheme]
@@ -1,4 +1,6 @@
-from typing import Optional
+from __future__ import annotations
+
+from typing import List, Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -7,6 +9,7 @@ class CategoryBaseScheme(BaseModel):
     name: str = Field(..., min_length=2, max_length=150)
     slug: str = Field(..., min_length=2, max_length=200)
     description: Optional[str] = None
+    parent_id: Optional[int] = None
 
 
 class CategoryCreateScheme(CategoryBaseScheme):
@@ -17,6 +20,8 @@ class CategoryUpdateScheme(BaseModel):
     name: Optional[str] = None
     slug: Optional[str] = None
     description: Optional[str] = None
+    # moves the category (with its subcategories); null makes it a root
+    parent_id: Optional[int] = None
 
 
 class CategoryOutScheme(CategoryBaseScheme):
@@ -25,9 +30,17 @@ class CategoryOutScheme(CategoryBaseScheme):
     model_config = ConfigDict(from_attributes=True)
 
 
+class CategoryTreeScheme(BaseModel):
+    id: int
+    name: str
+    slug: str
+    children: List[CategoryTreeScheme] = []
+
+
 __all__ = (
     "CategoryBaseScheme",
     "CategoryCreateScheme",
     "CategoryUpdateScheme",
     "CategoryOutScheme",
+    "CategoryTreeScheme",
 )
@@ -0,0 +1,6 @@
+from typing import Literal
+
+ExportFormat = Literal["ndjson", "csv"]
+
+
+__all__ = ("ExportFormat",)
@@ -1,33 +1,70 @@
-from typing import List, Optional
+import json
+from typing import Annotated, Any, Dict, List, Literal, Optional
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field, StringConstraints
+
+# Keyset orderings accepted by the product listing ("-" means descending)
+ProductOrdering = Literal["id", "-id", "price", "-price", "title", "-title"]
 
 # * Product Images *
 
 
 class ProductImageCreateScheme(BaseModel):
     url: str = Field(..., max_length=500)
+    is_main: bool = False
 
 
 class ProductImageOutScheme(BaseModel):
     id: int
     url: str = Field(..., max_length=500)
     is_main: bool
+    # pending / ready / failed; null if the image has no renditions
+    renditions_status: Optional[str] = None
+    # size ("thumbnail", "medium", "large") -> format ("webp", "jpeg") -> URL
+    renditions: Optional[Dict[str, Dict[str, str]]] = None
 
     model_config = ConfigDict(from_attributes=True)
 
 
+def _attributes_object(value: Any) -> Any:
+    # older clients send attributes as a JSON string
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            raise ValueError("attributes must be a JSON object")
+    if isinstance(value, dict):
+        # values are stored as text: 42 -> "42", true -> "true"
+        return {
+            k: v if isinstance(v, str) else json.dumps(v)
+            for k, v in value.items()
+            if v is not None
+        }
+    return value
+
+
+# Variant attributes, e.g. {"color": "red", "size": "M"}
+VariantAttributes = Annotated[
+    Dict[
+        Annotated[str, StringConstraints(min_length=1, max_length=100)],
+        Annotated[str, StringConstraints(max_length=255)],
+    ],
+    BeforeValidator(_attributes_object),
+]
+
+
 class ProductVariantCreateScheme(BaseModel):
     sku: str = Field(..., max_length=100)
-    attributes: Optional[str] = None
+    attributes: Optional[VariantAttributes] = None
     price: float
     stock: int = 0
     is_active: Optional[bool] = True
 
 
 class ProductVariantUpdateScheme(BaseModel):
-    attributes: Optional[str] = None
+    attributes: Optional[VariantAttributes] = None
     price: Optional[float] = None
+    # units on sale, not counting those `reserved` for unpaid orders
     stock: Optional[int] = None
     is_active: Optional[bool] = None
 
@@ -35,9 +72,12 @@ class ProductVariantUpdateScheme(BaseModel):
 class ProductVariantsOutScheme(BaseModel):
     id: int
     sku: str
-    attributes: Optional[str]
+    attributes: Dict[str, str] = {}
     price: float
+    # units on sale; `reserved` more are held for unpaid orders, and go back
+    # to the stock if the order is cancelled or its hold expires
     stock: int
+    reserved: int = 0
     is_active: bool
 
     model_config = ConfigDict(from_attributes=True)
@@ -49,13 +89,13 @@ class ProductCreateScheme(BaseModel):
     description: Optional[str] = None
     price: float = Field(..., ge=0)
     old_price: Optional[float] = Field(None, ge=0)
-    is_stock: Optional[bool] = True
+    in_stock: Optional[bool] = True
     is_active: Optional[bool] = True
     category_id: int
     brand_id: Optional[int] = None
     seller_id: Optional[int] = None
-    images: Optional[List[ProductImageOutScheme]] = []
-    variants: Optional[List[ProductVariantsOutScheme]] = []
+    images: Optional[List[ProductImageCreateScheme]] = []
+    variants: Optional[List[ProductVariantCreateScheme]] = []
 
 
 class ProductUpdateScheme(BaseModel):
@@ -72,6 +112,7 @@ class ProductUpdateScheme(BaseModel):
 
 
 class ProductOutScheme(BaseModel):
+    id: int
     title: str
     slug: str
     description: Optional[str]
@@ -82,12 +123,62 @@ class ProductOutScheme(BaseModel):
     category_id: int
     brand_id: Optional[int]
     seller_id: Optional[int]
+    min_price: Optional[float]
+    max_price: Optional[float]
+    total_stock: int
+    main_image_url: Optional[str]
+    rating_count: int
+    rating_average: Optional[float]
+    # stars -> number of reviews
+    rating_histogram: Dict[int, int]
     images: List[ProductImageOutScheme] = []
     variants: List[ProductVariantsOutScheme] = []
     model_config = ConfigDict(from_attributes=True)
 
 
+class ProductCardScheme(BaseModel):
+    """A product in lists: its own row only, variants and images summarized."""
+
+    id: int
+    title: str
+    slug: str
+    price: float
+    old_price: Optional[float]
+    in_stock: bool
+    is_active: bool
+    category_id: int
+    brand_id: Optional[int]
+    seller_id: Optional[int]
+    min_price: Optional[float]
+    max_price: Optional[float]
+    total_stock: int
+    main_image_url: Optional[str]
+    rating_count: int
+    rating_average: Optional[float]
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ProductFacetPageScheme(BaseModel):
+    total: int
+    items: List[ProductCardScheme]
+    # facet -> value -> number of matching products, e.g. {"brand_id": {"3": 12}}
+    facets: dict[str, dict[str, int]]
+    next_cursor: Optional[str] = None
+
+
+class SuggestionScheme(BaseModel):
+    """A typeahead match: a product title, brand name or category name."""
+
+    kind: Literal["product", "brand", "category"]
+    id: int
+    text: str
+    slug: Optional[str]
+    model_config = ConfigDict(from_attributes=True)
+
+
 __all__ = (
+    "ProductOrdering",
+    "VariantAttributes",
     "ProductImageCreateScheme",
     "ProductVariantCreateScheme",
     "ProductVariantsOutScheme",
@@ -95,4 +186,7 @@ __all__ = (
     "ProductCreateScheme",
     "ProductUpdateScheme",
     "ProductOutScheme",
+    "ProductCardScheme",
+    "ProductFacetPageScheme",
+    "SuggestionScheme",
 )
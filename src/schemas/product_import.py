@@ -0,0 +1,48 @@
+import json
+from datetime import datetime
+from typing import List, Literal
+
+from pydantic import BaseModel, ConfigDict, computed_field, field_validator
+
+ProductImportFormat = Literal["ndjson", "csv"]
+
+
+class ProductImportErrorScheme(BaseModel):
+    row: int
+    error: str
+
+
+class ProductImportOutScheme(BaseModel):
+    id: int
+    format: ProductImportFormat
+    status: str
+    processed_rows: int
+    imported_rows: int
+    failed_rows: int
+    duration_seconds: float
+    errors: List[ProductImportErrorScheme] = []
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @field_validator("errors", mode="before")
+    @classmethod
+    def parse_errors(cls, value):
+        if isinstance(value, str):
+            return json.loads(value)
+        return value or []
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def rows_per_second(self) -> float:
+        if not self.duration_seconds:
+            return 0.0
+        return round(self.processed_rows / self.duration_seconds, 1)
+
+
+__all__ = (
+    "ProductImportFormat",
+    "ProductImportErrorScheme",
+    "ProductImportOutScheme",
+)
@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Optional
 
 from pydantic import BaseModel, ConfigDict, Field
@@ -6,11 +7,10 @@ from pydantic import BaseModel, ConfigDict, Field
 class ReviewBaseScheme(BaseModel):
     rating: int = Field(..., ge=1, le=5)
     comment: Optional[str] = None
-    user_id: int
-    product_id: int
 
 
 class ReviewCreateScheme(ReviewBaseScheme):
+    # the product comes from the path, the author from the token
     pass
 
 
@@ -21,6 +21,10 @@ class ReviewUpdateScheme(BaseModel):
 
 class ReviewOutScheme(ReviewBaseScheme):
     id: int
+    user_id: int
+    product_id: int
+    created_at: datetime
+    updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -1,13 +1,59 @@
 from __future__ import annotations
 
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Iterable, Optional
+
 from fastapi import Depends, HTTPException
+from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.guest_carts import get_guest_cart_store
+from core.prometheus import get_maintenance_metrics
+from core.settings import settings
 from db.crud.cart import CartCRUD
 from db.crud.product import ProductCRUD
 from db.dependencies.sessions import get_db_session
-from db.models.carts import Cart, CartItem
+from db.models.carts import Cart
 from db.models.products import ProductVariant
+from schemas.cart import CartOperationScheme, GuestCartItemScheme, GuestCartResponse
+
+
+def fold_operations(
+    quantities: dict[int, int], operations: Iterable[CartOperationScheme]
+) -> dict[int, int]:
+    """
+    Final quantity of every variant after applying `operations` in order to
+    the cart `quantities` (variant id -> quantity); 0 means removed.
+    """
+    quantities = dict(quantities)
+    for operation in operations:
+        current = quantities.get(operation.variant_id, 0)
+        if operation.op == "add":
+            quantities[operation.variant_id] = current + operation.quantity
+        elif operation.op == "set":
+            quantities[operation.variant_id] = operation.quantity
+        else:
+            quantities[operation.variant_id] = 0
+    return quantities
+
+
+def merge_guest_lines(lines, guest: dict[int, int]) -> dict[int, tuple[int, Decimal]]:
+    """
+    Lines (variant id -> (quantity, price)) to write when the guest cart
+    `guest` is merged into the cart `lines` (see `CartCRUD.get_lines`):
+    quantities add up, capped at the stock but never below what the user's
+    cart already holds. Unchanged lines are left out.
+    """
+    merged = {}
+    for line in lines:
+        current = line.quantity or 0
+        quantity = max(current, min(current + guest[line.id], line.stock))
+        if quantity != current:
+            merged[line.id] = (quantity, line.price)
+    return merged
 
 
 class CartService:
@@ -19,62 +65,221 @@ class CartService:
     async def get_user_cart(self, user_id: int) -> Cart:
         cart = await self.cart_crud.get_cart_by_user(user_id)
         if not cart:
-            cart = await self.cart_crud.create_cart_for_user(user_id)
+            await self.cart_crud.ensure_cart(user_id)
+            await self.session.commit()
+            cart = await self.cart_crud.get_cart_by_user(user_id)
         return cart
 
-    async def add_to_cart(
-        self, user_id: int, variant_id: int, quantity: int
-    ) -> CartItem:
-        cart = await self.get_user_cart(user_id)
-
-        variant: ProductVariant | None = await self.get_variant_by_id(variant_id)
-        if not variant:
-            raise HTTPException(status_code=404, detail="Variant not found")
-
-        if variant.stock < quantity:
+    async def add_to_cart(self, user_id: int, variant_id: int, quantity: int) -> Cart:
+        """Upsert a cart line; returns the cart as the same transaction sees it."""
+        written = await self.cart_crud.upsert_item(user_id, variant_id, quantity)
+        if written is None and await self.cart_crud.ensure_cart(user_id):
+            # the user's first item: the cart didn't exist
+            written = await self.cart_crud.upsert_item(user_id, variant_id, quantity)
+        if written is None:
+            await self.session.rollback()
+            if not await self.get_variant_by_id(variant_id):
+                raise HTTPException(status_code=404, detail="Variant not found")
             raise HTTPException(status_code=400, detail="Not enough stock")
-
-        existing_item = await self.cart_crud.get_item(cart.id, variant_id)
-
-        if existing_item:
-            new_qty = existing_item.quantity + quantity
-            if new_qty > variant.stock:
-                raise HTTPException(400, "Not enough stock")
-            return await self.cart_crud.update_item_quantity(existing_item, new_qty)
-
-        return await self.cart_crud.add_item(cart, variant, quantity)
+        return await self._commit_cart(user_id)
 
     async def update_quantity(
         self, user_id: int, variant_id: int, quantity: int
-    ) -> CartItem | None:
-        cart = await self.get_user_cart(user_id)
+    ) -> Cart:
+        """Set the quantity of a line in the cart; 0 or less removes it."""
+        if quantity <= 0:
+            await self.remove_from_cart(user_id, variant_id)
+            return await self.get_user_cart(user_id)
+        written = await self.cart_crud.set_item_quantity(user_id, variant_id, quantity)
+        if written is None:
+            await self.session.rollback()
+            lines = await self.cart_crud.get_lines(user_id, [variant_id])
+            if not lines or lines[0].quantity is None:
+                raise HTTPException(status_code=404, detail="Item not found in cart")
+            raise HTTPException(status_code=400, detail="Not enough stock")
+        return await self._commit_cart(user_id)
 
-        item = await self.cart_crud.get_item(cart.id, variant_id)
-        if not item:
-            raise HTTPException(status_code=404, detail="Item not found in cart")
+    async def _commit_cart(self, user_id: int) -> Cart:
+        """Commit a write; returns the cart as the same transaction saw it."""
+        cart = await self.cart_crud.get_cart_by_user(user_id)
+        await self.session.commit()
+        return cart
 
-        if quantity <= 0:
-            await self.cart_crud.remove_item(item)
-            return None
+    async def apply_batch(
+        self, user_id: int, operations: list[CartOperationScheme]
+    ) -> Cart:
+        """
+        Apply add/set/remove operations in order, all or none: the stock of
+        every variant is checked against its final quantity with one query,
+        then the changed lines are written and committed once.
+        """
+        variant_ids = sorted({operation.variant_id for operation in operations})
+        lines = await self.cart_crud.get_lines(user_id, variant_ids)
 
-        return await self.cart_crud.update_item_quantity(item, quantity)
+        missing = set(variant_ids) - {line.id for line in lines}
+        if missing:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Variants not found: {', '.join(map(str, sorted(missing)))}",
+            )
+        current = {line.id: line.quantity or 0 for line in lines}
+        final = fold_operations(current, operations)
+        short = [line.sku for line in lines if final[line.id] > line.stock]
+        if short:
+            raise HTTPException(
+                status_code=400, detail=f"Not enough stock for {', '.join(short)}"
+            )
 
-    async def remove_from_cart(self, user_id: int, variant_id: int) -> None:
+        changed = {
+            line.id: (final[line.id], line.price)
+            for line in lines
+            if final[line.id] and final[line.id] != current[line.id]
+        }
+        removed = [line.id for line in lines if current[line.id] and not final[line.id]]
+        if changed:
+            await self.cart_crud.ensure_cart(user_id)
+            await self.cart_crud.set_items(user_id, changed)
+        if removed:
+            await self.cart_crud.remove_items(user_id, removed)
         cart = await self.get_user_cart(user_id)
-        item = await self.cart_crud.get_item(cart.id, variant_id)
+        await self.session.commit()
+        return cart
 
-        if not item:
-            raise HTTPException(status_code=404, detail="Item not in cart")
+    async def merge_guest_cart(self, user_id: int, guest_cart_id: str) -> None:
+        """
+        Move a guest cart into the user's cart on login, with one read of the
+        variants, one multi-row upsert and one commit. Variants deleted since
+        they were added are dropped. The guest cart is removed afterwards.
+        """
+        store = get_guest_cart_store()
+        guest = await store.get(guest_cart_id)
+        if guest:
+            lines = await self.cart_crud.get_lines(user_id, sorted(guest))
+            merged = merge_guest_lines(lines, guest)
+            if merged:
+                await self.cart_crud.ensure_cart(user_id)
+                await self.cart_crud.set_items(user_id, merged)
+                await self.session.commit()
+        await store.clear(guest_cart_id)
 
-        await self.cart_crud.remove_item(item)
+    async def remove_from_cart(self, user_id: int, variant_id: int) -> None:
+        if not await self.cart_crud.remove_item(user_id, variant_id):
+            raise HTTPException(status_code=404, detail="Item not in cart")
+        await self.session.commit()
 
     async def clear_cart(self, user_id: int) -> None:
-        cart = await self.get_user_cart(user_id)
-        await self.cart_crud.clear_cart(cart.id)
+        await self.cart_crud.clear_cart(user_id)
 
     async def get_variant_by_id(self, variant_id: int) -> ProductVariant | None:
         return await self.session.get(ProductVariant, variant_id)
 
+    async def sweep_abandoned(self) -> dict[str, int]:
+        """
+        Delete cart lines untouched for CART_ITEM_EXPIRE_DAYS, then carts
+        left empty as long, CART_SWEEP_BATCH_SIZE rows per short transaction
+        with a pause after each. Returns the rows deleted per table.
+        """
+        # naive UTC, like the timestamps the database writes
+        cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(
+            days=settings.CART_ITEM_EXPIRE_DAYS
+        )
+        deadline = time.monotonic() + settings.CART_SWEEP_MAX_SECONDS
+        metrics = get_maintenance_metrics()
+        removed = {}
+        for table, delete_batch in (
+            ("cart_items", self.cart_crud.delete_stale_items),
+            ("carts", self.cart_crud.delete_empty_carts),
+        ):
+            removed[table] = 0
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                count = await delete_batch(cutoff, settings.CART_SWEEP_BATCH_SIZE)
+                await self.session.commit()
+                elapsed = time.perf_counter() - started
+                metrics.batch_latency.labels("cart_sweep", table).observe(elapsed)
+                metrics.rows_removed.labels("cart_sweep", table).inc(count)
+                removed[table] += count
+                if count < settings.CART_SWEEP_BATCH_SIZE:
+                    break
+                await asyncio.sleep(max(settings.CART_SWEEP_PAUSE_SECONDS, elapsed))
+        logger.info(
+            "Cart sweep: {} lines and {} empty carts deleted",
+            removed["cart_items"],
+            removed["carts"],
+        )
+        return removed
+
+
+class GuestCartService:
+    """
+    Carts of visitors who aren't logged in, kept in the guest cart store
+    (see `core.guest_carts`); the database is only read, for stock and prices.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.cart_crud = CartCRUD(session)
+        self.store = get_guest_cart_store()
+
+    async def get_cart(self, cart_id: Optional[str]) -> GuestCartResponse:
+        items = await self.store.get(cart_id) if cart_id else {}
+        if not items:
+            return GuestCartResponse(items=[])
+        lines = await self.cart_crud.get_variants(sorted(items))
+        return GuestCartResponse(
+            items=[
+                GuestCartItemScheme(
+                    variant_id=line.id, quantity=items[line.id], price=line.price
+                )
+                for line in lines
+            ]
+        )
+
+    async def add_to_cart(
+        self, cart_id: str, variant_id: int, quantity: int
+    ) -> GuestCartResponse:
+        await self._check(cart_id, variant_id, quantity, add=True)
+        await self.store.add(cart_id, variant_id, quantity)
+        return await self.get_cart(cart_id)
+
+    async def update_quantity(
+        self, cart_id: str, variant_id: int, quantity: int
+    ) -> GuestCartResponse:
+        if quantity <= 0:
+            await self.remove_from_cart(cart_id, variant_id)
+        else:
+            await self._check(cart_id, variant_id, quantity, add=False)
+            await self.store.set(cart_id, variant_id, quantity)
+        return await self.get_cart(cart_id)
+
+    async def _check(
+        self, cart_id: str, variant_id: int, quantity: int, add: bool
+    ) -> None:
+        lines = await self.cart_crud.get_variants([variant_id])
+        if not lines:
+            raise HTTPException(status_code=404, detail="Variant not found")
+        items = await self.store.get(cart_id)
+        if not add and variant_id not in items:
+            raise HTTPException(status_code=404, detail="Item not found in cart")
+        if variant_id not in items and len(items) >= settings.GUEST_CART_MAX_ITEMS:
+            raise HTTPException(status_code=400, detail="Cart is full")
+        if add:
+            quantity += items.get(variant_id, 0)
+        if quantity > lines[0].stock:
+            raise HTTPException(status_code=400, detail="Not enough stock")
+
+    async def remove_from_cart(self, cart_id: str, variant_id: int) -> None:
+        if not await self.store.remove(cart_id, variant_id):
+            raise HTTPException(status_code=404, detail="Item not in cart")
+
+    async def clear_cart(self, cart_id: str) -> None:
+        await self.store.clear(cart_id)
+
 
 def get_cart_service(session: AsyncSession = Depends(get_db_session)) -> CartService:
     return CartService(session)
+
+
+def get_guest_cart_service(
+    session: AsyncSession = Depends(get_db_session),
+) -> GuestCartService:
+    return GuestCartService(session)
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import csv
+import io
+import zlib
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime
+from typing import Any, Optional
+
+import orjson
+from fastapi import Depends, HTTPException
+from sqlalchemy import Select, func, select
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.settings import settings
+from db.dependencies.auth import ADMIN_ROLE
+from db.dependencies.sessions import get_db_session
+from db.models.orders import Order, OrderItem
+from db.models.products import Product, ProductVariant, VariantAttribute
+from db.models.sellers import Seller
+from db.models.users import User
+
+PRODUCT_COLUMNS = (
+    Product.id,
+    Product.title,
+    Product.slug,
+    Product.description,
+    Product.price,
+    Product.old_price,
+    Product.in_stock,
+    Product.is_active,
+    Product.category_id,
+    Product.brand_id,
+    Product.seller_id,
+    Product.created_at,
+    Product.updated_at,
+)
+# attributes flattened to "color=red;size=M"
+VARIANT_ATTRIBUTES = (
+    select(
+        func.aggregate_strings(
+            VariantAttribute.name + "=" + VariantAttribute.value, ";"
+        )
+    )
+    .where(VariantAttribute.variant_id == ProductVariant.id)
+    .scalar_subquery()
+    .label("attributes")
+)
+VARIANT_COLUMNS = (
+    ProductVariant.id,
+    ProductVariant.product_id,
+    ProductVariant.sku,
+    VARIANT_ATTRIBUTES,
+    ProductVariant.price,
+    ProductVariant.stock,
+    ProductVariant.is_active,
+    ProductVariant.created_at,
+    ProductVariant.updated_at,
+)
+# one row per order item; orders without items get a single row of NULL items
+ORDER_COLUMNS = (
+    Order.id.label("order_id"),
+    Order.user_id,
+    Order.status,
+    Order.currency,
+    Order.total_amount,
+    Order.created_at,
+    OrderItem.id.label("item_id"),
+    OrderItem.variant_id,
+    ProductVariant.sku,
+    OrderItem.quantity,
+    OrderItem.price,
+)
+
+
+def _json_default(value: Any) -> str:
+    # Decimal prices; orjson handles datetimes itself
+    return str(value)
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def encode_ndjson(rows: Sequence[RowMapping]) -> bytes:
+    return b"".join(
+        orjson.dumps(dict(row), default=_json_default) + b"\n" for row in rows
+    )
+
+
+class _CsvEncoder:
+    """CSV lines of row batches, written through one reused buffer."""
+
+    def __init__(self) -> None:
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+
+    def _flush(self) -> bytes:
+        data = self.buffer.getvalue().encode()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return data
+
+    def header(self, columns: Sequence[str]) -> bytes:
+        self.writer.writerow(columns)
+        return self._flush()
+
+    def __call__(self, rows: Sequence[RowMapping]) -> bytes:
+        self.writer.writerows([_csv_value(v) for v in row.values()] for row in rows)
+        return self._flush()
+
+
+async def encode_export(
+    partitions: AsyncIterator[Sequence[RowMapping]],
+    columns: Sequence[str],
+    format: str,
+    compress: bool = False,
+) -> AsyncIterator[bytes]:
+    """
+    Bytes of an NDJSON or CSV (with a header row) export, optionally gzipped,
+    encoded one cursor partition at a time.
+    """
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS) if compress else None
+
+    def emit(data: bytes) -> bytes:
+        return compressor.compress(data) if compressor else data
+
+    encode = encode_ndjson
+    if format == "csv":
+        encode = _CsvEncoder()
+        yield emit(encode.header(columns))
+
+    async for rows in partitions:
+        if chunk := emit(encode(rows)):
+            yield chunk
+    if compressor:
+        yield compressor.flush()
+
+
+class ExportService:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def seller_scope(self, user: User) -> Optional[int]:
+        """None for admins (everything), else the seller id to restrict to."""
+        if user.role == ADMIN_ROLE:
+            return None
+        seller_id = await self.session.scalar(
+            select(Seller.id).where(Seller.user_id == user.id)
+        )
+        if seller_id is None:
+            raise HTTPException(status_code=403, detail="Seller profile not found")
+        return seller_id
+
+    def products(self, seller_id: Optional[int] = None) -> Select:
+        stmt = select(*PRODUCT_COLUMNS).order_by(Product.id)
+        if seller_id is not None:
+            stmt = stmt.where(Product.seller_id == seller_id)
+        return stmt
+
+    def variants(self, seller_id: Optional[int] = None) -> Select:
+        stmt = select(*VARIANT_COLUMNS).order_by(ProductVariant.id)
+        if seller_id is not None:
+            stmt = stmt.join(Product, Product.id == ProductVariant.product_id).where(
+                Product.seller_id == seller_id
+            )
+        return stmt
+
+    def orders(self) -> Select:
+        return (
+            select(*ORDER_COLUMNS)
+            .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+            .outerjoin(ProductVariant, ProductVariant.id == OrderItem.variant_id)
+            .order_by(Order.id, OrderItem.id)
+        )
+
+    async def partitions(self, stmt: Select) -> AsyncIterator[Sequence[RowMapping]]:
+        """
+        Rows of `stmt` in batches of EXPORT_BATCH_SIZE, read through a
+        server-side cursor so only one batch is in memory at a time. Plain
+        column rows, so nothing piles up in the session's identity map.
+        """
+        result = await self.session.stream(
+            stmt.execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+        )
+        try:
+            async for rows in result.mappings().partitions():
+                yield rows
+        finally:
+            await result.close()
+
+    def export(
+        self, stmt: Select, format: str, compress: bool = False
+    ) -> AsyncIterator[bytes]:
+        columns = [column.name for column in stmt.selected_columns]
+        return encode_export(self.partitions(stmt), columns, format, compress)
+
+
+async def get_export_service(
+    session: AsyncSession = Depends(get_db_session),
+) -> ExportService:
+    return ExportService(session)
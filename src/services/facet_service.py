@@ -0,0 +1,444 @@
+from __future__ import annotations
+
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Iterable, Sequence
+
+import numpy as np
+from fastapi import Depends, HTTPException
+from loguru import logger
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.database import get_async_session_maker
+from core.indexes import IndexLoader
+from core.settings import settings
+from db.crud.product import ProductCRUD
+from db.dependencies.sessions import get_db_session
+from db.models.products import Product, ProductVariant, VariantAttribute
+from utils.pagination import decode_cursor, encode_cursor
+
+# Variant attributes are indexed as one facet per name: "attr.<name>"
+ATTR_PREFIX = "attr."
+
+
+# Single-valued product columns; each gets one code array indexed by product id
+SCALAR_FACETS = ("category_id", "brand_id", "seller_id", "in_stock")
+
+
+def _label(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+class _Vocabulary:
+    """Dense integer codes for facet values; code 0 is reserved for "none"."""
+
+    def __init__(self) -> None:
+        self.values: list[Any] = [None]
+        self.codes: dict[Any, int] = {}
+
+    def encode(self, value: Any) -> int:
+        if value is None:
+            return 0
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def table(self, values: Iterable[Any]) -> np.ndarray:
+        """Boolean lookup table over codes, True for the given values."""
+        table = np.zeros(len(self.values), dtype=bool)
+        table[[self.codes[v] for v in values if v in self.codes]] = True
+        return table
+
+
+@dataclass
+class FacetResult:
+    mask: np.ndarray
+    total: int
+    counts: dict[str, dict[str, int]]
+
+
+class FacetIndex:
+    """
+    In-memory, columnar facet index over active products.
+
+    Product ids index straight into numpy arrays: a boolean `active` mask, the
+    price, and one value-code array per scalar facet. Variant attributes are
+    multi-valued, so they live in parallel (product id, value code) pair
+    arrays. Filters become boolean masks and facet counts are `np.bincount`
+    over the masked codes, so a query is a handful of vectorised passes and
+    no SQL.
+    """
+
+    def __init__(self, buckets: Sequence[int]):
+        self.buckets = list(buckets)
+        self.bounds = np.asarray(self.buckets, dtype=np.float64)
+        self._reset()
+
+    def _reset(self) -> None:
+        self.capacity = 0
+        self.active = np.zeros(0, dtype=bool)
+        self.price = np.zeros(0, dtype=np.float64)
+        self.codes = {facet: np.zeros(0, dtype=np.int32) for facet in SCALAR_FACETS}
+        self.vocab = {facet: _Vocabulary() for facet in SCALAR_FACETS}
+        # Variant attributes: vocabulary of (name, value) and the pair arrays.
+        # Removed pairs are tombstoned with product id 0, which is never active.
+        self.attributes = _Vocabulary()
+        self.pair_ids = np.zeros(0, dtype=np.int64)
+        self.pair_codes = np.zeros(0, dtype=np.int32)
+        self.pair_count = 0
+        self.pairs_of: dict[int, list[int]] = {}
+        self.dead_pairs = 0
+        self.loaded_at: float | None = None
+
+    @property
+    def size(self) -> int:
+        return int(np.count_nonzero(self.active))
+
+    def bucket_labels(self) -> list[str]:
+        labels, lower = [], 0
+        for upper in self.buckets:
+            labels.append(f"{lower}-{upper}")
+            lower = upper
+        labels.append(f"{lower}+")
+        return labels
+
+    # Building
+
+    def _reserve(self, size: int) -> None:
+        if size <= self.capacity:
+            return
+        capacity = max(size, self.capacity * 2, 1024)
+
+        def grow(array: np.ndarray) -> np.ndarray:
+            grown = np.zeros(capacity, dtype=array.dtype)
+            grown[: len(array)] = array
+            return grown
+
+        self.active = grow(self.active)
+        self.price = grow(self.price)
+        self.codes = {facet: grow(codes) for facet, codes in self.codes.items()}
+        self.capacity = capacity
+
+    def _scalar_value(self, product: Product, facet: str) -> Any:
+        if facet == "in_stock":
+            return bool(product.in_stock)
+        return getattr(product, facet)
+
+    def _attribute_codes(self, attributes: Iterable[dict[str, str]]) -> set[int]:
+        return {
+            self.attributes.encode((name, value))
+            for attrs in attributes
+            for name, value in attrs.items()
+        }
+
+    def _append_pairs(self, product_ids: list[int], codes: list[int]) -> None:
+        count = len(product_ids)
+        needed = self.pair_count + count
+        if needed > len(self.pair_ids):
+            capacity = max(needed, len(self.pair_ids) * 2, 1024)
+            for name in ("pair_ids", "pair_codes"):
+                array = getattr(self, name)
+                grown = np.zeros(capacity, dtype=array.dtype)
+                grown[: self.pair_count] = array[: self.pair_count]
+                setattr(self, name, grown)
+        self.pair_ids[self.pair_count : needed] = product_ids
+        self.pair_codes[self.pair_count : needed] = codes
+        for slot, product_id in enumerate(product_ids, start=self.pair_count):
+            self.pairs_of.setdefault(product_id, []).append(slot)
+        self.pair_count = needed
+
+    def _compact_pairs(self) -> None:
+        live = self.pair_ids[: self.pair_count] != 0
+        product_ids = self.pair_ids[: self.pair_count][live].tolist()
+        codes = self.pair_codes[: self.pair_count][live].tolist()
+        self.pair_count, self.dead_pairs, self.pairs_of = 0, 0, {}
+        self._append_pairs(product_ids, codes)
+
+    def build(
+        self,
+        products: Iterable[Product],
+        attributes: dict[int, list[dict[str, str]]],
+    ) -> None:
+        """Replace the whole index, filling each column in one assignment."""
+        self._reset()
+        rows = [product for product in products if product.is_active]
+        if rows:
+            ids = np.fromiter((p.id for p in rows), dtype=np.int64, count=len(rows))
+            self._reserve(int(ids.max()) + 1)
+            self.active[ids] = True
+            self.price[ids] = [float(p.price) for p in rows]
+            for facet in SCALAR_FACETS:
+                vocab = self.vocab[facet]
+                self.codes[facet][ids] = [
+                    vocab.encode(self._scalar_value(p, facet)) for p in rows
+                ]
+
+        pair_ids: list[int] = []
+        pair_codes: list[int] = []
+        for product in rows:
+            for code in self._attribute_codes(attributes.get(product.id, ())):
+                pair_ids.append(product.id)
+                pair_codes.append(code)
+        self._append_pairs(pair_ids, pair_codes)
+        self.loaded_at = time.monotonic()
+
+    def remove(self, product_id: int) -> None:
+        if product_id < self.capacity:
+            self.active[product_id] = False
+        slots = self.pairs_of.pop(product_id, [])
+        if slots:
+            self.pair_ids[slots] = 0
+            self.dead_pairs += len(slots)
+
+    def upsert(
+        self, product: Product, attributes: Iterable[dict[str, str]] = ()
+    ) -> None:
+        self.remove(product.id)
+        if not product.is_active:
+            return
+        self._reserve(product.id + 1)
+        self.active[product.id] = True
+        self.price[product.id] = float(product.price)
+        for facet in SCALAR_FACETS:
+            value = self._scalar_value(product, facet)
+            self.codes[facet][product.id] = self.vocab[facet].encode(value)
+        codes = sorted(self._attribute_codes(attributes))
+        self._append_pairs([product.id] * len(codes), codes)
+        if self.dead_pairs > self.pair_count // 2 + 1024:
+            self._compact_pairs()
+
+    # Querying
+
+    def _attribute_mask(self, table: np.ndarray) -> np.ndarray:
+        mask = np.zeros(self.capacity, dtype=bool)
+        pairs = table[self.pair_codes[: self.pair_count]]
+        mask[self.pair_ids[: self.pair_count][pairs]] = True
+        if self.capacity:  # nothing indexed yet: an empty mask
+            mask[0] = False
+        return mask
+
+    def _price_mask(self, low: Decimal | None, high: Decimal | None) -> np.ndarray:
+        mask = np.ones(self.capacity, dtype=bool)
+        if low is not None:
+            mask &= self.price >= float(low)
+        if high is not None:
+            mask &= self.price <= float(high)
+        return mask
+
+    def _attribute_counts(
+        self, scope: np.ndarray, only: str | None = None
+    ) -> dict[str, dict[str, int]]:
+        product_ids = self.pair_ids[: self.pair_count]
+        codes = self.pair_codes[: self.pair_count][scope[product_ids]]
+        tally = np.bincount(codes, minlength=len(self.attributes.values))
+        counts: dict[str, dict[str, int]] = {}
+        for code in np.flatnonzero(tally).tolist():
+            name, value = self.attributes.values[code]
+            if only is None or name == only:
+                counts.setdefault(ATTR_PREFIX + name, {})[value] = int(tally[code])
+        return counts
+
+    def query(
+        self,
+        filters: dict[str, Sequence[Any]],
+        price_min: Decimal | None = None,
+        price_max: Decimal | None = None,
+    ) -> FacetResult:
+        """
+        Products matching every facet (any of its values), with counts per
+        facet value computed against the other facets' filters, so picking
+        a brand still shows how many products each other brand has.
+        """
+        selected: dict[str, np.ndarray] = {}
+        for facet, values in filters.items():
+            if not values:
+                continue
+            if facet.startswith(ATTR_PREFIX):
+                name = facet.removeprefix(ATTR_PREFIX)
+                table = self.attributes.table((name, str(v)) for v in values)
+                selected[facet] = self._attribute_mask(table)
+            elif facet in self.codes:
+                table = self.vocab[facet].table(values)
+                selected[facet] = table[self.codes[facet]]
+        if price_min is not None or price_max is not None:
+            selected["price"] = self._price_mask(price_min, price_max)
+
+        def base(excluding: str | None = None) -> np.ndarray:
+            mask = self.active.copy()
+            for facet, facet_mask in selected.items():
+                if facet != excluding:
+                    mask &= facet_mask
+            return mask
+
+        matched = base()
+        counts: dict[str, dict[str, int]] = {}
+        for facet in SCALAR_FACETS:
+            scope = base(excluding=facet) if facet in selected else matched
+            values = self.vocab[facet].values
+            tally = np.bincount(self.codes[facet][scope], minlength=len(values))
+            facet_counts = {
+                _label(values[code]): int(tally[code])
+                for code in np.flatnonzero(tally).tolist()
+                if code
+            }
+            if facet_counts:
+                counts[facet] = facet_counts
+
+        scope = base(excluding="price") if "price" in selected else matched
+        labels = self.bucket_labels()
+        buckets = np.searchsorted(self.bounds, self.price[scope], side="right")
+        tally = np.bincount(buckets, minlength=len(labels))
+        price_counts = {
+            labels[i]: int(tally[i]) for i in np.flatnonzero(tally).tolist()
+        }
+        if price_counts:
+            counts["price"] = price_counts
+
+        counts.update(
+            {
+                facet: facet_counts
+                for facet, facet_counts in self._attribute_counts(matched).items()
+                if facet not in selected
+            }
+        )
+        for facet in selected:
+            if facet.startswith(ATTR_PREFIX):
+                name = facet.removeprefix(ATTR_PREFIX)
+                counts.update(self._attribute_counts(base(excluding=facet), name))
+
+        return FacetResult(
+            mask=matched, total=int(np.count_nonzero(matched)), counts=counts
+        )
+
+    @staticmethod
+    def page(mask: np.ndarray, limit: int, before: int | None = None) -> list[int]:
+        """Ids from `mask`, highest (newest) first, below `before`."""
+        ids = np.flatnonzero(mask)
+        if before is not None:
+            ids = ids[: np.searchsorted(ids, before)]
+        return ids[max(len(ids) - limit, 0) :][::-1].tolist()
+
+
+facet_index = FacetIndex(buckets=settings.FACET_PRICE_BUCKETS)
+
+
+async def rebuild_facet_index() -> None:
+    """Rebuild the shared index with its own session (startup, TTL expiry)."""
+    async with get_async_session_maker()() as session:
+        await FacetService(session).rebuild()
+
+
+facet_loader = IndexLoader(
+    rebuild_facet_index, lambda: settings.FACET_INDEX_TTL_SECONDS
+)
+
+
+class FacetService:
+    def __init__(self, session: AsyncSession, index: FacetIndex = facet_index):
+        self.session = session
+        self.index = index
+        self.crud = ProductCRUD(session)
+
+    async def _variant_attributes(
+        self, product_ids: Sequence[int] | None = None
+    ) -> dict[int, list[dict[str, str]]]:
+        stmt = (
+            select(
+                ProductVariant.product_id,
+                VariantAttribute.variant_id,
+                VariantAttribute.name,
+                VariantAttribute.value,
+            )
+            .join(VariantAttribute, VariantAttribute.variant_id == ProductVariant.id)
+            .where(ProductVariant.is_active)
+        )
+        if product_ids is not None:
+            stmt = stmt.where(ProductVariant.product_id.in_(product_ids))
+        result = await self.session.stream(stmt.execution_options(yield_per=5000))
+        by_variant: dict[int, tuple[int, dict[str, str]]] = {}
+        async for product_id, variant_id, name, value in result:
+            by_variant.setdefault(variant_id, (product_id, {}))[1][name] = value
+        attributes: dict[int, list[dict[str, str]]] = defaultdict(list)
+        for product_id, values in by_variant.values():
+            attributes[product_id].append(values)
+        return attributes
+
+    async def rebuild(self) -> None:
+        started = time.perf_counter()
+        result = await self.session.stream_scalars(
+            select(Product).execution_options(yield_per=5000)
+        )
+        products = [product async for product in result]
+        self.index.build(products, await self._variant_attributes())
+        logger.info(
+            "Facet index built: {} products in {:.2f}s",
+            self.index.size,
+            time.perf_counter() - started,
+        )
+
+    async def ensure_loaded(self) -> None:
+        """Build the index on first use, rebuild it once stale (`IndexLoader`)."""
+        await facet_loader.ensure_loaded(self.index, self.rebuild)
+
+    async def refresh(self, product_ids: Sequence[int]) -> None:
+        """Re-index products after a write (no-op until the index is loaded)."""
+        if self.index.loaded_at is None or not product_ids:
+            return
+        products = await self.crud.get_many(product_ids, load=())
+        attributes = await self._variant_attributes(product_ids)
+        found = set()
+        for product in products:
+            found.add(product.id)
+            self.index.upsert(product, attributes.get(product.id, ()))
+        for product_id in set(product_ids) - found:
+            self.index.remove(product_id)
+
+    def index_product(self, product: Product) -> None:
+        """Re-index a product whose variants are already loaded."""
+        if self.index.loaded_at is None:
+            return
+        attributes = [
+            variant.attributes for variant in product.variants if variant.is_active
+        ]
+        self.index.upsert(product, attributes)
+
+    def remove(self, product_id: int) -> None:
+        self.index.remove(product_id)
+
+    async def filter_products(
+        self,
+        filters: dict[str, Sequence[Any]],
+        price_min: Decimal | None = None,
+        price_max: Decimal | None = None,
+        limit: int = 50,
+        cursor: str | None = None,
+    ) -> tuple[list[Product], FacetResult, str | None]:
+        await self.ensure_loaded()
+        result = self.index.query(filters, price_min, price_max)
+
+        before = None
+        if cursor:
+            try:
+                before = int(decode_cursor(cursor, "facets")[0])
+            except (IndexError, TypeError, ValueError):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+        ids = self.index.page(result.mask, limit + 1, before=before)
+
+        next_cursor = None
+        if len(ids) > limit:
+            ids = ids[:limit]
+            next_cursor = encode_cursor("facets", [ids[-1]])
+        return await self.crud.get_many(ids, load=()), result, next_cursor
+
+
+async def get_facet_service(
+    session: AsyncSession = Depends(get_db_session),
+) -> FacetService:
+    return FacetService(session)
@@ -1,41 +1,106 @@
+import hashlib
+import os
 import uuid
+from dataclasses import dataclass
 from pathlib import Path
 
-from fastapi import HTTPException, UploadFile
+import aiofiles
+import aiofiles.os
+from fastapi import HTTPException, UploadFile, status
 
 from core.settings import settings
+from utils.file_utils import (
+    IMAGE_SIGNATURE_LENGTH,
+    blob_relative_path,
+    blob_url,
+    detect_image_type,
+)
 
-ALLOWED_CONTENT_TYPES = ["image/jpeg", "image/png", "image/gif", "image/webp"]
+
+@dataclass(frozen=True)
+class StoredFile:
+    digest: str
+    ext: str
+    size: int
+
+    @property
+    def url(self) -> str:
+        return blob_url(self.digest, self.ext)
 
 
 class FileService:
 
     @staticmethod
-    async def save_image(file: UploadFile, folder: str) -> str | None:
-        # Проверка типа файла
-        if file.content_type not in ALLOWED_CONTENT_TYPES:
-            raise HTTPException(status_code=400, detail="Файл должен быть изображением")
+    async def save_image(file: UploadFile) -> StoredFile:
+        """
+        Stream an uploaded image into the content-addressed media store.
 
-        # Генерация уникального имени файла
-        if file.filename:
-            ext = file.filename.split(".")[-1].lower()
-            filename = f"{uuid.uuid4()}.{ext}"
+        The type is taken from the file's magic bytes, not from the name or
+        Content-Type sent by the client. The upload is copied in chunks to a
+        temporary file off the event loop while its SHA-256 is computed, then
+        renamed to its digest; content already stored is kept as is, so
+        identical uploads share one file.
+        """
+        # Размер уже известен, если тело запроса разобрано целиком
+        if file.size is not None and file.size > settings.UPLOAD_MAX_IMAGE_BYTES:
+            raise _too_large()
 
-        # Папка для сохранения
-        save_dir = Path(settings.MEDIA_ROOT) / folder
-        save_dir.mkdir(parents=True, exist_ok=True)
+        # Проверка типа файла по сигнатуре
+        head = await file.read(IMAGE_SIGNATURE_LENGTH)
+        ext = detect_image_type(head)
+        if ext is None:
+            raise HTTPException(status_code=400, detail="Файл должен быть изображением")
 
-        # Полный путь на сервере
-        file_path = save_dir / filename
+        # Временный файл в хранилище (тот же диск, rename атомарен)
+        store_dir = Path(settings.MEDIA_ROOT) / settings.MEDIA_BLOB_DIR
+        await aiofiles.os.makedirs(store_dir, exist_ok=True)
+        tmp_path = store_dir / f".{uuid.uuid4().hex}.part"
 
-        # Сохраняем файл
+        # Сохраняем файл по частям, считая хеш
         try:
-            with open(file_path, "wb") as f:
-                f.write(await file.read())
+            digest = hashlib.sha256(head)
+            size = len(head)
+            async with aiofiles.open(tmp_path, "wb") as f:
+                await f.write(head)
+                while chunk := await file.read(settings.UPLOAD_CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > settings.UPLOAD_MAX_IMAGE_BYTES:
+                        raise _too_large()
+                    digest.update(chunk)
+                    await f.write(chunk)
+
+            stored = StoredFile(digest.hexdigest(), ext, size)
+            file_path = Path(settings.MEDIA_ROOT) / blob_relative_path(
+                stored.digest, stored.ext
+            )
+            await aiofiles.os.makedirs(file_path.parent, exist_ok=True)
+            if await aiofiles.os.path.exists(file_path):
+                # Уже есть: новый mtime не даёт GC удалить файл прямо сейчас
+                await _discard(tmp_path)
+                await aiofiles.os.wrap(os.utime)(file_path)
+            else:
+                await aiofiles.os.replace(tmp_path, file_path)
+        except HTTPException:
+            await _discard(tmp_path)
+            raise
         except Exception as e:
+            await _discard(tmp_path)
             raise HTTPException(
                 status_code=500, detail=f"Не удалось сохранить файл: {e}"
             )
 
-        # Возвращаем путь для фронтенда
-        return f"{settings.MEDIA_URL}/{folder}/{filename}"
+        return stored
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Размер файла превышает {settings.UPLOAD_MAX_IMAGE_BYTES} байт",
+    )
+
+
+async def _discard(path: Path) -> None:
+    try:
+        await aiofiles.os.remove(path)
+    except FileNotFoundError:
+        pass
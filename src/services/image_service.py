@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.database import get_async_session_maker
+from core.settings import settings
+from db.crud.product import ProductImageCRUD
+from db.models.products import ImageRenditionStatus, ProductImage
+from utils.file_utils import media_path, rendition_name
+from utils.images import render_renditions
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def get_image_pool() -> ProcessPoolExecutor:
+    """Process pool for image work in the API process (created on first use)."""
+    global _pool
+    if _pool is None:
+        # spawn: forking a process that runs an event loop and DB threads is unsafe
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_PROCESS_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown_image_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+class ImageRenditionService:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.crud = ProductImageCRUD(session)
+
+    async def process(
+        self, image_id: int, executor: Optional[Executor] = None
+    ) -> Optional[ProductImage]:
+        """
+        Render the renditions of a pending image, in `executor` if given,
+        else in this process (a Celery worker). Marks it ready or failed.
+        """
+        image = await self.crud.get_image(image_id)
+        if image is None or image.renditions_status != ImageRenditionStatus.PENDING:
+            # deleted meanwhile, or already processed (e.g. a redelivered task)
+            return image
+        source = media_path(image.url)
+        args = (
+            source,
+            settings.IMAGE_RENDITION_SIZES,
+            settings.IMAGE_RENDITION_FORMATS,
+            settings.IMAGE_RENDITION_QUALITY,
+        )
+        status = ImageRenditionStatus.READY
+        try:
+            if source is None:
+                raise FileNotFoundError(image.url)
+            if _renditions_exist(source):
+                # a stored blob shared with an image rendered before
+                pass
+            elif executor is None:
+                render_renditions(*args)
+            else:
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(executor, render_renditions, *args)
+        except Exception as exc:  # unreadable or truncated upload, missing file
+            logger.warning("Image {} renditions failed: {}", image.id, exc)
+            status = ImageRenditionStatus.FAILED
+        return await self.crud.set_renditions_status(image, status.value)
+
+
+def _renditions_exist(source: Path) -> bool:
+    return all(
+        source.with_name(rendition_name(source.name, size, format)).exists()
+        for size in settings.IMAGE_RENDITION_SIZES
+        for format in settings.IMAGE_RENDITION_FORMATS
+    )
+
+
+async def run_image_processing(image_id: int) -> None:
+    """Render an image's renditions in the pool (in-process background task)."""
+    async with get_async_session_maker()() as session:
+        await ImageRenditionService(session).process(image_id, get_image_pool())
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from fastapi import Depends, UploadFile
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.settings import settings
+from db.crud.media import MediaBlobCRUD
+from db.dependencies.sessions import get_db_session
+from db.models.media import MediaBlob
+from services.file_service import FileService
+from utils.file_utils import blob_relative_path
+
+
+class MediaService:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.crud = MediaBlobCRUD(session)
+
+    async def upload_image(self, file: UploadFile) -> MediaBlob:
+        """Store an uploaded image, or find the identical one already stored."""
+        stored = await FileService.save_image(file)
+        return await self.crud.register(stored.digest, stored.ext, stored.size)
+
+    async def collect_garbage(self) -> int:
+        """
+        Delete the blobs no product image has used for MEDIA_GC_GRACE_SECONDS,
+        with their files and renditions. Returns the number deleted.
+        """
+        # naive UTC, like the timestamps the database writes
+        cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(
+            seconds=settings.MEDIA_GC_GRACE_SECONDS
+        )
+        repaired = await self.crud.repair_ref_counts()
+        blobs = await self.crud.delete_unreferenced(cutoff)
+        await self.session.commit()
+        # files only go once their rows are gone, so no row points to a
+        # missing file
+        removed = await asyncio.to_thread(_remove_blob_files, blobs, cutoff)
+        logger.info(
+            "Media GC: {} blobs deleted, {} files removed, {} counts repaired",
+            len(blobs),
+            removed,
+            repaired,
+        )
+        return len(blobs)
+
+
+def _remove_blob_files(blobs: list[tuple[str, str]], cutoff: datetime) -> int:
+    removed = 0
+    cutoff_ts = cutoff.replace(tzinfo=timezone.utc).timestamp()
+    for digest, ext in blobs:
+        path = Path(settings.MEDIA_ROOT) / blob_relative_path(digest, ext)
+        try:
+            if path.stat().st_mtime >= cutoff_ts:
+                # uploaded again just now: the upload has registered it anew
+                continue
+        except FileNotFoundError:
+            continue
+        for file in (path, *path.parent.glob(f"{digest}_*")):
+            file.unlink(missing_ok=True)
+            removed += 1
+    return removed
+
+
+async def get_media_service(
+    session: AsyncSession = Depends(get_db_session),
+) -> MediaService:
+    return MediaService(session)
@@ -1,24 +1,73 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
-from typing import Dict, List, Optional
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Iterable, List, Optional
 
 from fastapi import Depends, HTTPException
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.cache import invalidate_product
+from core.prometheus import get_maintenance_metrics
+from core.settings import settings
+from core.suggest import suggest_index
 from db.crud.order import OrderCRUD
+from db.crud.product import sync_product_summary
 from db.dependencies.sessions import get_db_session
 from db.models.couriers import Courier, CourierStatus
 from db.models.delivery import DeliveryStatus
 from db.models.orders import Order, OrderItem, OrderStatus
 from db.models.products import ProductVariant
+from services.facet_service import FacetService
+from services.pricing_service import line_total, promo_discount
+
+
+def _units_by_product(
+    items: Iterable[OrderItem], variants: Iterable[ProductVariant], sign: int
+) -> dict[int, int]:
+    """Units of `items` per product, for the typeahead popularity."""
+    product_of = {variant.id: variant.product_id for variant in variants}
+    units: dict[int, int] = defaultdict(int)
+    for item in items:
+        if item.variant_id in product_of:
+            units[product_of[item.variant_id]] += sign * item.quantity
+    return units
+
+
+def _units_by_variant(lines) -> dict[int, int]:
+    """Units per variant of order items or stock reservations."""
+    quantities: dict[int, int] = defaultdict(int)
+    for line in lines:
+        quantities[line.variant_id] += line.quantity
+    return dict(quantities)
+
+
+def _utcnow() -> datetime:
+    # naive UTC, like the timestamps the database writes
+    return datetime.now(timezone.utc).replace(tzinfo=None)
 
 
 class OrderService:
     def __init__(self, session: AsyncSession):
         self.session = session
         self.crud = OrderCRUD(session)
+        self.facets = FacetService(session)
+
+    async def _sync_stock(self, variants: Iterable[ProductVariant]) -> set[int]:
+        """Update the stock summary of the variants' products (before commit)."""
+        product_ids = {variant.product_id for variant in variants}
+        if product_ids:
+            await self.session.flush()
+            await self.session.execute(sync_product_summary(product_ids))
+        return product_ids
+
+    async def _stock_committed(self, product_ids: set[int]) -> None:
+        for product_id in product_ids:
+            invalidate_product(product_id)
+        await self.facets.refresh(list(product_ids))
 
     async def checkout(
         self,
@@ -31,25 +80,30 @@ class OrderService:
         if not items:
             raise HTTPException(status_code=400, detail="Cart is empty")
 
-        total: float = 0.0
-        variants_cache: Dict[int, ProductVariant] = {}
+        # 1. Load (and lock) every variant at once; lines of the same variant
+        # are checked together
+        quantities = _units_by_variant(items)
+        variants_cache = {
+            variant.id: variant
+            for variant in await self.crud.lock_variants(sorted(quantities))
+        }
 
+        subtotal = Decimal(0)
         for it in items:
-            variant: ProductVariant | None = await self.crud.get_variant(it.variant_id)
+            variant = variants_cache.get(it.variant_id)
             if not variant:
                 raise HTTPException(
                     status_code=404, detail=f"Viariant {it.variant_id} not found"
                 )
-            if variant.stock < it.quantity:
+            if variant.stock < quantities[it.variant_id]:
                 raise HTTPException(
                     status_code=404,
                     detail=f"Not enough stock for variant {variant.sku}",
                 )
-            total += float(variant.price) * it.quantity
-            variants_cache[it.variant_id] = variant
+            subtotal += line_total(variant.price, it.quantity)
 
-        # 2. Apply promo code
-        discount: float = 0.0
+        # 2. Apply promo code (rounded as in the cart's promo preview)
+        discount = Decimal(0)
         if promo_code:
             promo = await self.crud.get_promo_by_code(promo_code)
             if promo:
@@ -59,16 +113,13 @@ class OrderService:
                 ):
                     raise HTTPException(status_code=400, detail="Promo code not valid")
 
-                if promo.discount_percent:
-                    discount = total * (promo.discount_percent / 100)
-                else:
-                    discount = float(promo.discount_amount or 0)
+                discount = promo_discount(promo, subtotal)
             else:
                 raise HTTPException(status_code=404, detail="Promo code not found")
 
-        final_total: float = max(0.0, total - discount)
+        final_total = subtotal - discount
 
-        # 3. Create order and items; **reverse stock by decrementing**
+        # 3. Create order and items, and hold the stock until paid
         order = await self.crud.create_order(user_id, final_total, currency)
         # flush didn't commit; order.id available after flush
         await self.session.flush()
@@ -76,17 +127,40 @@ class OrderService:
         for it in items:
             variant = variants_cache[it.variant_id]
             await self.crud.create_order_item(
-                order.id, variant.id, it.quantity, float(variant.price)
+                order.id, variant.id, it.quantity, variant.price
             )
-            # reverse stock
-            variant.stock = variant.stock - it.quantity
-            self.session.add(variant)
+
+        # take the stock only where it is still there, in case a concurrent
+        # checkout took it since it was read (no row locks on SQLite)
+        reserved = await self.crud.reserve_stock(quantities)
+        if len(reserved) < len(quantities):
+            await self.session.rollback()
+            sold_out = sorted(
+                variants_cache[variant_id].sku
+                for variant_id in quantities
+                if variant_id not in reserved
+            )
+            raise HTTPException(
+                status_code=409,
+                detail=f"Not enough stock for variant {', '.join(sold_out)}",
+            )
+        await self.crud.create_reservations(
+            order.id,
+            quantities,
+            _utcnow() + timedelta(seconds=settings.STOCK_RESERVATION_TTL_SECONDS),
+        )
+
+        product_ids = await self._sync_stock(variants_cache.values())
 
         # create delivery record (order -> delivery) (courier assignment deferred)
         delivery = await self.crud.create_delivery(order.id, None, address_id)
 
         # commit everything
         await self.crud.commit()
+        await self._stock_committed(product_ids)
+        suggest_index.record_sales(
+            _units_by_product(items, variants_cache.values(), sign=1)
+        )
         await self.crud.refresh(order)
         await self.crud.refresh(delivery)
 
@@ -101,6 +175,8 @@ class OrderService:
             raise HTTPException(
                 status_code=400, detail="Order not in pending_payment state"
             )
+        if not await self._commit_hold(order):
+            raise HTTPException(status_code=409, detail="Order reservation expired")
 
         # mark paid
         await self.crud.set_order_status(order, OrderStatus.PAID.value)
@@ -110,22 +186,84 @@ class OrderService:
 
         return order
 
+    async def _commit_hold(self, order: Order) -> bool:
+        """
+        Turn the stock held for an unpaid order into a sale (not committed).
+        False if the hold has expired and the order was cancelled meanwhile.
+        """
+        holds = await self.crud.take_reservations(order.id)
+        if holds:
+            await self.crud.commit_reserved(_units_by_variant(holds))
+            return True
+        # every unpaid order has holds (those from before reservations got
+        # them in migration 5f4a1db94e44): the expiry sweep released them,
+        # or a concurrent payment took them, since the status was read
+        return False
+
     async def cancel_order(self, order_id: int) -> Order:
         order = await self.crud.get_order(order_id)
         if not order:
             raise HTTPException(status_code=404, detail="Order not found")
+        if order.status == OrderStatus.CANCELLED.value:
+            raise HTTPException(status_code=400, detail="Order already cancelled")
+        await self.session.refresh(order, ["items"])
 
-        # restore stock for items
-        for item in order.items:
-            variant = await self.crud.get_variant(item.variant_id)
-            if variant:
-                variant.stock = variant.stock + item.quantity
-                self.session.add(variant)
+        # restore stock for items: the held units of an unpaid order, else
+        # the units sold. Whoever took the holds first (a payment, the expiry
+        # sweep) has changed the status, so read it again after taking them
+        holds = await self.crud.take_reservations(order.id)
+        await self.session.refresh(order, ["status"])
+        if order.status == OrderStatus.CANCELLED.value:
+            await self.session.rollback()
+            raise HTTPException(status_code=400, detail="Order already cancelled")
+        if holds or order.status == OrderStatus.PENDING_PAYMENT.value:
+            # (never the items of an unpaid order: its holds are all it took)
+            quantities = _units_by_variant(holds)
+        else:
+            quantities = _units_by_variant(order.items)
+        restored = (
+            await self.crud.release_stock(quantities, held=bool(holds))
+            if quantities
+            else []
+        )
+        product_ids = await self._sync_stock(restored)
+        # (the items are expired with the order on commit)
+        units = _units_by_product(order.items, restored, sign=-1)
 
         # set status
         await self.crud.set_order_status(order, OrderStatus.CANCELLED.value)
+        await self._stock_committed(product_ids)
+        suggest_index.record_sales(units)
         return order
 
+    async def release_expired_reservations(self) -> int:
+        """
+        Give the stock held for orders unpaid past their hold back on sale and
+        cancel the orders, the holds of RESERVATION_SWEEP_BATCH_SIZE orders
+        per transaction. Returns the number of holds released.
+        """
+        batch_size = settings.RESERVATION_SWEEP_BATCH_SIZE
+        metrics = get_maintenance_metrics()
+        released = 0
+        while True:
+            started = time.perf_counter()
+            holds = await self.crud.take_expired_reservations(_utcnow(), batch_size)
+            order_ids = {hold.order_id for hold in holds}
+            if holds:
+                restored = await self.crud.release_stock(
+                    _units_by_variant(holds), held=True
+                )
+                await self.crud.cancel_unpaid(sorted(order_ids))
+                await self._sync_stock(restored)
+            await self.session.commit()
+            elapsed = time.perf_counter() - started
+            labels = ("reservation_sweep", "stock_reservations")
+            metrics.batch_latency.labels(*labels).observe(elapsed)
+            metrics.rows_removed.labels(*labels).inc(len(holds))
+            released += len(holds)
+            if len(order_ids) < batch_size:
+                return released
+
     async def assign_courier(self, order_id: int) -> Optional[Courier]:
         # naive best-effort: pick first available & verified courier
         stmt = await self.session.execute(
@@ -5,6 +5,7 @@ import asyncio
 
 import stripe
 from fastapi import Depends, HTTPException
+from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.settings import settings
@@ -77,16 +78,22 @@ class PaymentService:
             # mark payment succeeded
             await self.payment_crud.mark_succeeded(payment)
 
-            # mark order as paid (call order service / crud)
-            # using order_crud.set_order_status or on_payment_success
+            # mark order as paid: its stock hold becomes a sale, and a
+            # courier is assigned (on_payment_success)
             order = await self.order_crud.get_order(payment.order_id)
-            if order:
-                await self.order_crud.set_order_status(order, OrderStatus.PAID.value)
-                # optionally trigger assign courier:
+            if order and order.status == OrderStatus.PENDING_PAYMENT.value:
                 from services.order_service import OrderService
 
                 order_s = OrderService(self.session)
-                await order_s.assign_courier(order.id)
+                try:
+                    await order_s.on_payment_success(order.id)
+                except HTTPException as exc:
+                    # paid after the hold expired: the stock went back on
+                    # sale and the order was cancelled; needs a refund
+                    logger.warning(
+                        "Order {} paid but not fulfilled: {}", order.id, exc.detail
+                    )
+                    return {"status": "reservation_expired"}
 
             return {"status": "ok"}
         # handle other events as needed
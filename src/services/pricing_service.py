@@ -0,0 +1,134 @@
+"""
+Priced view of a user's cart (GET /carts/): the current price and stock of
+every variant, line totals, a promo code preview and the totals, so clients
+don't have to look up variants and promo codes themselves.
+"""
+
+from __future__ import annotations
+
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Optional
+
+from fastapi import Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.cache import CachedPayload, cart_pricing_cache, make_payload, priced_cart_key
+from db.crud.cart import CartCRUD
+from db.crud.promo_codes import PromoCodeCRUD
+from db.dependencies.sessions import get_db_session
+from db.models.promo_codes import PromoCode
+from schemas.cart import PricedCartResponse
+
+CENT = Decimal("0.01")
+
+
+def _money(value: Decimal) -> Decimal:
+    return value.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def line_total(price, quantity: int) -> Decimal:
+    """A line's amount, rounded to the cent; shared by the cart and checkout."""
+    return _money(Decimal(price) * quantity)
+
+
+def price_lines(lines) -> tuple[list[dict], Decimal]:
+    """
+    Priced lines (see `CartLineScheme`) and their subtotal, in one pass over
+    the rows of `CartCRUD.get_priced_lines`. Lines are charged at the
+    variant's current price and rounded like checkout rounds them.
+    """
+    items = []
+    subtotal = Decimal(0)
+    for line in lines:
+        amount = line_total(line.price, line.quantity)
+        warnings = []
+        if not line.is_active or line.stock <= 0:
+            warnings.append("unavailable")
+        elif line.quantity > line.stock:
+            warnings.append("insufficient_stock")
+        if line.added_price != line.price:
+            warnings.append("price_changed")
+        subtotal += amount
+        items.append(
+            {
+                "id": line.id,
+                "variant_id": line.variant_id,
+                "sku": line.sku,
+                "quantity": line.quantity,
+                "price": line.price,
+                "added_price": line.added_price,
+                "line_total": amount,
+                "stock": line.stock,
+                "warnings": warnings,
+            }
+        )
+    return items, subtotal
+
+
+def promo_discount(promo: PromoCode, subtotal: Decimal) -> Decimal:
+    """Discount of `promo` on `subtotal` (percent, else fixed amount), capped."""
+    if promo.discount_percent:
+        discount = subtotal * promo.discount_percent / 100
+    else:
+        discount = Decimal(promo.discount_amount or 0)
+    return min(_money(discount), subtotal)
+
+
+class CartPricingService:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.cart_crud = CartCRUD(session)
+        self.promo_crud = PromoCodeCRUD(session)
+
+    async def get_priced_cart(
+        self, user_id: int, promo_code: Optional[str] = None
+    ) -> CachedPayload:
+        """
+        The serialized priced cart. Served from the cache while the cart
+        version is unchanged; otherwise priced from one joined query of the
+        lines and their variants (and one for the promo code).
+        """
+        cart = await self.cart_crud.get_version(user_id)
+        if cart is None:
+            await self.cart_crud.ensure_cart(user_id)
+            await self.session.commit()
+            cart = await self.cart_crud.get_version(user_id)
+
+        key = priced_cart_key(cart.id, cart.version, promo_code)
+        payload = cart_pricing_cache.get(key)
+        if payload is None:
+            priced = await self._price(cart.id, user_id, cart.version, promo_code)
+            payload = make_payload(PricedCartResponse, priced)
+            cart_pricing_cache.set(key, payload)
+        return payload
+
+    async def _price(
+        self, cart_id: int, user_id: int, version: int, promo_code: Optional[str]
+    ) -> dict:
+        items, subtotal = price_lines(await self.cart_crud.get_priced_lines(cart_id))
+        discount = Decimal(0)
+        promo = None
+        if promo_code:
+            try:
+                discount = promo_discount(
+                    await self.promo_crud.get_by_code(promo_code), subtotal
+                )
+                promo = {"code": promo_code, "applied": True}
+            except HTTPException as exc:  # unknown, inactive or expired
+                promo = {"code": promo_code, "applied": False, "detail": exc.detail}
+        return {
+            "id": cart_id,
+            "user_id": user_id,
+            "version": version,
+            "items": items,
+            "subtotal": subtotal,
+            "discount": discount,
+            "total": subtotal - discount,
+            "promo": promo,
+        }
+
+
+def get_cart_pricing_service(
+    session: AsyncSession = Depends(get_db_session),
+) -> CartPricingService:
+    return CartPricingService(session)
@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import codecs
+import csv
+import json
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterable, AsyncIterator, Optional
+
+import aiofiles
+import orjson
+from fastapi import Depends
+from loguru import logger
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.database import get_async_session_maker
+from core.settings import settings
+from db.crud.product import ImportRow, ProductCRUD
+from db.crud.product_import import ProductImportCRUD
+from db.dependencies.sessions import get_db_session
+from db.models.imports import ProductImport, ProductImportStatus
+from schemas.product import ProductCreateScheme
+from services.facet_service import FacetService
+from utils.shortcuts import get_or_404
+
+CHUNK_SIZE = 64 * 1024
+# CSV cells holding lists: "images" is "url|url|..." (the first one is the
+# main image), "variants" is a JSON array of variant objects
+CSV_LIST_SEPARATOR = "|"
+
+
+async def iter_file(path: Path) -> AsyncIterator[bytes]:
+    async with aiofiles.open(path, "rb") as f:
+        while chunk := await f.read(CHUNK_SIZE):
+            yield chunk
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[tuple[int, str]]:
+    """Numbered text lines of a byte stream, decoded as they arrive."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer, line_no = "", 0
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            line_no += 1
+            yield line_no, line.removesuffix("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield line_no + 1, buffer.removesuffix("\r")
+
+
+async def iter_records(
+    chunks: AsyncIterable[bytes], format: str
+) -> AsyncIterator[tuple[int, dict[str, Any] | str]]:
+    """
+    (line number, record) for every data row of an NDJSON or CSV stream. A
+    record that can't be decoded is yielded as an error message instead.
+    """
+    if format == "ndjson":
+        async for line_no, line in iter_lines(chunks):
+            if not line.strip():
+                continue
+            try:
+                record = orjson.loads(line)
+            except orjson.JSONDecodeError as exc:
+                yield line_no, f"invalid JSON: {exc}"
+                continue
+            if not isinstance(record, dict):
+                yield line_no, "expected a JSON object"
+                continue
+            yield line_no, record
+        return
+
+    header: list[str] | None = None
+    pending: list[str] = []
+    start = quotes = 0
+    async for line_no, line in iter_lines(chunks):
+        if not pending:
+            start = line_no
+        pending.append(line)
+        # an odd number of quotes means a quoted cell continues on the next line
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+        values = next(csv.reader(["\n".join(pending)]), [])
+        pending, quotes = [], 0
+        if not any(values):
+            continue
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) > len(header):
+            yield start, f"expected {len(header)} columns, got {len(values)}"
+            continue
+        yield start, _csv_record(dict(zip(header, values)))
+    if pending:
+        yield start, "unterminated quoted value"
+
+
+def _csv_record(cells: dict[str, str]) -> dict[str, Any] | str:
+    record: dict[str, Any] = {k: v for k, v in cells.items() if v != ""}
+    if "images" in record:
+        urls = [u.strip() for u in record["images"].split(CSV_LIST_SEPARATOR)]
+        record["images"] = [
+            {"url": url, "is_main": i == 0}
+            for i, url in enumerate(u for u in urls if u)
+        ]
+    if "variants" in record:
+        try:
+            record["variants"] = orjson.loads(record["variants"])
+        except orjson.JSONDecodeError:
+            return "variants: invalid JSON"
+    return record
+
+
+def _validation_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+@dataclass
+class _Progress:
+    """Counters kept outside the ORM row, which a batch rollback expires."""
+
+    started: float = field(default_factory=time.perf_counter)
+    processed: int = 0
+    imported: int = 0
+    failed: int = 0
+    errors: list[dict] = field(default_factory=list)
+
+    def fail(self, line: int, error: str) -> None:
+        self.failed += 1
+        if len(self.errors) < settings.PRODUCT_IMPORT_MAX_ERRORS:
+            self.errors.append({"row": line, "error": error})
+
+    def apply(self, job: ProductImport) -> None:
+        job.processed_rows = self.processed
+        job.imported_rows = self.imported
+        job.failed_rows = self.failed
+        job.errors = json.dumps(self.errors) if self.errors else None
+        job.duration_seconds = round(time.perf_counter() - self.started, 3)
+
+
+class ProductImportService:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.crud = ProductImportCRUD(session)
+        self.products = ProductCRUD(session)
+        self.facets = FacetService(session)
+
+    async def get_import(self, import_id: int) -> ProductImport:
+        return await get_or_404(self.crud.get_by_id(import_id), "Import not found")
+
+    async def import_stream(
+        self, chunks: AsyncIterable[bytes], format: str, user_id: Optional[int]
+    ) -> ProductImport:
+        """Import while the upload is still arriving."""
+        job = await self.crud.create(format, user_id=user_id)
+        return await self.run(job, chunks)
+
+    async def enqueue_stream(
+        self, chunks: AsyncIterable[bytes], format: str, user_id: Optional[int]
+    ) -> ProductImport:
+        """Spool the upload to disk and create a queued job for a worker."""
+        settings.PRODUCT_IMPORT_DIR.mkdir(parents=True, exist_ok=True)
+        path = settings.PRODUCT_IMPORT_DIR / f"{uuid.uuid4().hex}.{format}"
+        async with aiofiles.open(path, "wb") as f:
+            async for chunk in chunks:
+                await f.write(chunk)
+        return await self.crud.create(format, user_id=user_id, source_path=str(path))
+
+    async def run_queued(self, import_id: int) -> ProductImport:
+        job = await self.get_import(import_id)
+        if job.status != ProductImportStatus.QUEUED.value or not job.source_path:
+            # already picked up (e.g. a redelivered task)
+            return job
+        path = Path(job.source_path)
+        if not path.exists():
+            # spooled by an API process whose PRODUCT_IMPORT_DIR this worker
+            # doesn't share
+            logger.error("Product import {}: {} not found", job.id, path)
+            job.status = ProductImportStatus.FAILED.value
+            job.errors = json.dumps([{"row": 0, "error": "uploaded file not found"}])
+            job.source_path = None
+            return await self.crud.save(job)
+        try:
+            job = await self.run(job, iter_file(path))
+        finally:
+            path.unlink(missing_ok=True)
+        job.source_path = None
+        return await self.crud.save(job)
+
+    async def run(
+        self, job: ProductImport, chunks: AsyncIterable[bytes]
+    ) -> ProductImport:
+        progress = _Progress()
+        job.status = ProductImportStatus.RUNNING.value
+        await self.crud.save(job)
+
+        batch: list[ImportRow] = []
+        try:
+            async for line, record in iter_records(chunks, job.format):
+                progress.processed += 1
+                if isinstance(record, str):
+                    progress.fail(line, record)
+                    continue
+                try:
+                    batch.append((line, ProductCreateScheme.model_validate(record)))
+                except ValidationError as exc:
+                    progress.fail(line, _validation_message(exc))
+                if len(batch) >= settings.PRODUCT_IMPORT_BATCH_SIZE:
+                    await self._flush(job, batch, progress)
+                    batch = []
+            await self._flush(job, batch, progress)
+            job.status = ProductImportStatus.COMPLETED.value
+        except UnicodeDecodeError as exc:
+            # keep what was read before the bad bytes
+            await self._flush(job, batch, progress)
+            progress.fail(progress.processed + 1, f"file is not UTF-8: {exc}")
+            job.status = ProductImportStatus.FAILED.value
+        except Exception:
+            await self.session.rollback()
+            job.status = ProductImportStatus.FAILED.value
+            progress.apply(job)
+            await self.crud.save(job)
+            raise
+
+        progress.apply(job)
+        await self.crud.save(job)
+        logger.info(
+            "Product import {} {}: {} rows, {} imported, {} failed, {:.0f} rows/s",
+            job.id,
+            job.status,
+            progress.processed,
+            progress.imported,
+            progress.failed,
+            progress.processed / max(job.duration_seconds, 1e-3),
+        )
+        return job
+
+    async def _flush(
+        self, job: ProductImport, batch: list[ImportRow], progress: _Progress
+    ) -> None:
+        if batch:
+            product_ids, errors = await self.products.bulk_create(batch)
+            await self.facets.refresh(product_ids)
+            progress.imported += len(product_ids)
+            for line, error in errors:
+                progress.fail(line, error)
+        # one progress update per batch, readable while the import runs
+        progress.apply(job)
+        await self.crud.save(job)
+
+
+async def run_product_import(import_id: int) -> None:
+    """Run a queued import with its own session (in-process background task)."""
+    async with get_async_session_maker()() as session:
+        await ProductImportService(session).run_queued(import_id)
+
+
+async def get_product_import_service(
+    session: AsyncSession = Depends(get_db_session),
+) -> ProductImportService:
+    return ProductImportService(session)
@@ -1,20 +1,41 @@
 from __future__ import annotations
 
-from typing import List
+from typing import Dict, List, Optional, Sequence
 
 from fastapi import Depends, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from db.crud.product import ProductCRUD, ProductImageCRUD, ProductVariantCRUD
+from core.cache import (
+    CachedPayload,
+    catalog_cache,
+    make_payload,
+    product_images_key,
+    product_key,
+    product_slug_key,
+)
+from db.crud.product import (
+    PRODUCT_FULL,
+    ProductCRUD,
+    ProductImageCRUD,
+    ProductVariantCRUD,
+)
 from db.dependencies.sessions import get_db_session
-from db.models.products import Product, ProductImage, ProductVariant
+from db.models.products import (
+    ImageRenditionStatus,
+    Product,
+    ProductImage,
+    ProductVariant,
+)
 from schemas.product import (
     ProductCreateScheme,
+    ProductImageOutScheme,
+    ProductOutScheme,
     ProductUpdateScheme,
     ProductVariantCreateScheme,
     ProductVariantUpdateScheme,
 )
-from services.file_service import FileService
+from services.facet_service import FacetService
+from services.media_service import MediaService
 from utils.shortcuts import get_or_404
 
 
@@ -22,33 +43,108 @@ class ProductService:
     def __init__(self, session: AsyncSession = Depends(get_db_session)):
         self.session = session
         self.crud = ProductCRUD(session)
+        self.facets = FacetService(session)
 
     # Products
-    async def list_products(self, limit: int = 50, offset: int = 0) -> List[Product]:
-        return await self.crud.get_all(limit=limit, offset=offset)
+    async def list_products(
+        self,
+        limit: int = 50,
+        offset: int = 0,
+        order_by: str = "-id",
+        category_id: Optional[int] = None,
+        attributes: Optional[Dict[str, List[str]]] = None,
+    ) -> List[Product]:
+        return await self.crud.get_all(
+            limit=limit,
+            offset=offset,
+            order_by=order_by,
+            load=(),
+            category_id=category_id,
+            attributes=attributes,
+        )
+
+    async def list_products_page(
+        self,
+        limit: int = 50,
+        cursor: str | None = None,
+        order_by: str = "-id",
+        category_id: Optional[int] = None,
+        attributes: Optional[Dict[str, List[str]]] = None,
+    ) -> tuple[List[Product], str | None]:
+        return await self.crud.get_page(
+            limit=limit,
+            cursor=cursor,
+            order_by=order_by,
+            load=(),
+            category_id=category_id,
+            attributes=attributes,
+        )
+
+    async def search_products(
+        self, query: str, limit: int = 20, cursor: str | None = None
+    ) -> tuple[List[Product], str | None]:
+        product_ids, next_cursor = await self.crud.search_index.search(
+            query, limit=limit, cursor=cursor
+        )
+        return await self.crud.get_many(product_ids, load=()), next_cursor
 
-    async def get_product(self, product_id: int) -> Product:
+    async def get_product(
+        self, product_id: int, load: Sequence[str] = PRODUCT_FULL
+    ) -> Product:
         product = await get_or_404(
-            await self.crud.get_by_id(product_id), "Product not found"
+            await self.crud.get_by_id(product_id, load=load), "Product not found"
         )
         return product
 
-    async def get_product_by_slug(self, slug: str) -> Product:
-        product = await get_or_404(self.crud.get_by_slug(slug), "Product not found")
+    async def get_product_by_slug(
+        self, slug: str, load: Sequence[str] = PRODUCT_FULL
+    ) -> Product:
+        product = await get_or_404(
+            self.crud.get_by_slug(slug, load=load), "Product not found"
+        )
         return product
 
+    async def get_product_payload(self, product_id: int) -> CachedPayload:
+        """Serialized `ProductOutScheme` with validators, via the catalog cache."""
+        return await get_or_404(
+            catalog_cache.get_or_load(
+                product_key(product_id),
+                lambda: self.crud.get_by_id(product_id),
+                ProductOutScheme,
+                last_modified=lambda product: product.updated_at,
+            ),
+            "Product not found",
+        )
+
+    async def get_product_payload_by_slug(self, slug: str) -> CachedPayload:
+        key = product_slug_key(slug)
+        product_id = catalog_cache.get(key)
+        if product_id is not None:
+            return await self.get_product_payload(product_id)
+
+        product = await self.get_product_by_slug(slug)
+        payload = make_payload(ProductOutScheme, product, product.updated_at)
+        catalog_cache.set(product_key(product.id), payload)
+        catalog_cache.set(key, product.id)
+        return payload
+
     async def create_product(self, data: ProductCreateScheme) -> Product:
-        return await self.crud.create(data)
+        product = await self.crud.create(data)
+        self.facets.index_product(product)
+        return product
 
     async def update_product(
         self, product_id: int, data: ProductUpdateScheme
     ) -> Product:
-        product = await self.get_product(product_id)
-        return await self.crud.update(product, data)
+        product = await self.get_product(product_id, load=())
+        product = await self.crud.update(product, data)
+        self.facets.index_product(product)
+        return product
 
     async def delete_product(self, product_id: int) -> None:
-        product = await self.get_product(product_id)
-        return await self.crud.delete(product)
+        product = await self.get_product(product_id, load=())
+        await self.crud.delete(product)
+        self.facets.remove(product_id)
 
 
 class ProductVariantsService(ProductService):
@@ -58,15 +154,17 @@ class ProductVariantsService(ProductService):
 
     # Product variants
     async def list_variants(self, product_id: int) -> List[ProductVariant]:
-        product = await self.get_product(product_id)
+        product = await self.get_product(product_id, load=("variants",))
         return product.variants
 
     async def create_variant(
         self, product_id: int, data: ProductVariantCreateScheme
     ) -> ProductVariant:
         # ensure product exists
-        await self.get_product(product_id)
-        return await self.variant_crud.create(product_id, data)
+        await self.get_product(product_id, load=())
+        variant = await self.variant_crud.create(product_id, data)
+        await self.facets.refresh([product_id])
+        return variant
 
     async def update_variant(
         self, variant_id: int, data: ProductVariantUpdateScheme
@@ -75,13 +173,16 @@ class ProductVariantsService(ProductService):
             await self.variant_crud.get_by_id(variant_id), "Product not found"
         )
         update_data = data.dict(exclude_unset=True)
-        return await self.variant_crud.update(variant, update_data)
+        variant = await self.variant_crud.update(variant, update_data)
+        await self.facets.refresh([variant.product_id])
+        return variant
 
     async def delete_variant(self, variant_id: int) -> None:
         variant = await get_or_404(
             self.variant_crud.get_by_id(variant_id), "Variant not found"
         )
-        return await self.variant_crud.delete(variant)
+        await self.variant_crud.delete(variant)
+        await self.facets.refresh([variant.product_id])
 
 
 class ProductImageService(ProductService):
@@ -92,13 +193,17 @@ class ProductImageService(ProductService):
     # Product Images
     async def add_image(self, product_id: int, file: UploadFile) -> ProductImage:
         # is product exist
-        product = await self.get_product(product_id)
+        product = await self.get_product(product_id, load=())
 
-        # save file
-        image_url = await FileService.save_image(file, "products")
+        # save file (identical uploads share one stored blob)
+        blob = await MediaService(self.session).upload_image(file)
 
-        # save data in db
-        return await self.image_crud.create(product.id, image_url)
+        # save data in db; renditions are made in the background
+        return await self.image_crud.create(
+            product.id,
+            blob.url,
+            renditions_status=ImageRenditionStatus.PENDING.value,
+        )
 
     async def delete_image(self, image_id: int) -> None:
         image: ProductImage = await get_or_404(
@@ -109,6 +214,17 @@ class ProductImageService(ProductService):
     async def list_images(self, product_id: int):
         return await self.image_crud.get_images(product_id)
 
+    async def list_images_payload(self, product_id: int) -> CachedPayload:
+        key = product_images_key(product_id)
+        payload = catalog_cache.get(key)
+        if payload is None:
+            product = await self.get_product(product_id, load=("images",))
+            payload = make_payload(
+                list[ProductImageOutScheme], product.images, product.updated_at
+            )
+            catalog_cache.set(key, payload)
+        return payload
+
 
 async def get_product_images_service(
     session: AsyncSession = Depends(get_db_session),
@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import time
+from collections.abc import AsyncIterator
+from itertools import chain
+
+import numpy as np
+from fastapi import Depends
+from loguru import logger
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.cache import CachedPayload, catalog_cache, product_related_key
+from core.settings import settings
+from db.dependencies.sessions import get_db_session
+from db.models.orders import UNSOLD_STATUSES, Order, OrderItem
+from db.models.products import Product, ProductVariant, RelatedProduct
+from schemas.product import ProductCardScheme
+from utils.shortcuts import get_or_404
+
+# Raw pairs collected before they are folded into the running counts
+PAIRS_PER_FOLD = 2_000_000
+# Rows per multi-row INSERT when the neighbour table is rewritten
+WRITE_BATCH_SIZE = 10_000
+
+
+def basket_pairs(
+    order_ids: np.ndarray, product_ids: np.ndarray, max_basket: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Every ordered pair (a, b), a != b, of products bought in the same order.
+
+    Lines must be sorted by (order, product). Repeated products of an order
+    count once, and orders with more than `max_basket` products (bulk
+    purchases, whose k² pairs say little) are skipped.
+    """
+    if not len(order_ids):
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+    distinct = np.ones(len(order_ids), dtype=bool)
+    distinct[1:] = (order_ids[1:] != order_ids[:-1]) | (
+        product_ids[1:] != product_ids[:-1]
+    )
+    order_ids, product_ids = order_ids[distinct], product_ids[distinct]
+
+    starts = np.flatnonzero(np.r_[True, order_ids[1:] != order_ids[:-1]])
+    sizes = np.diff(np.r_[starts, len(order_ids)])
+    kept = (sizes > 1) & (sizes <= max_basket)
+    starts, sizes = starts[kept], sizes[kept]
+    if not len(starts):
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+
+    # each line of a k-product order pairs with the k lines of its order
+    lines = np.repeat(starts, sizes) + _ranges(sizes)
+    line_sizes = np.repeat(sizes, sizes)
+    left = np.repeat(lines, line_sizes)
+    right = np.repeat(np.repeat(starts, sizes), line_sizes) + _ranges(line_sizes)
+    different = left != right
+    return product_ids[left[different]], product_ids[right[different]]
+
+
+def _ranges(sizes: np.ndarray) -> np.ndarray:
+    """Concatenated `arange(size)` for every size: [2, 3] -> 0 1 0 1 2."""
+    ends = np.cumsum(sizes)
+    return np.arange(ends[-1]) - np.repeat(ends - sizes, sizes)
+
+
+def count_pairs(
+    keys: np.ndarray, counts: np.ndarray | None = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """Distinct pair keys with their (summed) counts."""
+    if counts is None:
+        return np.unique(keys, return_counts=True)
+    unique, inverse = np.unique(keys, return_inverse=True)
+    return unique, np.bincount(inverse, weights=counts).astype(np.int64)
+
+
+def top_neighbours(
+    keys: np.ndarray, counts: np.ndarray, width: int, top_k: int, min_score: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (product, neighbour, rank, score) of the `top_k` strongest neighbours of
+    every product, from pair keys `a * width + b`. Ties go to the lower id.
+    """
+    strong = counts >= min_score
+    keys, counts = keys[strong], counts[strong]
+    left, right = np.divmod(keys, width)
+    order = np.lexsort((right, -counts, left))
+    left, right, counts = left[order], right[order], counts[order]
+    starts = np.flatnonzero(np.r_[True, left[1:] != left[:-1]])
+    sizes = np.diff(np.r_[starts, len(left)])
+    ranks = _ranges(sizes) + 1 if len(left) else np.zeros(0, dtype=np.int64)
+    top = ranks <= top_k
+    return left[top], right[top], ranks[top], counts[top]
+
+
+class RelatedProductsService:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def _order_lines(self) -> AsyncIterator[tuple[np.ndarray, np.ndarray]]:
+        """
+        (order ids, product ids) of sold order lines, sorted, one range of
+        RELATED_PRODUCTS_BATCH_SIZE order ids at a time so no order is split.
+        """
+        first, last = (
+            await self.session.execute(select(func.min(Order.id), func.max(Order.id)))
+        ).one()
+        if first is None:
+            return
+        stmt = (
+            select(OrderItem.order_id, ProductVariant.product_id)
+            .join(Order, Order.id == OrderItem.order_id)
+            .join(ProductVariant, ProductVariant.id == OrderItem.variant_id)
+            .where(Order.status.not_in(UNSOLD_STATUSES))
+        )
+        step = settings.RELATED_PRODUCTS_BATCH_SIZE
+        for low in range(first, last + 1, step):
+            result = await self.session.execute(
+                stmt.where(Order.id.between(low, low + step - 1))
+            )
+            # flattened first: numpy reads Row objects one item at a time
+            lines = np.fromiter(chain.from_iterable(result), dtype=np.int64).reshape(
+                -1, 2
+            )
+            # sorted here rather than by the database
+            lines = lines[np.lexsort((lines[:, 1], lines[:, 0]))]
+            yield lines[:, 0], lines[:, 1]
+
+    async def rebuild(self) -> int:
+        """
+        Recompute every product's frequently-bought-together neighbours and
+        replace the table in one transaction. Returns the number of rows.
+        """
+        started = time.perf_counter()
+        # pairs are packed into one int64 key: product * width + neighbour
+        width = (await self.session.scalar(select(func.max(Product.id))) or 0) + 1
+        keys = np.zeros(0, dtype=np.int64)
+        counts = np.zeros(0, dtype=np.int64)
+        pending: list[np.ndarray] = []
+        pending_size = lines = 0
+
+        async for order_ids, product_ids in self._order_lines():
+            lines += len(order_ids)
+            left, right = basket_pairs(
+                order_ids, product_ids, settings.RELATED_PRODUCTS_MAX_BASKET
+            )
+            pending.append(left * width + right)
+            pending_size += len(left)
+            # fold raw pairs into the running counts in large vectorised steps
+            if pending_size >= PAIRS_PER_FOLD:
+                keys, counts = self._fold(keys, counts, pending)
+                pending, pending_size = [], 0
+        keys, counts = self._fold(keys, counts, pending)
+
+        product, neighbour, rank, score = top_neighbours(
+            keys,
+            counts,
+            width,
+            settings.RELATED_PRODUCTS_TOP_K,
+            settings.RELATED_PRODUCTS_MIN_SCORE,
+        )
+        await self.session.execute(delete(RelatedProduct))
+        for start in range(0, len(product), WRITE_BATCH_SIZE):
+            batch = slice(start, start + WRITE_BATCH_SIZE)
+            await self.session.execute(
+                insert(RelatedProduct),
+                [
+                    {
+                        "product_id": a,
+                        "related_product_id": b,
+                        "rank": r,
+                        "score": s,
+                    }
+                    for a, b, r, s in zip(
+                        product[batch].tolist(),
+                        neighbour[batch].tolist(),
+                        rank[batch].tolist(),
+                        score[batch].tolist(),
+                    )
+                ],
+            )
+        await self.session.commit()
+        logger.info(
+            "Related products rebuilt: {} order lines, {} pairs, {} rows in {:.1f}s",
+            lines,
+            len(keys),
+            len(product),
+            time.perf_counter() - started,
+        )
+        return len(product)
+
+    @staticmethod
+    def _fold(
+        keys: np.ndarray, counts: np.ndarray, pending: list[np.ndarray]
+    ) -> tuple[np.ndarray, np.ndarray]:
+        if not pending:
+            return keys, counts
+        new_keys, new_counts = count_pairs(np.concatenate(pending))
+        if not len(keys):
+            return new_keys, new_counts
+        return count_pairs(
+            np.concatenate([keys, new_keys]), np.concatenate([counts, new_counts])
+        )
+
+    async def get_related(self, product_id: int) -> list[Product] | None:
+        exists = await self.session.scalar(
+            select(Product.id).where(Product.id == product_id)
+        )
+        if exists is None:
+            return None
+        result = await self.session.scalars(
+            select(Product)
+            .join(RelatedProduct, RelatedProduct.related_product_id == Product.id)
+            .where(RelatedProduct.product_id == product_id, Product.is_active)
+            .order_by(RelatedProduct.rank)
+        )
+        return list(result)
+
+    async def get_related_payload(self, product_id: int) -> CachedPayload:
+        """Serialized related product cards, via the catalog cache."""
+        return await get_or_404(
+            catalog_cache.get_or_load(
+                product_related_key(product_id),
+                lambda: self.get_related(product_id),
+                list[ProductCardScheme],
+            ),
+            "Product not found",
+        )
+
+
+async def get_related_products_service(
+    session: AsyncSession = Depends(get_db_session),
+) -> RelatedProductsService:
+    return RelatedProductsService(session)
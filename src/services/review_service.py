@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from typing import Sequence
+
+from fastapi import Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.crud.review import ReviewCRUD
+from db.dependencies.auth import ADMIN_ROLE
+from db.dependencies.sessions import get_db_session
+from db.models.products import Product
+from db.models.reviews import Review
+from db.models.users import User
+from schemas.review import ReviewCreateScheme, ReviewUpdateScheme
+from utils.shortcuts import get_or_404
+
+
+class ReviewService:
+    def __init__(self, session: AsyncSession = Depends(get_db_session)):
+        self.session = session
+        self.crud = ReviewCRUD(session)
+
+    async def _ensure_product(self, product_id: int) -> None:
+        await get_or_404(
+            self.session.scalar(select(Product.id).where(Product.id == product_id)),
+            "Product not found",
+        )
+
+    async def _get_own_review(self, review_id: int, user: User) -> Review:
+        """The review, if `user` wrote it or is an admin."""
+        review = await get_or_404(self.crud.get_by_id(review_id), "Review not found")
+        if review.user_id != user.id and user.role != ADMIN_ROLE:
+            raise HTTPException(status_code=403, detail="Not your review")
+        return review
+
+    async def list_reviews(
+        self, product_id: int, limit: int = 20, cursor: str | None = None
+    ) -> tuple[Sequence[Review], str | None]:
+        await self._ensure_product(product_id)
+        return await self.crud.get_page(product_id, limit=limit, cursor=cursor)
+
+    async def create_review(
+        self, product_id: int, user: User, data: ReviewCreateScheme
+    ) -> Review:
+        await self._ensure_product(product_id)
+        return await self.crud.create(product_id, user.id, data)
+
+    async def update_review(
+        self, review_id: int, user: User, data: ReviewUpdateScheme
+    ) -> Review:
+        review = await self._get_own_review(review_id, user)
+        return await self.crud.update(review, data)
+
+    async def delete_review(self, review_id: int, user: User) -> None:
+        review = await self._get_own_review(review_id, user)
+        await self.crud.delete(review)
+
+
+async def get_review_service(
+    session: AsyncSession = Depends(get_db_session),
+) -> ReviewService:
+    return ReviewService(session)
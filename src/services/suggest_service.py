@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import time
+from collections import defaultdict
+
+from fastapi import Depends
+from loguru import logger
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.database import get_async_session_maker
+from core.indexes import IndexLoader
+from core.settings import settings
+from core.suggest import SuggestIndex, Suggestion, suggest_index
+from db.dependencies.sessions import get_db_session
+from db.models.brands import Brand
+from db.models.categories import Category
+from db.models.orders import UNSOLD_STATUSES, Order, OrderItem
+from db.models.products import Product, ProductVariant
+
+
+async def rebuild_suggest_index() -> None:
+    """Rebuild the shared index with its own session (startup, TTL expiry)."""
+    async with get_async_session_maker()() as session:
+        await SuggestService(session).rebuild()
+
+
+suggest_loader = IndexLoader(
+    rebuild_suggest_index, lambda: settings.SUGGEST_INDEX_TTL_SECONDS
+)
+
+
+class SuggestService:
+    def __init__(self, session: AsyncSession, index: SuggestIndex = suggest_index):
+        self.session = session
+        self.index = index
+
+    async def _units_sold(self) -> dict[int, int]:
+        result = await self.session.execute(
+            select(ProductVariant.product_id, func.sum(OrderItem.quantity))
+            .join(OrderItem, OrderItem.variant_id == ProductVariant.id)
+            .join(Order, Order.id == OrderItem.order_id)
+            .where(Order.status.not_in(UNSOLD_STATUSES))
+            .group_by(ProductVariant.product_id)
+        )
+        return {product_id: int(units) for product_id, units in result}
+
+    async def rebuild(self) -> None:
+        started = time.perf_counter()
+        units_sold = await self._units_sold()
+        brand_units: dict[int, int] = defaultdict(int)
+        category_units: dict[int, int] = defaultdict(int)
+
+        entries: list[Suggestion] = []
+        result = await self.session.stream(
+            select(
+                Product.id,
+                Product.title,
+                Product.slug,
+                Product.brand_id,
+                Product.category_id,
+            )
+            .where(Product.is_active)
+            .execution_options(yield_per=5000)
+        )
+        async for product_id, title, slug, brand_id, category_id in result:
+            units = units_sold.get(product_id, 0)
+            brand_units[brand_id] += units
+            category_units[category_id] += units
+            entries.append(
+                Suggestion(
+                    "product",
+                    product_id,
+                    title,
+                    slug,
+                    popularity=units,
+                    brand_id=brand_id,
+                    category_id=category_id,
+                )
+            )
+        for brand_id, name, slug in await self.session.execute(
+            select(Brand.id, Brand.name, Brand.slug)
+        ):
+            entries.append(
+                Suggestion("brand", brand_id, name, slug, brand_units[brand_id])
+            )
+        for category_id, name, slug in await self.session.execute(
+            select(Category.id, Category.name, Category.slug)
+        ):
+            entries.append(
+                Suggestion(
+                    "category", category_id, name, slug, category_units[category_id]
+                )
+            )
+
+        self.index.build(entries)
+        logger.info(
+            "Suggest index built: {} entries in {:.2f}s",
+            len(self.index),
+            time.perf_counter() - started,
+        )
+
+    async def ensure_loaded(self) -> None:
+        """Build the index on first use, rebuild it once stale (`IndexLoader`)."""
+        await suggest_loader.ensure_loaded(self.index, self.rebuild)
+
+    async def suggest(self, prefix: str, limit: int = 10) -> list[Suggestion]:
+        await self.ensure_loaded()
+        return self.index.search(prefix, limit=limit)
+
+
+async def get_suggest_service(
+    session: AsyncSession = Depends(get_db_session),
+) -> SuggestService:
+    return SuggestService(session)
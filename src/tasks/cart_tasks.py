@@ -0,0 +1,17 @@
+import asyncio
+
+from celery import shared_task
+
+from core.database import task_session
+from services.cart_service import CartService
+
+
+async def _sweep_abandoned_carts() -> dict[str, int]:
+    async with task_session() as session:
+        return await CartService(session).sweep_abandoned()
+
+
+@shared_task
+def sweep_abandoned_carts_task() -> dict[str, int]:
+    """Delete cart lines and empty carts nobody has touched for a long time."""
+    return asyncio.run(_sweep_abandoned_carts())
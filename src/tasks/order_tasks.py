@@ -0,0 +1,20 @@
+import asyncio
+
+from celery import shared_task
+from loguru import logger
+
+from core.database import task_session
+from services.order_service import OrderService
+
+
+async def _release_expired_reservations() -> int:
+    async with task_session() as session:
+        return await OrderService(session).release_expired_reservations()
+
+
+@shared_task
+def release_expired_reservations_task() -> int:
+    """Put the stock held by unpaid orders past their hold back on sale."""
+    released = asyncio.run(_release_expired_reservations())
+    logger.info("Stock reservations released: {}", released)
+    return released
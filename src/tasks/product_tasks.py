@@ -0,0 +1,73 @@
+import asyncio
+
+from celery import shared_task
+from loguru import logger
+
+from core.database import task_session
+from core.settings import settings
+from db.crud.product import ProductCRUD
+from schemas.product_import import ProductImportOutScheme
+from services.image_service import ImageRenditionService
+from services.media_service import MediaService
+from services.product_import_service import ProductImportService
+from services.related_service import RelatedProductsService
+
+
+async def _import_products(import_id: int) -> dict:
+    async with task_session() as session:
+        job = await ProductImportService(session).run_queued(import_id)
+        return ProductImportOutScheme.model_validate(job).model_dump(mode="json")
+
+
+@shared_task
+def import_products_task(import_id: int) -> dict:
+    """Run a queued bulk product import; progress is saved on the import row."""
+    return asyncio.run(_import_products(import_id))
+
+
+async def _repair_product_summaries() -> int:
+    async with task_session() as session:
+        return await ProductCRUD(session).repair_summaries(
+            settings.PRODUCT_SUMMARY_REPAIR_BATCH_SIZE
+        )
+
+
+@shared_task
+def repair_product_summaries_task() -> int:
+    """Recompute product summary columns that drifted from their variants."""
+    repaired = asyncio.run(_repair_product_summaries())
+    logger.info("Product summaries repaired: {}", repaired)
+    return repaired
+
+
+async def _rebuild_related_products() -> int:
+    async with task_session() as session:
+        return await RelatedProductsService(session).rebuild()
+
+
+@shared_task
+def rebuild_related_products_task() -> int:
+    """Recompute the frequently-bought-together table from order lines."""
+    return asyncio.run(_rebuild_related_products())
+
+
+async def _process_product_image(image_id: int) -> None:
+    async with task_session() as session:
+        await ImageRenditionService(session).process(image_id)
+
+
+@shared_task
+def process_product_image_task(image_id: int) -> None:
+    """Render the resized renditions of an uploaded product image."""
+    asyncio.run(_process_product_image(image_id))
+
+
+async def _collect_media_garbage() -> int:
+    async with task_session() as session:
+        return await MediaService(session).collect_garbage()
+
+
+@shared_task
+def collect_media_garbage_task() -> int:
+    """Delete stored images no product image has used for a grace period."""
+    return asyncio.run(_collect_media_garbage())
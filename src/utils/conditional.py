@@ -0,0 +1,55 @@
+# src/utils/conditional.py
+"""Conditional GET handling (ETag / Last-Modified -> 304 Not Modified)."""
+
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+from core.cache import CachedPayload
+
+
+def _utc(value: datetime) -> datetime:
+    # DB timestamps come back naive and are stored in UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def is_not_modified(
+    request: Request, etag: str, last_modified: Optional[datetime] = None
+) -> bool:
+    """
+    RFC 9110 evaluation for GET: If-None-Match wins when present (weak
+    comparison), otherwise If-Modified-Since is compared at second precision.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        tags = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+        return etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    return _utc(last_modified) <= _utc(since)
+
+
+def conditional_response(request: Request, payload: CachedPayload) -> Response:
+    """JSON response for `payload`, or an empty 304 if the client is current."""
+    headers = {"ETag": payload.etag}
+    if payload.last_modified is not None:
+        headers["Last-Modified"] = format_datetime(
+            _utc(payload.last_modified), usegmt=True
+        )
+    if is_not_modified(request, payload.etag, payload.last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(
+        content=payload.body, media_type="application/json", headers=headers
+    )
@@ -1,6 +1,95 @@
+import re
 import uuid
+from pathlib import Path
+from typing import Optional
+
+from core.settings import settings
+
+# rendition format -> file extension
+RENDITION_EXTENSIONS = {"webp": "webp", "jpeg": "jpg"}
+# leading bytes of the image formats we accept -> file extension
+IMAGE_SIGNATURES = {
+    b"\xff\xd8\xff": "jpg",
+    b"\x89PNG\r\n\x1a\n": "png",
+    b"GIF87a": "gif",
+    b"GIF89a": "gif",
+}
+# bytes needed to tell the formats apart
+IMAGE_SIGNATURE_LENGTH = 12
+# stored blob file name: "<sha256 hex>.<ext>"
+BLOB_NAME = re.compile(r"([0-9a-f]{64})\.[a-z]+")
+# a blob or one of its renditions ("<sha256 hex>_large.webp")
+CONTENT_ADDRESSED_NAME = re.compile(r"[0-9a-f]{64}(_[a-z]+)?\.[a-z]+")
 
 
 def generate_filename(original_name: str) -> str:
     ext = original_name.split(".")[-1]
     return f"{uuid.uuid4().hex}.{ext}"
+
+
+def detect_image_type(head: bytes) -> Optional[str]:
+    """File extension for an image from its first bytes, None if not one."""
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    for signature, ext in IMAGE_SIGNATURES.items():
+        if head.startswith(signature):
+            return ext
+    return None
+
+
+def media_path(url: str) -> Optional[Path]:
+    """File behind a media URL we serve, None for external URLs."""
+    prefix = settings.MEDIA_URL.rstrip("/") + "/"
+    if not url.startswith(prefix):
+        return None
+    relative = Path(url.removeprefix(prefix).lstrip("/"))
+    if ".." in relative.parts:
+        return None
+    return settings.MEDIA_ROOT / relative
+
+
+def blob_relative_path(digest: str, ext: str) -> str:
+    """Where a blob lives under MEDIA_ROOT, sharded by its leading hex digits."""
+    return f"{settings.MEDIA_BLOB_DIR}/{digest[:2]}/{digest[2:4]}/{digest}.{ext}"
+
+
+def blob_url(digest: str, ext: str) -> str:
+    return f"{settings.MEDIA_URL.rstrip('/')}/{blob_relative_path(digest, ext)}"
+
+
+def blob_digest(url: str) -> Optional[str]:
+    """Content digest of the blob behind a media URL, None if it isn't one."""
+    path = media_path(url)
+    if (
+        path is None
+        or path.parent.parent.parent != settings.MEDIA_ROOT / settings.MEDIA_BLOB_DIR
+    ):
+        return None
+    match = BLOB_NAME.fullmatch(path.name)
+    return match.group(1) if match else None
+
+
+def is_content_addressed(relative_path: str) -> bool:
+    """Whether a path under MEDIA_ROOT names content that never changes."""
+    directory, _, name = relative_path.replace("\\", "/").rpartition("/")
+    return directory.startswith(f"{settings.MEDIA_BLOB_DIR}/") and bool(
+        CONTENT_ADDRESSED_NAME.fullmatch(name)
+    )
+
+
+def rendition_name(source_name: str, size: str, format: str) -> str:
+    """Rendition file, next to the original: "a1b2.png" -> "a1b2_large.webp"."""
+    stem = source_name.rsplit(".", 1)[0]
+    return f"{stem}_{size}.{RENDITION_EXTENSIONS[format]}"
+
+
+def rendition_urls(url: str) -> dict[str, dict[str, str]]:
+    """size -> format -> URL of the renditions of the image at `url`."""
+    base, _, name = url.rpartition("/")
+    return {
+        size: {
+            format: f"{base}/{rendition_name(name, size, format)}"
+            for format in settings.IMAGE_RENDITION_FORMATS
+        }
+        for size in settings.IMAGE_RENDITION_SIZES
+    }
@@ -0,0 +1,58 @@
+"""
+Resized renditions of uploaded images.
+
+CPU-bound: called in Celery workers or a process pool, never on the API
+event loop.
+"""
+
+from pathlib import Path
+from typing import Any
+
+from PIL import Image, ImageOps
+
+from utils.file_utils import rendition_name
+
+# format -> (Pillow format, encoder options)
+RENDITION_FORMATS: dict[str, tuple[str, dict[str, Any]]] = {
+    "webp": ("WEBP", {"method": 4}),
+    "jpeg": ("JPEG", {"optimize": True, "progressive": True}),
+}
+
+
+def _flatten(image: Image.Image) -> Image.Image:
+    """RGB for JPEG: transparent areas become white."""
+    if image.mode != "RGBA":
+        return image.convert("RGB")
+    background = Image.new("RGB", image.size, "white")
+    background.paste(image, mask=image.getchannel("A"))
+    return background
+
+
+def render_renditions(
+    source: Path, sizes: dict[str, int], formats: list[str], quality: int
+) -> list[Path]:
+    """
+    Write every size in every format next to `source` and return the paths.
+    Images are only scaled down, rotated upright from their EXIF orientation,
+    and saved without metadata (EXIF, GPS, ICC, XMP).
+    """
+    written = []
+    with Image.open(source) as original:
+        # JPEG: decode straight at a reduced scale when the original is huge
+        largest = max(sizes.values())
+        original.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(original)
+        has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+        image.info.clear()
+
+        # largest first, each size resampled from the previous one
+        for size, side in sorted(sizes.items(), key=lambda item: -item[1]):
+            image.thumbnail((side, side), Image.Resampling.LANCZOS)
+            for format in formats:
+                pil_format, options = RENDITION_FORMATS[format]
+                target = source.with_name(rendition_name(source.name, size, format))
+                output = _flatten(image) if pil_format == "JPEG" else image
+                output.save(target, pil_format, quality=quality, **options)
+                written.append(target)
+    return written
@@ -0,0 +1,42 @@
+import base64
+import binascii
+from typing import Any, Sequence
+
+import orjson
+from fastapi import HTTPException, status
+
+
+def encode_cursor(key: str, values: Sequence[Any]) -> str:
+    """
+    Pack the sort key of the last row of a page into an opaque token.
+    `key` names the ordering so a cursor can't be replayed against another one.
+    """
+    payload = orjson.dumps({"k": key, "v": list(values)}, default=str)
+    return base64.urlsafe_b64encode(payload).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, key: str) -> list[Any]:
+    """
+    Unpack a token produced by `encode_cursor`.
+    Raises HTTPException 400 if the token is malformed or made for another ordering.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = orjson.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+    if not isinstance(payload, dict) or payload.get("k") != key:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor does not match the requested ordering",
+        )
+
+    values = payload.get("v")
+    if not isinstance(values, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+    return values
@@ -0,0 +1,37 @@
+import asyncio
+
+from core.cache import TTLCache
+
+
+def test_cache_evicts_least_recently_used() -> None:
+    cache = TTLCache("test", maxsize=2, ttl=60)
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    assert cache.get("a") == b"1"
+    cache.set("c", b"3")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+    assert cache.get("c") == b"3"
+
+
+def test_cache_entries_expire() -> None:
+    cache = TTLCache("test", maxsize=2, ttl=0)
+    cache.set("a", b"1")
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_cache_get_or_load_skips_missing() -> None:
+    """A not-found result is not cached, so the next read loads again."""
+    cache = TTLCache("test", maxsize=2, ttl=60)
+    calls = []
+
+    async def load():
+        calls.append(1)
+        return None if len(calls) == 1 else [1, 2]
+
+    assert asyncio.run(cache.get_or_load("k", load, list[int])) is None
+    payload = asyncio.run(cache.get_or_load("k", load, list[int]))
+    assert payload.body == b"[1,2]"
+    assert asyncio.run(cache.get_or_load("k", load, list[int])) is payload
+    assert len(calls) == 2
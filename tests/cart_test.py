@@ -0,0 +1,212 @@
+from collections import namedtuple
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select, update
+
+from core.guest_carts import new_guest_cart_id
+from core.prometheus import get_maintenance_metrics
+from core.settings import settings
+from db.crud.cart import CartCRUD
+from db.models.carts import Cart, CartItem
+from db.models.categories import Category
+from db.models.products import Product, ProductVariant
+from db.models.users import User
+from schemas.cart import CartOperationScheme
+from services.cart_service import (
+    CartService,
+    GuestCartService,
+    fold_operations,
+    merge_guest_lines,
+)
+
+
+def test_fold_operations_in_order() -> None:
+    operations = [
+        CartOperationScheme(op="add", variant_id=1, quantity=2),
+        CartOperationScheme(op="add", variant_id=1),
+        CartOperationScheme(op="remove", variant_id=2),
+        CartOperationScheme(op="set", variant_id=3, quantity=4),
+        CartOperationScheme(op="add", variant_id=3, quantity=1),
+        CartOperationScheme(op="set", variant_id=4, quantity=0),
+    ]
+    current = {1: 5, 2: 1, 4: 2}
+    assert fold_operations(current, operations) == {1: 8, 2: 0, 3: 5, 4: 0}
+    assert current == {1: 5, 2: 1, 4: 2}
+
+
+def test_merge_guest_lines_caps_at_stock() -> None:
+    line = namedtuple("line", "id stock price quantity")
+    lines = [
+        line(1, 10, Decimal("5"), None),  # new line
+        line(2, 5, Decimal("6"), 4),  # capped at the stock
+        line(3, 2, Decimal("7"), 3),  # over stock already: left as is
+    ]
+    assert merge_guest_lines(lines, {1: 2, 2: 3, 3: 1}) == {
+        1: (2, Decimal("5")),
+        2: (5, Decimal("6")),
+    }
+
+
+async def _shop(dbsession) -> tuple[int, int]:
+    """User and variant (5 in stock) ids; objects expire on service rollbacks."""
+    user = User(email="buyer@example.com", username="buyer", hashed_password="x")
+    category = Category(name="Shoes", slug="shoes")
+    dbsession.add_all([user, category])
+    await dbsession.flush()
+    product = Product(title="Boot", slug="boot", price=10, category_id=category.id)
+    dbsession.add(product)
+    await dbsession.flush()
+    variant = ProductVariant(sku="boot-m", product_id=product.id, price=10, stock=5)
+    dbsession.add(variant)
+    await dbsession.commit()
+    return user.id, variant.id
+
+
+def _quantities(cart) -> dict[int, int]:
+    return {item.variant_id: item.quantity for item in cart.items}
+
+
+async def test_add_upserts_within_stock(dbsession) -> None:
+    user_id, variant_id = await _shop(dbsession)
+    crud, service = CartCRUD(dbsession), CartService(dbsession)
+
+    # no cart yet: the upsert writes nothing, the service creates the cart
+    assert await crud.upsert_item(user_id, variant_id, 1) is None
+    cart = await service.add_to_cart(user_id, variant_id, 2)
+    assert _quantities(cart) == {variant_id: 2}
+    version = cart.version
+
+    # the same line grows; the price follows the variant's current price
+    await dbsession.execute(
+        update(ProductVariant)
+        .where(ProductVariant.id == variant_id)
+        .values(price=Decimal("12.50"))
+    )
+    assert await crud.upsert_item(user_id, variant_id, 3) == 5
+    await dbsession.commit()
+    cart = await service.get_user_cart(user_id)
+    assert _quantities(cart) == {variant_id: 5}
+    assert cart.items[0].price == Decimal("12.50")
+    assert cart.version == version + 1
+
+    # over the stock: nothing written
+    with pytest.raises(HTTPException) as exc:
+        await service.add_to_cart(user_id, variant_id, 1)
+    assert exc.value.status_code == 400
+    with pytest.raises(HTTPException) as exc:
+        await service.add_to_cart(user_id, variant_id + 1, 1)
+    assert exc.value.status_code == 404
+    cart = await service.get_user_cart(user_id)
+    assert (_quantities(cart), cart.version) == ({variant_id: 5}, version + 1)
+
+
+async def test_update_sets_existing_lines_only(dbsession) -> None:
+    user_id, variant_id = await _shop(dbsession)
+    service = CartService(dbsession)
+
+    with pytest.raises(HTTPException) as exc:
+        await service.update_quantity(user_id, variant_id, 2)
+    assert exc.value.status_code == 404
+
+    await service.add_to_cart(user_id, variant_id, 4)
+    cart = await service.update_quantity(user_id, variant_id, 1)
+    assert _quantities(cart) == {variant_id: 1}
+    with pytest.raises(HTTPException) as exc:
+        await service.update_quantity(user_id, variant_id, 6)
+    assert exc.value.status_code == 400
+
+    cart = await service.update_quantity(user_id, variant_id, 0)
+    assert _quantities(cart) == {}
+
+
+async def test_guest_update_sets_existing_lines_only(dbsession) -> None:
+    _, variant_id = await _shop(dbsession)
+    service = GuestCartService(dbsession)
+    cart_id = new_guest_cart_id()
+
+    with pytest.raises(HTTPException) as exc:
+        await service.update_quantity(cart_id, variant_id, 2)
+    assert exc.value.status_code == 404
+
+    await service.add_to_cart(cart_id, variant_id, 1)
+    cart = await service.update_quantity(cart_id, variant_id, 3)
+    assert [(item.variant_id, item.quantity) for item in cart.items] == [
+        (variant_id, 3)
+    ]
+    await service.clear_cart(cart_id)
+
+
+async def test_sweep_deletes_in_throttled_batches(dbsession, monkeypatch) -> None:
+    category = Category(name="Hats", slug="hats")
+    users = [
+        User(email=f"u{i}@example.com", username=f"u{i}", hashed_password="x")
+        for i in range(4)
+    ]
+    dbsession.add_all([category, *users])
+    await dbsession.flush()
+    product = Product(title="Cap", slug="cap", price=5, category_id=category.id)
+    dbsession.add(product)
+    await dbsession.flush()
+    variants = [
+        ProductVariant(sku=f"cap-{i}", product_id=product.id, price=5, stock=9)
+        for i in range(3)
+    ]
+    carts = [Cart(user_id=user.id) for user in users]
+    dbsession.add_all([*variants, *carts])
+    await dbsession.flush()
+    # carts[0]: three stale lines; carts[1]: a stale and a fresh line;
+    # carts[2]: empty and stale; carts[3]: empty and fresh
+    lines = [
+        CartItem(cart_id=carts[0].id, variant_id=variant.id, price=5)
+        for variant in variants
+    ] + [
+        CartItem(cart_id=carts[1].id, variant_id=variants[0].id, price=5),
+        CartItem(cart_id=carts[1].id, variant_id=variants[1].id, price=5),
+    ]
+    dbsession.add_all(lines)
+    await dbsession.flush()
+    fresh_line, kept_cart_ids = lines[-1].id, {carts[1].id, carts[3].id}
+    old = datetime.now() - timedelta(days=settings.CART_ITEM_EXPIRE_DAYS + 1)
+    await dbsession.execute(
+        update(CartItem).where(CartItem.id != fresh_line).values(updated_at=old)
+    )
+    await dbsession.execute(
+        update(Cart)
+        .where(Cart.id.in_([carts[0].id, carts[1].id, carts[2].id]))
+        .values(updated_at=old)
+    )
+    await dbsession.commit()
+
+    pauses: list[float] = []
+
+    async def sleep(seconds: float) -> None:
+        pauses.append(seconds)
+
+    monkeypatch.setattr(settings, "CART_SWEEP_BATCH_SIZE", 2)
+    monkeypatch.setattr(settings, "CART_SWEEP_PAUSE_SECONDS", 0.5)
+    monkeypatch.setattr("services.cart_service.asyncio.sleep", sleep)
+    latency = get_maintenance_metrics().batch_latency
+
+    def batches() -> float:
+        (family,) = latency.collect()
+        return sum(
+            sample.value
+            for sample in family.samples
+            if sample.name.endswith("_count")
+            and sample.labels == {"job": "cart_sweep", "table": "cart_items"}
+        )
+
+    before = batches()
+
+    removed = await CartService(dbsession).sweep_abandoned()
+
+    # lines: 2 + 2 + 0, carts: 2 (the one emptied here counts) + 0; a pause
+    # after every full batch only
+    assert removed == {"cart_items": 4, "carts": 2}
+    assert pauses == [0.5, 0.5, 0.5]
+    assert batches() - before == 3
+    assert await dbsession.scalar(select(func.count(CartItem.id))) == 1
+    assert set(await dbsession.scalars(select(Cart.id))) == kept_cart_ids
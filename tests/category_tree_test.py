@@ -0,0 +1,83 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from db.crud.category import CategoryCRUD
+from db.models.categories import CategoryClosure
+from schemas.category import CategoryCreateScheme, CategoryUpdateScheme
+
+
+async def _closure(dbsession) -> set[tuple[int, int, int]]:
+    result = await dbsession.execute(
+        select(
+            CategoryClosure.ancestor_id,
+            CategoryClosure.descendant_id,
+            CategoryClosure.depth,
+        )
+    )
+    return set(result.tuples().all())
+
+
+def _expected(parents: dict[int, int | None]) -> set[tuple[int, int, int]]:
+    """The closure rows of a tree given as {category id: parent id}."""
+    rows = set()
+    for node in parents:
+        ancestor, depth = node, 0
+        while ancestor is not None:
+            rows.add((ancestor, node, depth))
+            ancestor, depth = parents[ancestor], depth + 1
+    return rows
+
+
+async def _tree(crud: CategoryCRUD) -> dict[str, int]:
+    """clothes > shoes > boots, and a separate sale root."""
+    ids: dict[str, int] = {}
+    for name, parent in (
+        ("clothes", None),
+        ("shoes", "clothes"),
+        ("boots", "shoes"),
+        ("sale", None),
+    ):
+        category = await crud.create(
+            CategoryCreateScheme(
+                name=name, slug=name, parent_id=ids[parent] if parent else None
+            )
+        )
+        ids[name] = category.id
+    return ids
+
+
+async def test_move_rehangs_the_subtree(dbsession) -> None:
+    crud = CategoryCRUD(dbsession)
+    ids = await _tree(crud)
+    clothes, shoes, boots, sale = (
+        ids[name] for name in ("clothes", "shoes", "boots", "sale")
+    )
+    assert await _closure(dbsession) == _expected(
+        {clothes: None, shoes: clothes, boots: shoes, sale: None}
+    )
+
+    # shoes (and boots below it) move under sale
+    await crud.update(await crud.get_by_id(shoes), CategoryUpdateScheme(parent_id=sale))
+    assert await _closure(dbsession) == _expected(
+        {clothes: None, shoes: sale, boots: shoes, sale: None}
+    )
+
+    # then become a root
+    await crud.update(await crud.get_by_id(shoes), CategoryUpdateScheme(parent_id=None))
+    assert await _closure(dbsession) == _expected(
+        {clothes: None, shoes: None, boots: shoes, sale: None}
+    )
+
+
+async def test_move_under_own_subtree_is_rejected(dbsession) -> None:
+    crud = CategoryCRUD(dbsession)
+    ids = await _tree(crud)
+    before = await _closure(dbsession)
+
+    shoes = await crud.get_by_id(ids["shoes"])
+    for parent in ("shoes", "boots"):
+        with pytest.raises(HTTPException) as exc:
+            await crud.update(shoes, CategoryUpdateScheme(parent_id=ids[parent]))
+        assert exc.value.status_code == 400
+    assert await _closure(dbsession) == before
@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from fastapi import Request
+
+from core.cache import make_payload
+from utils.conditional import conditional_response
+
+
+def _request(**headers: str) -> Request:
+    raw = [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()]
+    return Request({"type": "http", "method": "GET", "headers": raw})
+
+
+def test_matching_etag_is_not_modified() -> None:
+    payload = make_payload(list[int], [1, 2])
+    response = conditional_response(_request(if_none_match=payload.etag), payload)
+    assert response.status_code == 304
+    assert response.headers["etag"] == payload.etag
+    assert response.body == b""
+
+
+def test_etag_takes_precedence_over_date() -> None:
+    """A stale If-None-Match wins over an If-Modified-Since that would match."""
+    payload = make_payload(list[int], [1], last_modified=datetime(2025, 1, 1))
+    request = _request(
+        if_none_match='"stale"', if_modified_since="Wed, 01 Jan 2025 00:00:00 GMT"
+    )
+    response = conditional_response(request, payload)
+    assert response.status_code == 200
+    assert response.body == b"[1]"
+
+
+def test_if_modified_since() -> None:
+    payload = make_payload(list[int], [1], last_modified=datetime(2025, 1, 1, 12))
+    current = _request(if_modified_since="Wed, 01 Jan 2025 12:00:00 GMT")
+    stale = _request(if_modified_since="Wed, 01 Jan 2025 11:59:59 GMT")
+    assert conditional_response(current, payload).status_code == 304
+    assert conditional_response(stale, payload).status_code == 200
@@ -5,30 +5,47 @@ from collections.abc import AsyncGenerator
 import pytest
 from fastapi import FastAPI
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.pool import NullPool
 
-from src.app import create_app
-from src.core.settings import settings
-from src.db.dependencies.sessions import get_db_session
-from src.db.meta import meta
-from src.db.models import load_all_models
+# the same modules the app imports (pytest puts src/ on the path): under the
+# src. prefix they would be separate copies, with a metadata no model is on
+from app import create_app
+from db.dependencies.sessions import get_db_session
+from db.meta import meta
+from db.models import load_all_models
 
 
 # -------------------------
 # DATABASE ENGINE FIXTURE
 # -------------------------
 @pytest.fixture(scope="session")
-async def _engine() -> AsyncGenerator[AsyncEngine, None]:
-    """Создаёт тестовый движок и создаёт таблицы в памяти."""
+async def _engine(
+    tmp_path_factory: pytest.TempPathFactory,
+) -> AsyncGenerator[AsyncEngine, None]:
+    """Создаёт тестовый движок и создаёт таблицы во временной базе."""
 
     load_all_models()  # <-- обязательно, иначе модели не загрузятся
 
-    engine = create_async_engine(str(settings.DATABASE_URL))
+    # a file, not :memory:, so that every test (each in its own event loop)
+    # opens its own connection to the same tables
+    db_path = tmp_path_factory.mktemp("db") / "test.db"
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+
+    # let SQLAlchemy emit BEGIN itself, so SAVEPOINTs work with pysqlite
+    @event.listens_for(engine.sync_engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _begin(connection):
+        connection.exec_driver_sql("BEGIN")
 
     async with engine.begin() as conn:
         await conn.run_sync(meta.create_all)
@@ -50,7 +67,13 @@ async def dbsession(_engine: AsyncEngine) -> AsyncGenerator[AsyncSession, None]:
     connection = await _engine.connect()
     transaction = await connection.begin()
 
-    session_maker = async_sessionmaker(connection, expire_on_commit=False)
+    # commit()/rollback() in the code under test end a SAVEPOINT, never
+    # the transaction rolled back after the test
+    session_maker = async_sessionmaker(
+        connection,
+        expire_on_commit=False,
+        join_transaction_mode="create_savepoint",
+    )
     session = session_maker()
 
     try:
@@ -0,0 +1,39 @@
+import asyncio
+import gzip
+from datetime import datetime
+from decimal import Decimal
+
+from services.export_service import encode_export
+
+COLUMNS = ["id", "price", "created_at"]
+PARTITIONS = [
+    [{"id": 1, "price": Decimal("9.90"), "created_at": datetime(2025, 1, 2, 3, 4)}],
+    [{"id": 2, "price": Decimal("5"), "created_at": None}],
+]
+
+
+def _export(format: str, compress: bool = False) -> bytes:
+    async def partitions():
+        for rows in PARTITIONS:
+            yield rows
+
+    async def collect():
+        chunks = encode_export(partitions(), COLUMNS, format, compress)
+        return b"".join([chunk async for chunk in chunks])
+
+    return asyncio.run(collect())
+
+
+def test_csv_export_has_header_and_one_line_per_row() -> None:
+    assert _export("csv").decode().splitlines() == [
+        "id,price,created_at",
+        "1,9.90,2025-01-02T03:04:00",
+        "2,5,",
+    ]
+
+
+def test_gzipped_ndjson_export() -> None:
+    assert gzip.decompress(_export("ndjson", compress=True)) == (
+        b'{"id":1,"price":"9.90","created_at":"2025-01-02T03:04:00"}\n'
+        b'{"id":2,"price":"5","created_at":null}\n'
+    )
@@ -0,0 +1,58 @@
+from decimal import Decimal
+from types import SimpleNamespace
+
+from services.facet_service import FacetIndex
+
+
+def _product(pk: int, **fields) -> SimpleNamespace:
+    values = dict(
+        id=pk,
+        category_id=1,
+        brand_id=pk % 2 + 1,
+        seller_id=None,
+        in_stock=True,
+        price=Decimal(pk * 10),
+        is_active=True,
+    )
+    values.update(fields)
+    return SimpleNamespace(**values)
+
+
+def _index() -> FacetIndex:
+    index = FacetIndex([25, 50])
+    products = [_product(pk) for pk in range(1, 7)]
+    attributes = {1: [{"color": "red"}], 2: [{"color": "blue"}, {"color": "red"}]}
+    index.build(products, attributes)
+    return index
+
+
+def test_facet_counts_ignore_own_filter() -> None:
+    """Selecting a brand still counts the other brands."""
+    result = _index().query({"brand_id": [1]})
+    assert result.total == 3
+    assert result.counts["brand_id"] == {"2": 3, "1": 3}
+    assert result.counts["price"] == {"0-25": 1, "25-50": 1, "50+": 1}
+    assert result.counts["attr.color"] == {"blue": 1, "red": 1}
+
+
+def test_facet_price_range_and_attributes() -> None:
+    result = _index().query({"attr.color": ["red"]}, price_max=Decimal(15))
+    assert FacetIndex.page(result.mask, limit=10) == [1]
+    assert result.counts["attr.color"] == {"red": 1}
+
+
+def test_facet_upsert_and_page() -> None:
+    index = _index()
+    index.upsert(_product(9, brand_id=1))
+    index.upsert(_product(4, is_active=False))
+    result = index.query({"brand_id": [1]})
+    assert FacetIndex.page(result.mask, limit=2) == [9, 6]
+    assert FacetIndex.page(result.mask, limit=2, before=6) == [2]
+
+
+def test_facet_query_on_empty_catalog() -> None:
+    index = FacetIndex([25, 50])
+    index.build([], {})
+    result = index.query({"attr.color": ["red"], "brand_id": [1]})
+    assert result.total == 0
+    assert FacetIndex.page(result.mask, limit=10) == []
@@ -0,0 +1,29 @@
+import asyncio
+
+from core.guest_carts import MemoryGuestCartStore
+from core.security import sign_value, unsign_value
+
+
+def test_signed_value_round_trip() -> None:
+    signed = sign_value("cart-1", "guest-cart")
+    assert unsign_value(signed, "guest-cart") == "cart-1"
+    assert unsign_value(signed, "other-salt") is None
+    assert unsign_value("cart-2" + signed[6:], "guest-cart") is None
+    assert unsign_value("cart-1", "guest-cart") is None
+
+
+def test_memory_store_expires_carts() -> None:
+    async def run(store: MemoryGuestCartStore) -> None:
+        assert await store.add("a", 1, 2) == 2
+        assert await store.add("a", 1, 1) == 3
+        await store.set("a", 2, 5)
+        assert await store.remove("a", 2)
+        assert not await store.remove("a", 2)
+        assert await store.get("a") == {1: 3}
+
+        store.ttl = 0
+        await store.set("b", 1, 1)
+        assert await store.get("b") == {}
+        assert len(store) == 1
+
+    asyncio.run(run(MemoryGuestCartStore(ttl=60)))
@@ -0,0 +1,68 @@
+from datetime import datetime
+from pathlib import Path
+
+from PIL import Image
+from sqlalchemy import select, update
+
+from db.crud.product import ProductImageCRUD
+from db.models.categories import Category
+from db.models.products import Product
+from utils.file_utils import detect_image_type, media_path, rendition_urls
+from utils.images import render_renditions
+
+
+def test_renditions_are_upright_scaled_down_and_stripped(tmp_path: Path) -> None:
+    source = tmp_path / "photo.jpg"
+    exif = Image.Exif()
+    exif[0x0112] = 6  # orientation: rotated 90 degrees
+    exif[0x010F] = "Camera"
+    Image.new("RGB", (400, 200), "red").save(source, exif=exif)
+
+    written = render_renditions(source, {"small": 100, "big": 1000}, ["webp"], 80)
+
+    assert [path.name for path in written] == ["photo_big.webp", "photo_small.webp"]
+    with Image.open(written[0]) as big, Image.open(written[1]) as small:
+        assert big.size == (200, 400)  # upright, never scaled up
+        assert small.size == (50, 100)
+        assert not big.getexif() and not small.getexif()
+
+
+def test_rendition_urls_and_media_path() -> None:
+    urls = rendition_urls("/media/products/a1b2.png")
+    assert urls["thumbnail"]["webp"] == "/media/products/a1b2_thumbnail.webp"
+    assert urls["large"]["jpeg"] == "/media/products/a1b2_large.jpg"
+    assert media_path("https://cdn.example.com/a.png") is None
+    assert media_path("/media/../etc/passwd") is None
+
+
+def test_detect_image_type_by_magic_bytes() -> None:
+    assert detect_image_type(b"\xff\xd8\xff\xe0\x00\x10JFIF") == "jpg"
+    assert detect_image_type(b"\x89PNG\r\n\x1a\n\x00\x00") == "png"
+    assert detect_image_type(b"GIF89a\x01\x00") == "gif"
+    assert detect_image_type(b"RIFF\x24\x00\x00\x00WEBPVP8 ") == "webp"
+    assert detect_image_type(b"RIFF\x24\x00\x00\x00WAVEfmt ") is None
+    assert detect_image_type(b"<?php echo 1;") is None
+
+
+async def test_renditions_status_moves_last_modified(dbsession) -> None:
+    category = Category(name="Lamps", slug="lamps")
+    dbsession.add(category)
+    await dbsession.flush()
+    product = Product(title="Lamp", slug="lamp", price=10, category_id=category.id)
+    dbsession.add(product)
+    await dbsession.commit()
+    crud = ProductImageCRUD(dbsession)
+    image = await crud.create(product.id, "/media/products/lamp.png")
+    await dbsession.execute(
+        update(Product)
+        .where(Product.id == product.id)
+        .values(updated_at=datetime(2000, 1, 1))
+    )
+    await dbsession.commit()
+
+    await crud.set_renditions_status(image, "ready")
+
+    updated_at = await dbsession.scalar(
+        select(Product.updated_at).where(Product.id == product.id)
+    )
+    assert updated_at > datetime(2000, 1, 1)
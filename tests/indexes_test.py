@@ -0,0 +1,43 @@
+import asyncio
+import time
+
+from core.indexes import IndexLoader
+
+
+class _Index:
+    def __init__(self) -> None:
+        self.loaded_at: float | None = None
+        self.builds = 0
+
+    async def build(self) -> None:
+        await asyncio.sleep(0)
+        self.builds += 1
+        self.loaded_at = time.monotonic()
+
+
+async def test_first_use_builds_once() -> None:
+    index = _Index()
+    loader = IndexLoader(index.build, lambda: 60)
+
+    await asyncio.gather(*(loader.ensure_loaded(index, index.build) for _ in range(5)))
+
+    assert index.builds == 1
+
+
+async def test_stale_index_rebuilds_in_the_background_once() -> None:
+    index, rebuilt = _Index(), asyncio.Event()
+    await index.build()
+
+    async def rebuild() -> None:
+        await rebuilt.wait()
+        await index.build()
+
+    loader = IndexLoader(rebuild, lambda: 0)
+
+    # the stale index keeps serving; one rebuild runs at a time
+    await loader.ensure_loaded(index, index.build)
+    await loader.ensure_loaded(index, index.build)
+    assert index.builds == 1
+    rebuilt.set()
+    await asyncio.sleep(0.01)
+    assert index.builds == 2
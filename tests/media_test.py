@@ -0,0 +1,28 @@
+from db.crud.media import blob_ref_changes
+from utils.file_utils import blob_digest, blob_url, is_content_addressed
+
+DIGEST = "ab" * 32
+
+
+def test_blob_urls_are_sharded_by_digest() -> None:
+    url = blob_url(DIGEST, "png")
+    assert url == f"/media/images/ab/ab/{DIGEST}.png"
+    assert blob_digest(url) == DIGEST
+    # renditions, other media and external URLs are not blobs
+    assert blob_digest(url.replace(".png", "_large.webp")) is None
+    assert blob_digest(f"/media/products/{DIGEST}.png") is None
+    assert blob_digest(f"https://cdn.example.com/images/ab/ab/{DIGEST}.png") is None
+
+
+def test_content_addressed_media() -> None:
+    assert is_content_addressed(f"images/ab/ab/{DIGEST}.png")
+    assert is_content_addressed(f"images/ab/ab/{DIGEST}_thumbnail.webp")
+    assert not is_content_addressed(f"products/{DIGEST}.png")
+    assert not is_content_addressed("images/ab/ab/logo.png")
+
+
+def test_blob_ref_changes_group_blobs_by_count() -> None:
+    statements = blob_ref_changes([1, 2, 2, None, 3], -1)
+    params = [stmt.compile().params for stmt in statements]
+    assert [(p["ref_count_1"], p["id_1"]) for p in params] == [(-1, [1, 3]), (-2, [2])]
+    assert blob_ref_changes([None]) == []
@@ -0,0 +1,262 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select, update
+
+from core.settings import settings
+from db.models.categories import Category
+from db.models.delivery import Delivery
+from db.models.orders import Order, OrderStatus, StockReservation
+from db.models.products import Product, ProductVariant
+from db.models.users import User
+from schemas.order import CheckoutItemScheme
+from services.order_service import OrderService
+
+
+async def _shop(dbsession) -> tuple[int, list[int]]:
+    """User and two variant (5 in stock each) ids."""
+    user = User(email="buyer@example.com", username="buyer", hashed_password="x")
+    category = Category(name="Shoes", slug="shoes")
+    dbsession.add_all([user, category])
+    await dbsession.flush()
+    product = Product(title="Boot", slug="boot", price=10, category_id=category.id)
+    dbsession.add(product)
+    await dbsession.flush()
+    variants = [
+        ProductVariant(sku=f"boot-{size}", product_id=product.id, price=10, stock=5)
+        for size in ("m", "l")
+    ]
+    dbsession.add_all(variants)
+    await dbsession.commit()
+    return user.id, [variant.id for variant in variants]
+
+
+async def _stock(dbsession) -> dict[int, tuple[int, int]]:
+    """(stock, reserved) per variant id."""
+    rows = await dbsession.execute(
+        select(ProductVariant.id, ProductVariant.stock, ProductVariant.reserved)
+    )
+    return {id_: (stock, reserved) for id_, stock, reserved in rows}
+
+
+def _items(quantities: dict[int, int]) -> list[CheckoutItemScheme]:
+    return [
+        CheckoutItemScheme(variant_id=variant_id, quantity=quantity)
+        for variant_id, quantity in quantities.items()
+    ]
+
+
+async def test_checkout_lost_race_takes_nothing(dbsession) -> None:
+    user_id, (first, second) = await _shop(dbsession)
+    service = OrderService(dbsession)
+    lock_variants, reserve_stock = (
+        service.crud.lock_variants,
+        service.crud.reserve_stock,
+    )
+    reserved: list[set[int]] = []
+
+    async def raced(variant_ids):
+        rows = await lock_variants(variant_ids)
+        # a concurrent checkout sells the second variant after it was read
+        await dbsession.execute(
+            update(ProductVariant)
+            .where(ProductVariant.id == second)
+            .values(stock=1)
+            .execution_options(synchronize_session=False)
+        )
+        return rows
+
+    async def reserve(quantities):
+        reserved.append(await reserve_stock(quantities))
+        return reserved[-1]
+
+    service.crud.lock_variants = raced  # type: ignore[method-assign]
+    service.crud.reserve_stock = reserve  # type: ignore[method-assign]
+
+    with pytest.raises(HTTPException) as error:
+        await service.checkout(user_id, 1, _items({first: 2, second: 2}))
+
+    assert error.value.status_code == 409
+    assert error.value.detail == "Not enough stock for variant boot-l"
+    # the conditional UPDATE skipped the variant short of units only
+    assert reserved == [{first}]
+    # the first variant's units, taken by the same UPDATE, went back with
+    # the rollback (as did the stand-in for the other checkout's write)
+    assert await _stock(dbsession) == {first: (5, 0), second: (5, 0)}
+    assert await dbsession.scalar(select(func.count(Order.id))) == 0
+    assert await dbsession.scalar(select(func.count(StockReservation.id))) == 0
+
+
+async def _checkout(dbsession, user_id: int, quantities: dict[int, int]) -> int:
+    order = await OrderService(dbsession).checkout(user_id, 1, _items(quantities))
+    return order.id
+
+
+async def _expire_holds(dbsession) -> None:
+    await dbsession.execute(
+        update(StockReservation).values(expires_at=datetime(2000, 1, 1))
+    )
+    await dbsession.commit()
+
+
+async def _status(dbsession, order_id: int) -> str:
+    return await dbsession.scalar(select(Order.status).where(Order.id == order_id))
+
+
+async def _holds(dbsession) -> dict[int, dict[int, int]]:
+    """Held units per order id and variant id."""
+    rows = await dbsession.execute(
+        select(
+            StockReservation.order_id,
+            StockReservation.variant_id,
+            StockReservation.quantity,
+        )
+    )
+    holds: dict[int, dict[int, int]] = {}
+    for order_id, variant_id, quantity in rows:
+        holds.setdefault(order_id, {})[variant_id] = quantity
+    return holds
+
+
+async def test_checkout_holds_the_stock(dbsession) -> None:
+    user_id, (first, second) = await _shop(dbsession)
+
+    order = await OrderService(dbsession).checkout(
+        user_id, 1, _items({first: 2, second: 1})
+    )
+
+    assert order.status == OrderStatus.PENDING_PAYMENT.value
+    assert order.total_amount == Decimal("30.00")
+    assert await _stock(dbsession) == {first: (3, 2), second: (4, 1)}
+    assert await _holds(dbsession) == {order.id: {first: 2, second: 1}}
+    delivery = await dbsession.scalar(select(Delivery))
+    assert (delivery.order_id, delivery.courier_id) == (order.id, None)
+
+
+async def test_payment_sells_the_held_stock(dbsession) -> None:
+    user_id, (first, second) = await _shop(dbsession)
+    order_id = await _checkout(dbsession, user_id, {first: 2, second: 1})
+    service = OrderService(dbsession)
+
+    await service.on_payment_success(order_id)
+
+    assert await _status(dbsession, order_id) == OrderStatus.PAID.value
+    assert await _stock(dbsession) == {first: (3, 0), second: (4, 0)}
+    assert await _holds(dbsession) == {}
+    with pytest.raises(HTTPException) as error:
+        await service.on_payment_success(order_id)
+    assert error.value.status_code == 400
+
+
+async def test_payment_after_the_hold_expired(dbsession) -> None:
+    user_id, (first, second) = await _shop(dbsession)
+    order_id = await _checkout(dbsession, user_id, {first: 2})
+    await _expire_holds(dbsession)
+    service = OrderService(dbsession)
+    take_reservations = service.crud.take_reservations
+
+    async def raced(order_id):
+        # the expiry sweep runs after the payment read the status
+        await OrderService(dbsession).release_expired_reservations()
+        return await take_reservations(order_id)
+
+    service.crud.take_reservations = raced  # type: ignore[method-assign]
+
+    with pytest.raises(HTTPException) as error:
+        await service.on_payment_success(order_id)
+
+    assert error.value.status_code == 409
+    assert await _status(dbsession, order_id) == OrderStatus.CANCELLED.value
+    assert await _stock(dbsession) == {first: (5, 0), second: (5, 0)}
+
+
+async def test_cancel_unpaid_releases_the_hold(dbsession) -> None:
+    user_id, (first, second) = await _shop(dbsession)
+    order_id = await _checkout(dbsession, user_id, {first: 2, second: 1})
+    service = OrderService(dbsession)
+
+    await service.cancel_order(order_id)
+
+    assert await _status(dbsession, order_id) == OrderStatus.CANCELLED.value
+    assert await _stock(dbsession) == {first: (5, 0), second: (5, 0)}
+    assert await _holds(dbsession) == {}
+    with pytest.raises(HTTPException) as error:
+        await service.cancel_order(order_id)
+    assert error.value.status_code == 400
+    assert await _stock(dbsession) == {first: (5, 0), second: (5, 0)}
+
+
+async def test_cancel_paid_restores_the_units_sold(dbsession) -> None:
+    user_id, (first, second) = await _shop(dbsession)
+    order_id = await _checkout(dbsession, user_id, {first: 2, second: 1})
+    service = OrderService(dbsession)
+    await service.on_payment_success(order_id)
+
+    await service.cancel_order(order_id)
+
+    assert await _stock(dbsession) == {first: (5, 0), second: (5, 0)}
+
+
+async def test_cancel_raced_by_the_sweep_restores_once(dbsession) -> None:
+    user_id, (first, second) = await _shop(dbsession)
+    order_id = await _checkout(dbsession, user_id, {first: 2, second: 1})
+    await _expire_holds(dbsession)
+    service = OrderService(dbsession)
+    take_reservations = service.crud.take_reservations
+
+    async def raced(order_id):
+        # the expiry sweep runs after the cancel read the order
+        await OrderService(dbsession).release_expired_reservations()
+        return await take_reservations(order_id)
+
+    service.crud.take_reservations = raced  # type: ignore[method-assign]
+
+    with pytest.raises(HTTPException) as error:
+        await service.cancel_order(order_id)
+
+    assert error.value.status_code == 400
+    assert await _status(dbsession, order_id) == OrderStatus.CANCELLED.value
+    assert await _stock(dbsession) == {first: (5, 0), second: (5, 0)}
+
+
+async def test_sweep_releases_whole_orders(dbsession, monkeypatch) -> None:
+    user_id, (first, second) = await _shop(dbsession)
+    orders = [
+        await _checkout(dbsession, user_id, {first: 1, second: 1}),
+        await _checkout(dbsession, user_id, {first: 2, second: 2}),
+    ]
+    fresh = await _checkout(dbsession, user_id, {first: 1})
+    await dbsession.execute(
+        update(StockReservation)
+        .where(StockReservation.order_id.in_(orders))
+        .values(expires_at=datetime(2000, 1, 1))
+    )
+    await dbsession.commit()
+    monkeypatch.setattr(settings, "RESERVATION_SWEEP_BATCH_SIZE", 1)
+    service = OrderService(dbsession)
+    take_expired = service.crud.take_expired_reservations
+    batches: list[list[tuple[int, int]]] = []
+
+    async def recorded(now, limit):
+        holds = await take_expired(now, limit)
+        batches.append(sorted((hold.order_id, hold.variant_id) for hold in holds))
+        return holds
+
+    service.crud.take_expired_reservations = recorded  # type: ignore[method-assign]
+
+    assert await service.release_expired_reservations() == 4
+
+    # one order per batch, with all of its holds
+    assert batches == [
+        [(orders[0], first), (orders[0], second)],
+        [(orders[1], first), (orders[1], second)],
+        [],
+    ]
+    assert [await _status(dbsession, id_) for id_ in orders] == [
+        OrderStatus.CANCELLED.value
+    ] * 2
+    assert await _status(dbsession, fresh) == OrderStatus.PENDING_PAYMENT.value
+    assert await _stock(dbsession) == {first: (4, 1), second: (5, 0)}
+    assert await _holds(dbsession) == {fresh: {first: 1}}
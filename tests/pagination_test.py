@@ -0,0 +1,71 @@
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+
+from db.crud.product import ProductCRUD
+from db.models.categories import Category
+from db.models.products import Product
+from utils.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_roundtrip() -> None:
+    """Cursor tokens decode back to the values they were built from."""
+    cursor = encode_cursor("price", ["12.50", 42])
+    assert decode_cursor(cursor, "price") == ["12.50", 42]
+
+
+def test_cursor_rejects_other_ordering() -> None:
+    """A cursor issued for one ordering can't be replayed against another."""
+    cursor = encode_cursor("price", ["12.50", 42])
+    with pytest.raises(HTTPException):
+        decode_cursor(cursor, "title")
+
+
+def test_cursor_rejects_garbage() -> None:
+    with pytest.raises(HTTPException):
+        decode_cursor("not-a-cursor", "id")
+
+
+async def _products(dbsession, prices):
+    category = Category(name="Shoes", slug="shoes")
+    dbsession.add(category)
+    await dbsession.flush()
+    products = [
+        Product(title=f"p{i}", slug=f"p{i}", price=price, category_id=category.id)
+        for i, price in enumerate(prices)
+    ]
+    dbsession.add_all(products)
+    await dbsession.flush()
+    return [product.id for product in products]
+
+
+async def test_offset_pages_follow_ordering(dbsession) -> None:
+    """Offset pages continue the first (cursor) page instead of restarting."""
+    ids = await _products(dbsession, [5, 3, 9, 1, 7])
+    crud = ProductCRUD(dbsession)
+
+    for order_by in ("-id", "id", "price", "-price"):
+        first, _ = await crud.get_page(limit=2, order_by=order_by, load=())
+        rest = await crud.get_all(limit=10, offset=2, order_by=order_by, load=())
+        listed = [product.id for product in [*first, *rest]]
+        assert sorted(listed) == sorted(ids)
+        everything = await crud.get_all(limit=10, order_by=order_by, load=())
+        assert listed == [product.id for product in everything]
+
+
+async def test_cursor_pages_by_price(dbsession) -> None:
+    """Walking (price, id) cursors visits every product once, in order."""
+    await _products(dbsession, [5, 3, 5, 1, 5])
+    crud = ProductCRUD(dbsession)
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = await crud.get_page(
+            limit=2, cursor=cursor, order_by="-price", load=()
+        )
+        seen += [(Decimal(product.price), product.id) for product in page]
+        if cursor is None:
+            break
+    assert seen == sorted(seen, key=lambda row: (-row[0], -row[1]))
+    assert len(seen) == 5
@@ -0,0 +1,36 @@
+from collections import namedtuple
+from decimal import Decimal
+
+from db.models.promo_codes import PromoCode
+from services.pricing_service import price_lines, promo_discount
+
+Line = namedtuple(
+    "Line", "id variant_id quantity added_price sku price stock is_active"
+)
+
+
+def test_price_lines_totals_and_warnings() -> None:
+    lines = [
+        Line(1, 10, 3, Decimal("3.33"), "a", Decimal("3.33"), 5, True),
+        Line(2, 11, 2, Decimal("5.00"), "b", Decimal("4.50"), 1, True),
+        Line(3, 12, 1, Decimal("1.00"), "c", Decimal("1.00"), 9, False),
+    ]
+    items, subtotal = price_lines(lines)
+    assert [item["line_total"] for item in items] == [
+        Decimal("9.99"),
+        Decimal("9.00"),
+        Decimal("1.00"),
+    ]
+    assert [item["warnings"] for item in items] == [
+        [],
+        ["insufficient_stock", "price_changed"],
+        ["unavailable"],
+    ]
+    assert subtotal == Decimal("19.99")
+
+
+def test_promo_discount_is_capped_at_subtotal() -> None:
+    percent = PromoCode(code="P", discount_percent=15)
+    amount = PromoCode(code="A", discount_percent=0, discount_amount=Decimal("50"))
+    assert promo_discount(percent, Decimal("19.99")) == Decimal("3.00")
+    assert promo_discount(amount, Decimal("19.99")) == Decimal("19.99")
@@ -0,0 +1,152 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event, update
+
+from db.crud.product import (
+    PRODUCT_FULL,
+    ProductCRUD,
+    ProductImageCRUD,
+    ProductVariantCRUD,
+)
+from db.models.categories import Category
+from db.models.products import Product, ProductImage, ProductVariant
+from schemas.product import ProductVariantCreateScheme
+
+
+@contextmanager
+def count_selects(dbsession):
+    """Collect the SELECTs the session's connection runs in the block."""
+    statements: list[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    engine = dbsession.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+async def _catalog(dbsession, products: int = 3) -> Category:
+    category = Category(name="Shoes", slug="shoes")
+    dbsession.add(category)
+    await dbsession.flush()
+    for i in range(products):
+        dbsession.add(
+            Product(
+                title=f"p{i}",
+                slug=f"p{i}",
+                price=10,
+                category_id=category.id,
+                images=[ProductImage(url=f"/media/{i}-{n}.jpg") for n in range(2)],
+                variants=[
+                    ProductVariant(sku=f"p{i}-{n}", price=10, stock=1) for n in range(2)
+                ],
+            )
+        )
+    await dbsession.commit()
+    dbsession.expunge_all()
+    return category
+
+
+async def test_page_loads_relations_in_batches(dbsession) -> None:
+    """A page costs one query per relation, whatever the number of products."""
+    await _catalog(dbsession, products=5)
+    crud = ProductCRUD(dbsession)
+
+    with count_selects(dbsession) as statements:
+        products, _ = await crud.get_page(limit=10, load=PRODUCT_FULL)
+        # touching every relation doesn't lazy load (it would raise anyway)
+        images = sum(len(product.images) for product in products)
+        attributes = [
+            variant.attributes for product in products for variant in product.variants
+        ]
+    assert (len(products), images, len(attributes)) == (5, 10, 10)
+    # products, images, variants, and the variants' attributes
+    assert len(statements) == 4
+
+
+async def test_page_without_relations_is_one_query(dbsession) -> None:
+    await _catalog(dbsession)
+    crud = ProductCRUD(dbsession)
+
+    with count_selects(dbsession) as statements:
+        products = await crud.get_all(limit=10, load=())
+    assert len(products) == 3
+    assert len(statements) == 1
+
+
+async def _summary(dbsession, product: Product) -> tuple:
+    await dbsession.refresh(product)
+    return (
+        product.min_price,
+        product.max_price,
+        product.total_stock,
+        product.in_stock,
+        product.main_image_url,
+    )
+
+
+async def test_summary_follows_variant_and_image_changes(dbsession) -> None:
+    category = Category(name="Shoes", slug="shoes")
+    dbsession.add(category)
+    await dbsession.flush()
+    product = Product(title="Boot", slug="boot", price=10, category_id=category.id)
+    dbsession.add(product)
+    await dbsession.commit()
+    variants, images = ProductVariantCRUD(dbsession), ProductImageCRUD(dbsession)
+
+    cheap = await variants.create(
+        product.id, ProductVariantCreateScheme(sku="boot-s", price=8, stock=2)
+    )
+    large = await variants.create(
+        product.id, ProductVariantCreateScheme(sku="boot-l", price=12, stock=3)
+    )
+    assert await _summary(dbsession, product) == (8, 12, 5, True, None)
+
+    # inactive variants don't count
+    await variants.update(cheap, {"is_active": False})
+    assert await _summary(dbsession, product) == (12, 12, 3, True, None)
+
+    await images.create(product.id, "https://cdn.example.com/a.jpg")
+    main = await images.create(
+        product.id, "https://cdn.example.com/b.jpg", is_main=True
+    )
+    assert (await _summary(dbsession, product))[4] == "https://cdn.example.com/b.jpg"
+
+    await variants.update(large, {"stock": 0})
+    assert await _summary(dbsession, product) == (
+        12,
+        12,
+        0,
+        False,
+        "https://cdn.example.com/b.jpg",
+    )
+
+    await variants.delete(large)
+    await images.delete(main.id)
+    # no active variant left: price range cleared, in_stock left as it was
+    assert await _summary(dbsession, product) == (
+        None,
+        None,
+        0,
+        False,
+        "https://cdn.example.com/a.jpg",
+    )
+
+
+async def test_repair_fixes_only_drifted_summaries(dbsession) -> None:
+    # rows added straight through the ORM, without their summaries
+    await _catalog(dbsession)
+    crud = ProductCRUD(dbsession)
+    assert await crud.repair_summaries(batch_size=2) == 3
+    assert await crud.repair_summaries(batch_size=2) == 0
+
+    await dbsession.execute(
+        update(Product).where(Product.slug == "p1").values(total_stock=99)
+    )
+    assert await crud.repair_summaries(batch_size=2) == 1
+    assert await crud.repair_summaries(batch_size=2) == 0
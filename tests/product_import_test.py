@@ -0,0 +1,91 @@
+import asyncio
+
+from core.settings import settings
+from db.models.categories import Category
+from db.models.imports import ProductImportStatus
+from services.product_import_service import ProductImportService, iter_records
+
+
+async def _chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+def _records(data: bytes, format: str, size: int = 7) -> list:
+    async def collect():
+        return [record async for record in iter_records(_chunks(data, size), format)]
+
+    return asyncio.run(collect())
+
+
+def test_csv_records_span_lines_and_chunks() -> None:
+    """Quoted cells keep their newlines; rows are numbered by their first line."""
+    data = (
+        'name,description,images\r\n'
+        'Лампа,"two\nlines, ""quoted""",a.png|b.png\r\n'
+        'Desk,,\r\n'
+    ).encode()
+    assert _records(data, "csv") == [
+        (
+            2,
+            {
+                "name": "Лампа",
+                "description": 'two\nlines, "quoted"',
+                "images": [
+                    {"url": "a.png", "is_main": True},
+                    {"url": "b.png", "is_main": False},
+                ],
+            },
+        ),
+        (4, {"name": "Desk"}),
+    ]
+
+
+def test_ndjson_bad_lines_become_errors() -> None:
+    data = b'{"name": "a"}\n\nnot json\n[1]\n{"name": "b"}'
+    records = _records(data, "ndjson", size=5)
+    assert records[0] == (1, {"name": "a"})
+    assert records[1][0] == 3 and records[1][1].startswith("invalid JSON")
+    assert records[2] == (4, "expected a JSON object")
+    assert records[3] == (5, {"name": "b"})
+
+
+async def _upload(data: bytes):
+    yield data
+
+
+async def test_queued_import_reads_the_spooled_file(
+    dbsession, tmp_path, monkeypatch
+) -> None:
+    monkeypatch.setattr(settings, "PRODUCT_IMPORT_DIR", tmp_path)
+    category = Category(name="Shoes", slug="shoes")
+    dbsession.add(category)
+    await dbsession.flush()
+    service = ProductImportService(dbsession)
+    data = (
+        b'{"title": "Boot", "slug": "boot", "price": 10, "category_id": %d}\n'
+        b'{"title": "No slug"}\n' % category.id
+    )
+
+    job = await service.enqueue_stream(_upload(data), "ndjson", None)
+    assert job.status == ProductImportStatus.QUEUED.value
+    job = await service.run_queued(job.id)
+
+    assert job.status == ProductImportStatus.COMPLETED.value
+    assert (job.imported_rows, job.failed_rows, job.source_path) == (1, 1, None)
+    assert list(tmp_path.iterdir()) == []
+
+
+async def test_queued_import_without_its_file_fails(
+    dbsession, tmp_path, monkeypatch
+) -> None:
+    """A worker that can't see the spooled upload fails the job, not the task."""
+    monkeypatch.setattr(settings, "PRODUCT_IMPORT_DIR", tmp_path)
+    service = ProductImportService(dbsession)
+    job = await service.enqueue_stream(_upload(b"{}\n"), "ndjson", None)
+    for path in tmp_path.iterdir():
+        path.unlink()
+
+    job = await service.run_queued(job.id)
+    assert job.status == ProductImportStatus.FAILED.value
+    assert "not found" in job.errors
@@ -0,0 +1,30 @@
+import numpy as np
+
+from services.related_service import basket_pairs, count_pairs, top_neighbours
+
+
+def test_basket_pairs_skip_repeats_and_large_baskets() -> None:
+    # order 1: products 1, 2 (2 twice); order 2: 3 alone; order 3: 1, 2, 3, 4
+    orders = np.array([1, 1, 1, 2, 3, 3, 3, 3])
+    products = np.array([1, 2, 2, 3, 1, 2, 3, 4])
+    left, right = basket_pairs(orders, products, max_basket=3)
+    assert sorted(zip(left.tolist(), right.tolist())) == [(1, 2), (2, 1)]
+
+    left, right = basket_pairs(orders, products, max_basket=4)
+    keys, counts = count_pairs(left * 10 + right)
+    assert dict(zip(keys.tolist(), counts.tolist()))[12] == 2
+    assert len(keys) == 12
+
+
+def test_top_neighbours_ranked_by_score() -> None:
+    keys = np.array([12, 13, 14, 21, 31, 41])
+    counts = np.array([3, 5, 3, 3, 5, 1])
+    product, neighbour, rank, score = top_neighbours(
+        keys, counts, width=10, top_k=2, min_score=2
+    )
+    assert list(zip(product, neighbour, rank, score)) == [
+        (1, 3, 1, 5),
+        (1, 2, 2, 3),
+        (2, 1, 1, 3),
+        (3, 1, 1, 5),
+    ]
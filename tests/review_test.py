@@ -0,0 +1,63 @@
+from sqlalchemy import select
+
+from db.crud.review import ReviewCRUD
+from db.models.categories import Category
+from db.models.products import Product
+from db.models.users import User
+from schemas.review import ReviewCreateScheme, ReviewUpdateScheme
+
+
+def test_rating_average_and_histogram() -> None:
+    product = Product(rating_count=3, rating_sum=13, rating_4=2, rating_5=1)
+    for stars in (1, 2, 3):
+        setattr(product, f"rating_{stars}", 0)
+    assert product.rating_average == 4.33
+    assert product.rating_histogram == {1: 0, 2: 0, 3: 0, 4: 2, 5: 1}
+    assert Product(rating_count=0, rating_sum=0).rating_average is None
+
+
+async def _ratings(dbsession, product_id: int) -> tuple[int, int, list[int]]:
+    """(rating_count, rating_sum, [rating_1 .. rating_5]) as stored."""
+    row = (
+        await dbsession.execute(
+            select(
+                Product.rating_count,
+                Product.rating_sum,
+                *(getattr(Product, f"rating_{stars}") for stars in range(1, 6)),
+            ).where(Product.id == product_id)
+        )
+    ).one()
+    return row[0], row[1], list(row[2:])
+
+
+async def test_reviews_keep_the_rating_aggregates(dbsession) -> None:
+    users = [
+        User(email=f"r{i}@example.com", username=f"r{i}", hashed_password="x")
+        for i in range(2)
+    ]
+    category = Category(name="Books", slug="books")
+    dbsession.add_all([*users, category])
+    await dbsession.flush()
+    product = Product(title="Novel", slug="novel", price=10, category_id=category.id)
+    dbsession.add(product)
+    await dbsession.commit()
+    product_id, (first, second) = product.id, [user.id for user in users]
+    crud = ReviewCRUD(dbsession)
+
+    review = await crud.create(product_id, first, ReviewCreateScheme(rating=4))
+    other = await crud.create(product_id, second, ReviewCreateScheme(rating=2))
+    assert await _ratings(dbsession, product_id) == (2, 6, [0, 1, 0, 1, 0])
+
+    # an edit moves the review between bars, the count stays
+    review = await crud.update(review, ReviewUpdateScheme(rating=5))
+    assert await _ratings(dbsession, product_id) == (2, 7, [0, 1, 0, 0, 1])
+
+    # a rating can't be removed: null keeps it
+    review = await crud.update(
+        review, ReviewUpdateScheme(rating=None, comment="Still great")
+    )
+    assert (review.rating, review.comment) == (5, "Still great")
+    assert await _ratings(dbsession, product_id) == (2, 7, [0, 1, 0, 0, 1])
+
+    await crud.delete(other)
+    assert await _ratings(dbsession, product_id) == (1, 5, [0, 0, 0, 0, 1])
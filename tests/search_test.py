@@ -0,0 +1,84 @@
+from db.crud.search import ProductSearchCRUD, fts5_query
+from db.models.brands import Brand
+from db.models.categories import Category
+from db.models.products import Product
+
+
+def test_fts5_query_quotes_words_and_prefixes_the_last() -> None:
+    assert fts5_query('Red "shoes" OR') == '"red" "shoes" "or"*'
+    assert fts5_query("  -- ") == ""
+
+
+async def _catalog(dbsession) -> tuple[Brand, list[Product]]:
+    brand = Brand(name="Acme", slug="acme")
+    category = Category(name="Footwear", slug="footwear")
+    dbsession.add_all([brand, category])
+    await dbsession.flush()
+    products = [
+        # the word in the description only, then in the title
+        Product(
+            title="Trail runner",
+            slug="trail-runner",
+            description="A light boot for hiking",
+            price=10,
+            category_id=category.id,
+        ),
+        Product(
+            title="Hiking boot",
+            slug="hiking-boot",
+            price=10,
+            category_id=category.id,
+            brand_id=brand.id,
+        ),
+        Product(
+            title="Hiking sock",
+            slug="hiking-sock",
+            price=10,
+            category_id=category.id,
+            is_active=False,
+        ),
+    ]
+    dbsession.add_all(products)
+    await dbsession.flush()
+    await ProductSearchCRUD(dbsession).reindex([product.id for product in products])
+    return brand, products
+
+
+async def test_title_matches_rank_first(dbsession) -> None:
+    _, (runner, boot, _sock) = await _catalog(dbsession)
+    search = ProductSearchCRUD(dbsession)
+
+    # inactive products never show up
+    assert (await search.search("hiking"))[0] == [boot.id, runner.id]
+    # the last word matches as a prefix
+    assert (await search.search("hik"))[0] == [boot.id, runner.id]
+
+
+async def test_search_pages_by_cursor(dbsession) -> None:
+    _, (runner, boot, _sock) = await _catalog(dbsession)
+    search = ProductSearchCRUD(dbsession)
+
+    first, cursor = await search.search("hiking", limit=1)
+    second, last_cursor = await search.search("hiking", limit=1, cursor=cursor)
+    assert (first, second, last_cursor) == ([boot.id], [runner.id], None)
+
+
+async def test_reindex_follows_product_and_brand_changes(dbsession) -> None:
+    brand, (runner, boot, _sock) = await _catalog(dbsession)
+    search = ProductSearchCRUD(dbsession)
+
+    runner.title = "Trail sandal"
+    runner.description = None
+    await dbsession.flush()
+    await search.reindex([runner.id])
+    assert (await search.search("hiking"))[0] == [boot.id]
+    assert (await search.search("sandal"))[0] == [runner.id]
+
+    brand.name = "Summit"
+    await dbsession.flush()
+    await search.reindex_related(brand_id=brand.id)
+    assert (await search.search("acme"))[0] == []
+    assert (await search.search("summit"))[0] == [boot.id]
+
+    await search.remove([boot.id])
+    assert (await search.search("summit"))[0] == []
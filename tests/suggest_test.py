@@ -0,0 +1,38 @@
+from core.suggest import SuggestIndex, Suggestion
+
+
+def _index() -> SuggestIndex:
+    index = SuggestIndex()
+    index.build(
+        [
+            Suggestion("brand", 1, "Apple", "apple", popularity=7),
+            Suggestion("category", 1, "Phones & Café", "phones", popularity=7),
+            Suggestion("product", 1, "Apple iPhone 15", "iphone-15", 5, 1, 1),
+            Suggestion("product", 2, "Apricot jam", "jam", popularity=2),
+        ]
+    )
+    return index
+
+
+def _texts(index: SuggestIndex, query: str) -> list[str]:
+    return [entry.text for entry in index.search(query)]
+
+
+def test_suggest_prefix_words_ranked_by_popularity() -> None:
+    index = _index()
+    assert _texts(index, "ap") == ["Apple", "Apple iPhone 15", "Apricot jam"]
+    assert _texts(index, "APP iph") == ["Apple iPhone 15"]
+    assert _texts(index, "cafe") == ["Phones & Café"]
+    assert _texts(index, "!!") == []
+
+
+def test_suggest_incremental_updates() -> None:
+    index = _index()
+    index.record_sales({2: 10})
+    assert _texts(index, "ap") == ["Apricot jam", "Apple", "Apple iPhone 15"]
+    index.put_product(2, "Quince jam", "jam", None, 1)
+    index.put(Suggestion("brand", 2, "Apex", "apex"))
+    index.remove("brand", 1)
+    assert _texts(index, "ap") == ["Apple iPhone 15", "Apex"]
+    assert _texts(index, "jam") == ["Quince jam"]
+    assert "apricot" not in index.words
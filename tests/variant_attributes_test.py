@@ -0,0 +1,23 @@
+import pytest
+from pydantic import ValidationError
+
+from db.models.products import ProductVariant
+from schemas.product import ProductVariantCreateScheme
+
+
+def test_attributes_accept_objects_and_legacy_json_strings() -> None:
+    legacy = ProductVariantCreateScheme(
+        sku="a", price=1, attributes='{"size": 42, "cotton": true, "fit": null}'
+    )
+    assert legacy.attributes == {"size": "42", "cotton": "true"}
+    with pytest.raises(ValidationError):
+        ProductVariantCreateScheme(sku="a", price=1, attributes='["red"]')
+
+
+def test_setting_attributes_updates_rows_in_place() -> None:
+    variant = ProductVariant(sku="a", attributes={"color": "red", "size": "M"})
+    color = variant.attribute_values[0]
+    variant.attributes = {"color": "blue", "fit": "slim"}
+    assert variant.attributes == {"color": "blue", "fit": "slim"}
+    # same row, so no second ("color") row is ever inserted for the variant
+    assert variant.attribute_values[0] is color